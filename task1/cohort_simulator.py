@@ -0,0 +1,138 @@
+# cohort_simulator.py
+# Task 1 - Streaming DAU simulator
+# -ozgur
+
+"""
+Gerçek günlük install sayılarıyla gün gün ilerleyen, durum tutan DAU simülatörü.
+Her yeni gün için DAU, cohort büyüklüklerinin tutulduğu ring buffer ile
+retention kernel'inin dot product'ı olarak O(window) sürede güncellenir.
+"""
+
+from typing import Dict, Optional
+
+import numpy as np
+
+from retention_model import RetentionModel
+
+
+class CohortSimulator:
+    """
+    Streaming cohort simülatörü.
+    horizon verilirse horizon gününden eski cohort'ların retention'ı 0 kabul edilir ve
+    bellek kullanımı sabit kalır (ring buffer). horizon None ise tüm geçmiş tutulur ve
+    sonuçlar calculate_dau ile birebir aynıdır.
+
+    Kullanım: Task 1 - Canlı dashboard DAU takibi
+    """
+
+    def __init__(self, retention_model: RetentionModel, horizon: Optional[int] = None):
+        """
+        Args:
+            retention_model: Retention modeli instance'ı
+            horizon: Truncation horizon'u (gün). Bu günden sonra retention 0 kabul edilir.
+        """
+        if horizon is not None and horizon <= 0:
+            raise ValueError(f"horizon pozitif olmalı: {horizon}")
+
+        self.retention_model = retention_model
+        self.horizon = horizon
+        self.day = 0  # Şimdiye kadar işlenen gün sayısı
+        self.dau = 0.0  # Son işlenen günün DAU'su
+        self._cohorts = np.zeros(horizon if horizon is not None else 64)
+
+    def advance(self, new_users: float) -> float:
+        """
+        Bir gün ilerler: yeni günün install sayısını ekler ve o günün DAU'sunu döndürür.
+
+        Args:
+            new_users: Bugün gelen yeni kullanıcı sayısı
+
+        Returns:
+            Bugünün DAU değeri
+        """
+        if self.horizon is None:
+            if self.day >= len(self._cohorts):
+                self._cohorts = np.concatenate([self._cohorts, np.zeros(len(self._cohorts))])
+            self._cohorts[self.day] = new_users
+            self.day += 1
+            kernel = self.retention_model.get_retention_kernel(self.day)
+            # En yeni cohort Day 1 retention'ı ile, en eski cohort Day t retention'ı ile çarpılır
+            self.dau = float(np.dot(self._cohorts[self.day - 1::-1], kernel))
+            return self.dau
+
+        position = self.day % self.horizon
+        self._cohorts[position] = new_users
+        self.day += 1
+        kernel = self.retention_model.get_retention_kernel(self.horizon)
+        # Ring buffer'ı yeniden sıralamadan iki parça halinde dot product:
+        # [position, ..., 0] en yeni cohort'lar, [horizon-1, ..., position+1] en eski cohort'lar
+        self.dau = float(
+            np.dot(self._cohorts[position::-1], kernel[:position + 1])
+            + np.dot(self._cohorts[:position:-1], kernel[position + 1:])
+        )
+        return self.dau
+
+    def advance_many(self, installs: np.ndarray) -> np.ndarray:
+        """
+        Birden fazla gün ilerler.
+
+        Args:
+            installs: Sırasıyla her günün install sayıları
+
+        Returns:
+            Her gün için DAU değerlerini içeren array
+        """
+        return np.array([self.advance(new_users) for new_users in installs])
+
+    def snapshot(self) -> Dict:
+        """
+        Simülatör durumunu serileştirilebilir bir dictionary olarak döndürür.
+        Cohort'lar en eskiden en yeniye sıralanır.
+
+        Returns:
+            Durum dictionary'si (restore ile geri yüklenebilir)
+        """
+        if self.horizon is None:
+            cohorts = self._cohorts[:self.day].copy()
+        else:
+            position = self.day % self.horizon
+            cohorts = np.concatenate([self._cohorts[position:], self._cohorts[:position]])
+            cohorts = cohorts[-min(self.day, self.horizon):] if self.day > 0 else cohorts[:0]
+
+        return {
+            'a': self.retention_model.a,
+            'b': self.retention_model.b,
+            'horizon': self.horizon,
+            'day': self.day,
+            'dau': self.dau,
+            'cohorts': cohorts.tolist()
+        }
+
+    @classmethod
+    def restore(cls, state: Dict, retention_model: Optional[RetentionModel] = None) -> "CohortSimulator":
+        """
+        snapshot ile alınmış durumdan simülatör oluşturur.
+
+        Args:
+            state: snapshot çıktısı
+            retention_model: Kullanılacak retention modeli (None ise state'teki a, b ile oluşturulur)
+
+        Returns:
+            CohortSimulator instance'ı
+        """
+        if retention_model is None:
+            retention_model = RetentionModel.from_parameters(state['a'], state['b'])
+
+        simulator = cls(retention_model, horizon=state['horizon'])
+        cohorts = np.asarray(state['cohorts'], dtype=float)
+        simulator.day = int(state['day'])
+        simulator.dau = float(state['dau'])
+
+        if simulator.horizon is None:
+            simulator._cohorts = np.zeros(max(64, len(cohorts)))
+            simulator._cohorts[:len(cohorts)] = cohorts
+        else:
+            # En eski -> en yeni sıralı cohort'ları ring buffer pozisyonlarına yerleştir
+            days = np.arange(simulator.day - len(cohorts), simulator.day)
+            simulator._cohorts[days % simulator.horizon] = cohorts
+        return simulator
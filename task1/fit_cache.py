@@ -0,0 +1,205 @@
+# fit_cache.py
+# Task 1 - Retention fit cache
+# -ozgur
+
+"""
+Power Law curve fitting sonuçları için cache modülü.
+Aynı (retention_points, days, bounds) için curve_fit tekrar çalıştırılmaz;
+fit edilmiş (a, b) parametreleri process içi LRU cache'ten ve istenirse diskteki
+JSON-lines dosyasından okunur. Disk dosyasına yalnızca ekleme yapılır (her yeni fit tek
+satır), başarısız fit'lerin fallback parametreleri cache'lenmez.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from typing import Callable, Optional, Sequence, Tuple
+
+
+FitKey = Tuple[Tuple[float, ...], Tuple[int, ...], Tuple[Tuple[float, ...], Tuple[float, ...]]]
+
+
+def make_fit_key(retention_points: Sequence[float], days: Sequence[int], bounds) -> FitKey:
+    """
+    Fit cache için hashable anahtar oluşturur.
+
+    Args:
+        retention_points: Retention değerleri
+        days: Retention noktalarının günleri
+        bounds: curve_fit bounds parametresi ([a_min, b_min], [a_max, b_max])
+
+    Returns:
+        (retention_points, days, bounds) tuple'ı
+    """
+    return (
+        tuple(float(x) for x in retention_points),
+        tuple(int(d) for d in days),
+        (tuple(float(x) for x in bounds[0]), tuple(float(x) for x in bounds[1]))
+    )
+
+
+class FitCache:
+    """
+    Fit edilmiş Power Law parametreleri için iki katmanlı cache.
+    1. katman: process içi LRU (OrderedDict)
+    2. katman (opsiyonel): diskte JSON-lines dosyası, çalıştırmalar (ve process'ler) arasında
+       paylaşılır. Her satır bir [anahtar, [a, b]] kaydıdır; yeni fit'ler dosyanın sonuna
+       eklenir, dosya hiçbir zaman baştan yazılmaz
+
+    Kullanım: Task 1 - RetentionModel fitting
+    """
+
+    def __init__(self, maxsize: int = 4096, cache_path: Optional[str] = None):
+        """
+        Args:
+            maxsize: LRU katmanındaki maksimum kayıt sayısı
+            cache_path: Disk cache JSON dosyasının yolu (None ise disk katmanı kapalı)
+        """
+        self.maxsize = maxsize
+        self.cache_path = cache_path
+        self._memory: "OrderedDict[FitKey, Tuple[float, float]]" = OrderedDict()
+        self._disk: Optional[dict] = None
+        self._needs_newline = False
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get_or_fit(
+        self,
+        key: FitKey,
+        fit_func: Callable[[], Tuple[float, float]],
+        fallback_func: Optional[Callable[[Exception], Tuple[float, float]]] = None
+    ) -> Tuple[float, float]:
+        """
+        Anahtar cache'te varsa parametreleri döndürür, yoksa fit_func'u çalıştırıp sonucu saklar.
+
+        Args:
+            key: make_fit_key ile oluşturulmuş anahtar
+            fit_func: Cache miss durumunda (a, b) döndüren fonksiyon (başarısız olursa hata yükseltir)
+            fallback_func: fit_func hata yükseltirse hatayla çağrılır; sonucu döndürülür ama
+                           cache'e yazılmaz (None ise hata yükseltilir)
+
+        Returns:
+            (a, b) parametreleri
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return self._memory[key]
+
+        disk_key = json.dumps(key)
+        disk = self._load_disk()
+        if disk is not None and disk_key in disk:
+            params = tuple(disk[disk_key])
+            self.disk_hits += 1
+        else:
+            self.misses += 1
+            try:
+                params = tuple(float(p) for p in fit_func())
+            except Exception as e:
+                if fallback_func is None:
+                    raise
+                return tuple(float(p) for p in fallback_func(e))
+            if disk is not None:
+                disk[disk_key] = list(params)
+                self._append_disk(disk_key, params)
+
+        self._memory[key] = params
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+        return params
+
+    def _load_disk(self) -> Optional[dict]:
+        """
+        Disk katmanını (ilk erişimde) yükler. Okunamayan satırlar (ör. yarım kalmış bir yazma)
+        atlanır; eski formattaki tek JSON objesi içeren dosyalar da okunur.
+        """
+        if self.cache_path is None:
+            return None
+        if self._disk is None:
+            self._disk = {}
+            if os.path.exists(self.cache_path):
+                skipped = 0
+                try:
+                    with open(self.cache_path, 'r') as f:
+                        for line in f:
+                            # Son satır yarım kalmışsa (veya eski format) sonraki ekleme yeni satırdan başlar
+                            self._needs_newline = not line.endswith("\n")
+                            try:
+                                record = json.loads(line)
+                            except ValueError:
+                                skipped += line.strip() != ''
+                                continue
+                            if isinstance(record, dict):
+                                self._disk.update(record)
+                            else:
+                                self._disk[record[0]] = record[1]
+                except OSError as e:
+                    print(f"Warning: Fit cache okunamadı ({self.cache_path}): {e}")
+                if skipped:
+                    print(f"Warning: Fit cache'te okunamayan {skipped} satır atlandı ({self.cache_path})")
+        return self._disk
+
+    def _append_disk(self, disk_key: str, params: Tuple[float, float]):
+        """Yeni kaydı disk dosyasının sonuna tek satır olarak ekler."""
+        directory = os.path.dirname(self.cache_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        try:
+            with open(self.cache_path, 'a') as f:
+                f.write(("\n" if self._needs_newline else "") + json.dumps([disk_key, list(params)]) + "\n")
+            self._needs_newline = False
+        except OSError as e:
+            print(f"Warning: Fit cache yazılamadı ({self.cache_path}): {e}")
+
+    def stats(self) -> dict:
+        """
+        Cache istatistiklerini döndürür.
+
+        Returns:
+            hits, disk_hits, misses ve LRU boyutunu içeren dictionary
+        """
+        return {
+            'hits': self.hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'size': len(self._memory)
+        }
+
+    def clear(self):
+        """LRU katmanını ve sayaçları temizler (disk dosyasına dokunmaz)."""
+        self._memory.clear()
+        self._disk = None
+        self._needs_newline = False
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+
+# Varsayılan process içi cache. Disk katmanı FIT_CACHE_PATH ortam değişkeni ile açılabilir.
+_default_cache = FitCache(cache_path=os.environ.get("FIT_CACHE_PATH"))
+
+
+def get_fit_cache() -> FitCache:
+    """
+    RetentionModel'in varsayılan olarak kullandığı fit cache'i döndürür.
+
+    Kullanım: Task 1 - Cache istatistikleri
+    """
+    return _default_cache
+
+
+def configure_fit_cache(maxsize: int = 4096, cache_path: Optional[str] = None) -> FitCache:
+    """
+    Varsayılan fit cache'i yeni ayarlarla değiştirir.
+
+    Args:
+        maxsize: LRU katmanındaki maksimum kayıt sayısı
+        cache_path: Disk cache JSON dosyasının yolu (None ise disk katmanı kapalı)
+
+    Returns:
+        Yeni varsayılan FitCache
+    """
+    global _default_cache
+    _default_cache = FitCache(maxsize=maxsize, cache_path=cache_path)
+    return _default_cache
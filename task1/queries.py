@@ -0,0 +1,204 @@
+# queries.py
+# Task 1 - Kapalı form DAU / revenue sorguları
+# -ozgur
+
+"""
+Günlük array'leri oluşturmadan tek bir cevap döndüren sorgu fonksiyonları.
+"N. gündeki DAU" veya "N. güne kadar toplam revenue" gibi sorgular, retention kernel'inin
+prefix toplamları üzerinden hesaplanır. Power Law kernel'i için bu toplamlar
+genelleştirilmiş harmonik sayıların Euler-Maclaurin açılımı ile O(1) sürede ve sabit bellekle
+bulunur; bu sayede N çok büyük olsa bile sorgu maliyeti değişmez.
+"""
+
+import math
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from config import VariantConfig
+from retention_model import RetentionModel
+
+
+# Bu sayıdaki günlere kadar toplamlar doğrudan kernel üzerinden (tam) hesaplanır
+EXACT_SUM_THRESHOLD = 4096
+
+# Euler-Maclaurin'den önce tam olarak toplanan terim sayısı (kuyruğun hatasını küçültür)
+_EM_HEAD_TERMS = 16
+
+
+def _power_sum_tail(p: float, start: int, end: int) -> float:
+    """
+    sum_{k=start..end} k^p için Euler-Maclaurin yaklaşımı (start >= _EM_HEAD_TERMS).
+
+    Args:
+        p: Üs
+        start: İlk terim (dahil)
+        end: Son terim (dahil)
+
+    Returns:
+        Yaklaşık toplam
+    """
+    if end < start:
+        return 0.0
+    m, n = float(start), float(end)
+
+    if abs(p + 1.0) < 1e-12:
+        integral = math.log(n / m)
+    else:
+        integral = (n ** (p + 1.0) - m ** (p + 1.0)) / (p + 1.0)
+
+    # Bernoulli düzeltmeleri: B2/2!, B4/4!, B6/6!
+    d1 = p
+    d3 = p * (p - 1.0) * (p - 2.0)
+    d5 = d3 * (p - 3.0) * (p - 4.0)
+    correction = (
+        (d1 / 12.0) * (n ** (p - 1.0) - m ** (p - 1.0))
+        - (d3 / 720.0) * (n ** (p - 3.0) - m ** (p - 3.0))
+        + (d5 / 30240.0) * (n ** (p - 5.0) - m ** (p - 5.0))
+    )
+    return integral + (m ** p + n ** p) / 2.0 + correction
+
+
+def power_law_retention_sums(a: float, b: float, n: int) -> Tuple[float, float]:
+    """
+    Kırpılmış Power Law retention'ı r(k) = min(1, a * k^b) için
+    S0 = sum_{k=1..n} r(k) ve S1 = sum_{k=1..n} k * r(k) toplamlarını O(1) sürede hesaplar.
+
+    Args:
+        a: Scaling parametresi
+        b: Exponent parametresi (<= 0)
+        n: Gün sayısı
+
+    Returns:
+        (S0, S1)
+
+    Kullanım: Task 1 - Kapalı form sorgular
+    """
+    if n <= 0 or a <= 0:
+        return 0.0, 0.0
+
+    if b == 0:
+        value = min(1.0, a)
+        return n * value, value * n * (n + 1) / 2.0
+
+    # a * k^b >= 1 olan ilk K gün retention'ı 1'e kırpılır: K = floor(a^(-1/b))
+    log_k = -math.log(a) / b
+    if log_k >= math.log(n):
+        clipped = n
+    elif log_k < 0:
+        clipped = 0
+    else:
+        clipped = int(math.floor(math.exp(log_k)))
+        # Float hatalarına karşı sınırı düzelt
+        while clipped < n and a * (clipped + 1) ** b >= 1.0:
+            clipped += 1
+        while clipped > 0 and a * clipped ** b < 1.0:
+            clipped -= 1
+
+    s0 = float(clipped)
+    s1 = clipped * (clipped + 1) / 2.0
+    if clipped >= n:
+        return s0, s1
+
+    # Kırpılmayan bölümün başı tam olarak, kuyruğu Euler-Maclaurin ile toplanır
+    head_end = min(n, clipped + _EM_HEAD_TERMS)
+    head = np.arange(clipped + 1, head_end + 1, dtype=float)
+    head_values = a * head ** b
+    s0 += head_values.sum()
+    s1 += (head * head_values).sum()
+
+    s0 += a * _power_sum_tail(b, head_end + 1, n)
+    s1 += a * _power_sum_tail(b + 1.0, head_end + 1, n)
+    return s0, s1
+
+
+def retention_sums(retention_model: RetentionModel, n: int) -> Tuple[float, float]:
+    """
+    S0 = sum_{k=1..n} r(k) ve S1 = sum_{k=1..n} k * r(k) toplamlarını döndürür.
+    Küçük n için cache'lenmiş kernel'in prefix toplamı, büyük n için kapalı form kullanılır.
+
+    Args:
+        retention_model: Retention modeli instance'ı
+        n: Gün sayısı
+
+    Returns:
+        (S0, S1)
+    """
+    if n <= 0:
+        return 0.0, 0.0
+    if n <= EXACT_SUM_THRESHOLD:
+        kernel = retention_model.get_retention_kernel(n)
+        return float(kernel.sum()), float(np.dot(np.arange(1, n + 1), kernel))
+    return power_law_retention_sums(retention_model.a, retention_model.b, n)
+
+
+def dau_at_day(variant_config: VariantConfig, day: int, retention_model: Optional[RetentionModel] = None) -> float:
+    """
+    Sabit günlük install ile day. gündeki DAU'yu döndürür (simulate_variant(...)['dau'][day - 1]).
+    DAU(n) = daily_new_users * sum_{k=1..n} r(k)
+
+    Args:
+        variant_config: Varyant konfigürasyonu
+        day: Gün (1-indexed)
+        retention_model: Kullanılacak retention modeli (None ise config'ten oluşturulur)
+
+    Returns:
+        DAU değeri
+
+    Kullanım: Task 1 - Tekil gün sorguları
+    """
+    if retention_model is None:
+        retention_model = RetentionModel(variant_config.retention_points)
+    s0, _ = retention_sums(retention_model, day)
+    return variant_config.daily_new_users * s0
+
+
+def cumulative_dau(variant_config: VariantConfig, days: int, retention_model: Optional[RetentionModel] = None) -> float:
+    """
+    1..days günlerindeki DAU'ların toplamını döndürür.
+    sum_{d=1..n} DAU(d) = daily_new_users * sum_{k=1..n} (n - k + 1) * r(k)
+                       = daily_new_users * ((n + 1) * S0 - S1)
+
+    Args:
+        variant_config: Varyant konfigürasyonu
+        days: Gün sayısı
+        retention_model: Kullanılacak retention modeli (None ise config'ten oluşturulur)
+
+    Returns:
+        Kümülatif DAU (user-days)
+
+    Kullanım: Task 1 - Kümülatif sorgular
+    """
+    if retention_model is None:
+        retention_model = RetentionModel(variant_config.retention_points)
+    s0, s1 = retention_sums(retention_model, days)
+    return variant_config.daily_new_users * ((days + 1) * s0 - s1)
+
+
+def cumulative_revenue(
+    variant_config: VariantConfig,
+    days: int,
+    retention_model: Optional[RetentionModel] = None
+) -> Dict[str, float]:
+    """
+    days. güne kadar toplam revenue'yu döndürür (sabit monetizasyon parametreleriyle).
+    Revenue DAU'ya lineer olduğu için kümülatif DAU ile günlük kullanıcı başı gelirin çarpımıdır.
+
+    Args:
+        variant_config: Varyant konfigürasyonu
+        days: Gün sayısı
+        retention_model: Kullanılacak retention modeli (None ise config'ten oluşturulur)
+
+    Returns:
+        Toplam IAP, Ad ve Total revenue değerlerini içeren dictionary
+
+    Kullanım: Task 1 - Kümülatif revenue sorguları
+    """
+    user_days = cumulative_dau(variant_config, days, retention_model)
+    iap_revenue = user_days * variant_config.daily_purchase_ratio * variant_config.average_purchase_amount
+    ad_revenue = (user_days * variant_config.ad_impressions_per_dau / 1000.0) * variant_config.ecpm
+    return {
+        'iap_revenue': iap_revenue,
+        'ad_revenue': ad_revenue,
+        'total_revenue': iap_revenue + ad_revenue
+    }
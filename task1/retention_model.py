@@ -9,7 +9,9 @@ Power Law (a * t^b) eğrisi uydurur ve herhangi bir gün için retention oranın
 """
 
 import numpy as np
+from typing import Optional
 from scipy.optimize import curve_fit
+from fit_cache import FitCache, get_fit_cache, make_fit_key
 
 
 def power_law(t: float, a: float, b: float) -> float:
@@ -27,6 +29,60 @@ def power_law(t: float, a: float, b: float) -> float:
     return a * (t ** b)
 
 
+# curve_fit için parametre sınırları: a: [0, 2], b: [-2, 0]
+DEFAULT_BOUNDS = ([0, -2], [2, 0])
+
+
+def fit_power_law(retention_points: list[float], days: list[int], bounds=DEFAULT_BOUNDS) -> tuple[float, float]:
+    """
+    Verilen retention noktalarına Power Law eğrisi uydurur.
+    
+    Args:
+        retention_points: Retention değerleri listesi
+        days: Retention noktalarının hangi günlerde olduğu
+        bounds: Parametre sınırları ([a_min, b_min], [a_max, b_max])
+    
+    Returns:
+        (a, b) parametreleri (fitting başarısız olursa fallback parametreleri)
+    """
+    try:
+        return _curve_fit_power_law(retention_points, days, bounds)
+    except Exception as e:
+        return _fallback_parameters(retention_points, e)
+
+
+def _initial_parameters(retention_points: list[float]) -> tuple[float, float]:
+    """
+    curve_fit başlangıç değerleri.
+    İlk retention değerini a parametresinin başlangıç değeri olarak kullanıyoruz
+    b parametresi için -0.5 gibi bir başlangıç değeri kullanıyoruz (tipik retention eğrileri için)
+    """
+    initial_a = retention_points[0] if retention_points[0] > 0 else 0.5
+    return initial_a, -0.5
+
+
+def _curve_fit_power_law(retention_points: list[float], days: list[int], bounds) -> tuple[float, float]:
+    """curve_fit ile Power Law fit eder; fitting başarısız olursa hata yükseltir."""
+    # Curve fitting yapılıyor
+    # maxfev parametresi iterasyon sayısını artırıyor, daha iyi sonuç için
+    popt, _ = curve_fit(
+        power_law,
+        np.array(days),
+        np.array(retention_points),
+        p0=list(_initial_parameters(retention_points)),
+        maxfev=5000,
+        bounds=bounds
+    )
+    return float(popt[0]), float(popt[1])
+
+
+def _fallback_parameters(retention_points: list[float], error: Exception) -> tuple[float, float]:
+    """Fitting başarısız olduğunda kullanılan basit yaklaşım (başlangıç değerleri)."""
+    print(f"Warning: Curve fitting failed with error: {error}")
+    print("Using fallback parameters")
+    return _initial_parameters(retention_points)
+
+
 class RetentionModel:
     """
     Retention modeli sınıfı.
@@ -36,44 +92,56 @@ class RetentionModel:
     Kullanım: Task 1 - Tüm sorular (a-f)
     """
     
-    def __init__(self, retention_points: list[float], days: list[int] = None):
+    def __init__(self, retention_points: list[float], days: list[int] = None, fit_cache: Optional[FitCache] = None):
         """
         Retention modelini başlatır ve curve fitting yapar.
+        Aynı noktalar daha önce fit edildiyse parametreler fit cache'ten okunur.
         
         Args:
             retention_points: Retention değerleri listesi [Day 1, Day 3, Day 7, Day 14]
             days: Retention noktalarının hangi günlerde olduğu (varsayılan: [1, 3, 7, 14])
+            fit_cache: Kullanılacak fit cache (None ise varsayılan process cache'i)
         """
         if days is None:
             days = [1, 3, 7, 14]
+        if fit_cache is None:
+            fit_cache = get_fit_cache()
         
         self.retention_points = np.array(retention_points)
         self.days = np.array(days)
         
-        # Power Law parametrelerini fit et
-        # İlk retention değerini a parametresinin başlangıç değeri olarak kullanıyoruz
-        # b parametresi için -0.5 gibi bir başlangıç değeri kullanıyoruz (tipik retention eğrileri için)
-        initial_a = retention_points[0] if retention_points[0] > 0 else 0.5
-        initial_b = -0.5
-        
-        try:
-            # Curve fitting yapılıyor
-            # maxfev parametresi iterasyon sayısını artırıyor, daha iyi sonuç için
-            popt, _ = curve_fit(
-                power_law,
-                self.days,
-                self.retention_points,
-                p0=[initial_a, initial_b],
-                maxfev=5000,
-                bounds=([0, -2], [2, 0])  # a: [0, 2], b: [-2, 0] aralığında
-            )
-            self.a, self.b = popt
-        except Exception as e:
-            # Eğer fitting başarısız olursa, basit bir yaklaşım kullan
-            print(f"Warning: Curve fitting failed with error: {e}")
-            print("Using fallback parameters")
-            self.a = retention_points[0] if retention_points[0] > 0 else 0.5
-            self.b = -0.5
+        # Power Law parametrelerini fit et (veya cache'ten oku). Başarısız fit'lerin
+        # fallback parametreleri cache'e yazılmaz, bir sonraki seferde fit tekrar denenir
+        key = make_fit_key(retention_points, days, DEFAULT_BOUNDS)
+        self.a, self.b = fit_cache.get_or_fit(
+            key,
+            lambda: _curve_fit_power_law(retention_points, days, DEFAULT_BOUNDS),
+            lambda error: _fallback_parameters(retention_points, error)
+        )
+        
+        # Day 1..N retention değerleri için cache (get_retention_kernel ile büyür)
+        self._kernel = np.zeros(0)
+    
+    @classmethod
+    def from_parameters(cls, a: float, b: float, retention_points: list[float] = None, days: list[int] = None) -> "RetentionModel":
+        """
+        Fitting yapmadan, bilinen (a, b) parametreleriyle model oluşturur.
+        
+        Args:
+            a: Scaling parametresi
+            b: Exponent parametresi
+            retention_points: Modelin fit edildiği retention noktaları (opsiyonel, bilgi amaçlı)
+            days: Retention noktalarının günleri (varsayılan: [1, 3, 7, 14])
+        
+        Returns:
+            RetentionModel instance'ı
+        """
+        model = cls.__new__(cls)
+        model.retention_points = np.array(retention_points if retention_points is not None else [])
+        model.days = np.array(days if days is not None else [1, 3, 7, 14])
+        model.a, model.b = float(a), float(b)
+        model._kernel = np.zeros(0)
+        return model
     
     def get_retention(self, day: int) -> float:
         """
@@ -96,12 +164,196 @@ class RetentionModel:
     def get_retention_array(self, days: list[int]) -> np.ndarray:
         """
         Birden fazla gün için retention oranlarını döndürür.
+        Tüm günler tek bir NumPy ifadesiyle hesaplanır ve 0-1 aralığına kırpılır.
         
         Args:
-            days: Gün sayıları listesi
+            days: Gün sayıları listesi (veya array)
         
         Returns:
             Retention oranları array'i
         """
-        return np.array([self.get_retention(day) for day in days])
+        days = np.asarray(days, dtype=float)
+        retention = np.zeros(days.shape)
+        valid = days > 0
+        retention[valid] = np.clip(power_law(days[valid], self.a, self.b), 0.0, 1.0)
+        return retention
+    
+    def get_retention_kernel(self, n_days: int) -> np.ndarray:
+        """
+        Day 1..n_days için retention değerlerini döndürür (kernel[i] = Day i+1 retention'ı).
+        Sonuçlar model üzerinde cache'lenir; daha uzun bir kernel istendiğinde cache
+        en az iki katına büyütülür, böylece tekrarlanan simülasyonlar eğriyi yeniden hesaplamaz.
+        
+        Args:
+            n_days: Kernel uzunluğu
+        
+        Returns:
+            Salt okunur retention kernel array'i
+        
+        Kullanım: Task 1 - DAU engine
+        """
+        if n_days > len(self._kernel):
+            size = max(n_days, 2 * len(self._kernel))
+            self._kernel = self.get_retention_array(np.arange(1, size + 1))
+            self._kernel.flags.writeable = False
+        return self._kernel[:n_days]
 
+
+
+class RetentionModelBatch:
+    """
+    Array tabanlı retention modeli koleksiyonu.
+    N adet Power Law eğrisinin parametrelerini (a, b) array'lerinde tutar ve
+    tüm varyantlar için retention değerlerini tek seferde hesaplar.
+    
+    Kullanım: Task 1 - Çok sayıda varyantın toplu değerlendirilmesi
+    """
+    
+    def __init__(self, a: np.ndarray, b: np.ndarray, retention_points: np.ndarray = None, days: np.ndarray = None):
+        """
+        Args:
+            a: Scaling parametreleri (N,)
+            b: Exponent parametreleri (N,)
+            retention_points: Fit edilen retention noktaları (N x len(days)), opsiyonel
+            days: Retention noktalarının günleri
+        """
+        self.a = np.asarray(a, dtype=float)
+        self.b = np.asarray(b, dtype=float)
+        self.retention_points = retention_points
+        self.days = np.array(days if days is not None else [1, 3, 7, 14])
+    
+    def __len__(self) -> int:
+        return len(self.a)
+    
+    def __getitem__(self, index: int) -> RetentionModel:
+        """Tek bir varyant için RetentionModel döndürür."""
+        points = self.retention_points[index] if self.retention_points is not None else None
+        return RetentionModel.from_parameters(self.a[index], self.b[index], points, self.days)
+    
+    def get_retention_array(self, days) -> np.ndarray:
+        """
+        Tüm modeller için verilen günlerdeki retention oranlarını döndürür.
+        
+        Args:
+            days: Gün sayıları (D,)
+        
+        Returns:
+            Retention oranları matrisi (N x D)
+        """
+        days = np.asarray(days, dtype=float)
+        retention = np.zeros((len(self), len(days)))
+        valid = days > 0
+        retention[:, valid] = np.clip(
+            power_law(days[valid][None, :], self.a[:, None], self.b[:, None]), 0.0, 1.0
+        )
+        return retention
+    
+    def get_retention_kernel(self, n_days: int) -> np.ndarray:
+        """
+        Tüm modeller için Day 1..n_days retention kernel'lerini döndürür (N x n_days).
+        """
+        return self.get_retention_array(np.arange(1, n_days + 1))
+
+
+def fit_power_law_batch(
+    retention_matrix: np.ndarray,
+    days: list[int] = None,
+    bounds=DEFAULT_BOUNDS,
+    max_iter: int = 100,
+    tol: float = 1e-12
+) -> RetentionModelBatch:
+    """
+    N adet varyantın retention noktalarına Power Law eğrilerini birlikte uydurur.
+    
+    1. Başlangıç: log-log uzayında kapalı form en küçük kareler (log R = log a + b log t)
+    2. İyileştirme: vektörize Levenberg-Marquardt (damped Gauss-Newton) adımları,
+       curve_fit ile aynı amaç fonksiyonu (lineer uzayda kare hata) ve aynı bounds
+    
+    Args:
+        retention_matrix: Retention noktaları matrisi (N x len(days))
+        days: Retention noktalarının günleri (varsayılan: [1, 3, 7, 14])
+        bounds: Parametre sınırları ([a_min, b_min], [a_max, b_max])
+        max_iter: Maksimum iterasyon sayısı
+        tol: Kayıp fonksiyonundaki göreli iyileşme bu değerin altına düşünce durur
+    
+    Returns:
+        RetentionModelBatch
+    
+    Kullanım: Task 1 - Toplu varyant fitting
+    """
+    if days is None:
+        days = [1, 3, 7, 14]
+    y = np.atleast_2d(np.asarray(retention_matrix, dtype=float))
+    t = np.asarray(days, dtype=float)
+    (a_min, b_min), (a_max, b_max) = (bounds[0][0], bounds[0][1]), (bounds[1][0], bounds[1][1])
+    log_t = np.log(t)
+    
+    # Warm start: pozitif noktalar üzerinde ağırlıklı log-log regresyon
+    positive = y > 0
+    log_y = np.log(np.where(positive, y, 1.0))
+    w = positive.astype(float)
+    n_pos = w.sum(axis=1)
+    safe_n = np.maximum(n_pos, 1.0)
+    mean_x = (w * log_t).sum(axis=1) / safe_n
+    mean_y = (w * log_y).sum(axis=1) / safe_n
+    dx = np.where(positive, log_t - mean_x[:, None], 0.0)
+    var_x = (dx * dx).sum(axis=1)
+    cov_xy = (dx * (log_y - mean_y[:, None])).sum(axis=1)
+    enough = (n_pos >= 2) & (var_x > 0)
+    b = np.where(enough, cov_xy / np.where(enough, var_x, 1.0), -0.5)
+    a = np.where(enough, np.exp(mean_y - b * mean_x), np.where(y[:, 0] > 0, y[:, 0], 0.5))
+    a = np.clip(a, a_min, a_max)
+    b = np.clip(b, b_min, b_max)
+    
+    def cost(a, b):
+        residual = a[:, None] * t[None, :] ** b[:, None] - y
+        return (residual * residual).sum(axis=1)
+    
+    current = cost(a, b)
+    damping = np.full(len(a), 1e-3)
+    active = np.ones(len(a), dtype=bool)
+    
+    for _ in range(max_iter):
+        if not active.any():
+            break
+        t_pow = t[None, :] ** b[:, None]
+        residual = a[:, None] * t_pow - y
+        j_a = t_pow
+        j_b = a[:, None] * t_pow * log_t[None, :]
+        
+        # 2x2 normal denklemleri: (J^T J + lambda * diag(J^T J)) delta = -J^T r
+        h_aa = (j_a * j_a).sum(axis=1)
+        h_ab = (j_a * j_b).sum(axis=1)
+        h_bb = (j_b * j_b).sum(axis=1)
+        g_a = (j_a * residual).sum(axis=1)
+        g_b = (j_b * residual).sum(axis=1)
+        d_aa = h_aa * (1.0 + damping) + 1e-18
+        d_bb = h_bb * (1.0 + damping) + 1e-18
+        det = d_aa * d_bb - h_ab * h_ab
+        det = np.where(np.abs(det) > 0, det, 1e-18)
+        delta_a = -(d_bb * g_a - h_ab * g_b) / det
+        delta_b = -(d_aa * g_b - h_ab * g_a) / det
+        
+        # Sınırda duran ve adımı sınır dışına iten parametre sabitlenir,
+        # diğer parametre tek boyutlu problem olarak çözülür (active-set)
+        pin_b = ((b <= b_min) & (delta_b < 0)) | ((b >= b_max) & (delta_b > 0))
+        pin_a = ((a <= a_min) & (delta_a < 0)) | ((a >= a_max) & (delta_a > 0))
+        delta_a = np.where(pin_b & ~pin_a, -g_a / d_aa, np.where(pin_a, 0.0, delta_a))
+        delta_b = np.where(pin_a & ~pin_b, -g_b / d_bb, np.where(pin_b, 0.0, delta_b))
+        
+        new_a = np.clip(a + delta_a, a_min, a_max)
+        new_b = np.clip(b + delta_b, b_min, b_max)
+        new_cost = cost(new_a, new_b)
+        
+        improved = active & (new_cost < current)
+        gain = np.where(improved, current - new_cost, 0.0)
+        a = np.where(improved, new_a, a)
+        b = np.where(improved, new_b, b)
+        damping = np.where(improved, damping * 0.3, damping * 10.0)
+        
+        # Yakınsama: kayıp artık anlamlı iyileşmiyor veya damping çok büyüdü
+        converged = (improved & (gain <= tol * np.maximum(current, 1e-300))) | (damping > 1e12)
+        current = np.where(improved, new_cost, current)
+        active &= ~converged
+    
+    return RetentionModelBatch(a, b, retention_points=y, days=np.asarray(days))
@@ -8,7 +8,7 @@ Her soru için gerekli simülasyonları yapar ve sonuçları ekrana basar.
 """
 
 from config import VARIANT_A, VARIANT_B, VariantConfig
-from simulation import simulate_variant, calculate_dau_with_mixed_sources, exponential_retention, calculate_revenue
+from simulation import simulate_variant, calculate_dau_with_mixed_sources, exponential_retention, calculate_revenue, PiecewiseSchedule
 from retention_model import RetentionModel
 from visualization import create_all_visualizations, plot_dau_comparison, plot_revenue_comparison, plot_cumulative_revenue
 import numpy as np
@@ -141,42 +141,18 @@ def task1_d():
     total_revenue_a_normal = np.sum(result_a_normal['total_revenue'])
     total_revenue_b_normal = np.sum(result_b_normal['total_revenue'])
     
-    # Sale ile simülasyonlar
-    result_a_sale = simulate_variant(VARIANT_A, days)
-    result_b_sale = simulate_variant(VARIANT_B, days)
-    
-    # Sale günlerinde (15-24) purchase ratio'yu %1 artır
-    for day in range(sale_start_day - 1, min(sale_start_day - 1 + sale_duration, days)):
-        dau_a = result_a_sale['dau'][day]
-        dau_b = result_b_sale['dau'][day]
-        
-        # Purchase ratio'yu %1 absolute artır
-        purchase_ratio_a_sale = VARIANT_A.daily_purchase_ratio + purchase_rate_boost
-        purchase_ratio_b_sale = VARIANT_B.daily_purchase_ratio + purchase_rate_boost
-        
-        # Revenue'yu yeniden hesapla
-        revenue_info_a = calculate_revenue(
-            dau=np.array([dau_a]),
-            daily_purchase_ratio=purchase_ratio_a_sale,
-            ecpm=VARIANT_A.ecpm,
-            ad_impressions_per_dau=VARIANT_A.ad_impressions_per_dau,
-            average_purchase_amount=VARIANT_A.average_purchase_amount
-        )
-        revenue_info_b = calculate_revenue(
-            dau=np.array([dau_b]),
-            daily_purchase_ratio=purchase_ratio_b_sale,
-            ecpm=VARIANT_B.ecpm,
-            ad_impressions_per_dau=VARIANT_B.ad_impressions_per_dau,
-            average_purchase_amount=VARIANT_B.average_purchase_amount
-        )
-        
-        result_a_sale['iap_revenue'][day] = revenue_info_a['iap_revenue'][0]
-        result_a_sale['ad_revenue'][day] = revenue_info_a['ad_revenue'][0]
-        result_a_sale['total_revenue'][day] = revenue_info_a['total_revenue'][0]
-        
-        result_b_sale['iap_revenue'][day] = revenue_info_b['iap_revenue'][0]
-        result_b_sale['ad_revenue'][day] = revenue_info_b['ad_revenue'][0]
-        result_b_sale['total_revenue'][day] = revenue_info_b['total_revenue'][0]
+    # Sale ile simülasyonlar - sale günlerinde (15-24) purchase ratio %1 absolute artırılır
+    sale_end_day = sale_start_day + sale_duration - 1
+    purchase_ratio_a_sale = PiecewiseSchedule(
+        VARIANT_A.daily_purchase_ratio,
+        [(sale_start_day, sale_end_day, VARIANT_A.daily_purchase_ratio + purchase_rate_boost)]
+    )
+    purchase_ratio_b_sale = PiecewiseSchedule(
+        VARIANT_B.daily_purchase_ratio,
+        [(sale_start_day, sale_end_day, VARIANT_B.daily_purchase_ratio + purchase_rate_boost)]
+    )
+    result_a_sale = simulate_variant(VARIANT_A, days, daily_purchase_ratio=purchase_ratio_a_sale)
+    result_b_sale = simulate_variant(VARIANT_B, days, daily_purchase_ratio=purchase_ratio_b_sale)
     
     total_revenue_a_sale = np.sum(result_a_sale['total_revenue'])
     total_revenue_b_sale = np.sum(result_b_sale['total_revenue'])
@@ -339,33 +315,17 @@ def task1_f():
         Sale senaryosunu hem Variant A'ya hem Variant B'ye uygular.
         Her iki varyantın sonuçlarını döndürür ve kazananı belirler.
         """
-        result_a_sale = simulate_variant(VARIANT_A, days)
-        result_b_sale = simulate_variant(VARIANT_B, days)
-        
-        for day in range(sale_start_day - 1, min(sale_start_day - 1 + sale_duration, days)):
-            dau_a = result_a_sale['dau'][day]
-            dau_b = result_b_sale['dau'][day]
-            
-            purchase_ratio_a_sale = VARIANT_A.daily_purchase_ratio + purchase_rate_boost
-            purchase_ratio_b_sale = VARIANT_B.daily_purchase_ratio + purchase_rate_boost
-            
-            revenue_info_a = calculate_revenue(
-                dau=np.array([dau_a]),
-                daily_purchase_ratio=purchase_ratio_a_sale,
-                ecpm=VARIANT_A.ecpm,
-                ad_impressions_per_dau=VARIANT_A.ad_impressions_per_dau,
-                average_purchase_amount=VARIANT_A.average_purchase_amount
-            )
-            revenue_info_b = calculate_revenue(
-                dau=np.array([dau_b]),
-                daily_purchase_ratio=purchase_ratio_b_sale,
-                ecpm=VARIANT_B.ecpm,
-                ad_impressions_per_dau=VARIANT_B.ad_impressions_per_dau,
-                average_purchase_amount=VARIANT_B.average_purchase_amount
-            )
-            
-            result_a_sale['total_revenue'][day] = revenue_info_a['total_revenue'][0]
-            result_b_sale['total_revenue'][day] = revenue_info_b['total_revenue'][0]
+        sale_end_day = sale_start_day + sale_duration - 1
+        purchase_ratio_a_sale = PiecewiseSchedule(
+            VARIANT_A.daily_purchase_ratio,
+            [(sale_start_day, sale_end_day, VARIANT_A.daily_purchase_ratio + purchase_rate_boost)]
+        )
+        purchase_ratio_b_sale = PiecewiseSchedule(
+            VARIANT_B.daily_purchase_ratio,
+            [(sale_start_day, sale_end_day, VARIANT_B.daily_purchase_ratio + purchase_rate_boost)]
+        )
+        result_a_sale = simulate_variant(VARIANT_A, days, daily_purchase_ratio=purchase_ratio_a_sale)
+        result_b_sale = simulate_variant(VARIANT_B, days, daily_purchase_ratio=purchase_ratio_b_sale)
         
         total_revenue_sale_a = np.sum(result_a_sale['total_revenue'])
         total_revenue_sale_b = np.sum(result_b_sale['total_revenue'])
@@ -8,11 +8,74 @@ Retention modelini kullanarak günlük aktif kullanıcı sayısını ve gelirler
 """
 
 import numpy as np
-from typing import Dict, Callable, Optional
-from retention_model import RetentionModel
+from dataclasses import dataclass
+from typing import Dict, Callable, List, Optional, Sequence, Tuple, Union
+from retention_model import RetentionModel, fit_power_law_batch
 from config import VariantConfig
 
 
+# Bu uzunluğun üzerindeki horizon'larda convolution FFT ile yapılır (O(n log n)).
+# Daha kısa horizon'larda np.convolve'un direkt toplamı hem daha hızlı hem de daha hassas.
+FFT_CONVOLUTION_THRESHOLD = 1024
+
+
+@dataclass
+class PiecewiseSchedule:
+    """
+    Gün bazlı parametre planı için kompakt gösterim.
+    default değeri tüm günlere uygulanır; segments içindeki (start_day, end_day, value)
+    aralıkları (1-indexed, end_day dahil) bu değeri ezer. Sonraki segment öncekini ezer.
+    
+    Örnek: 15-24. günlerde %1 sale -> PiecewiseSchedule(0.0305, [(15, 24, 0.0405)])
+    
+    Kullanım: Task 1 - Soru d, f ve promo takvimleri
+    """
+    default: float
+    segments: List[Tuple[int, int, float]]
+    
+    def to_array(self, days: int) -> np.ndarray:
+        """
+        Planı gün bazlı array'e açar.
+        
+        Args:
+            days: Gün sayısı
+        
+        Returns:
+            Her gün için parametre değerini içeren array
+        """
+        values = np.full(days, float(self.default))
+        for start_day, end_day, value in self.segments:
+            values[max(start_day - 1, 0):max(end_day, 0)] = value
+        return values
+
+
+# Monetizasyon parametreleri sabit sayı, gün bazlı array veya PiecewiseSchedule olabilir
+ScheduleSpec = Union[float, np.ndarray, Sequence[float], PiecewiseSchedule]
+
+
+def resolve_schedule(schedule: ScheduleSpec, days: int) -> Union[float, np.ndarray]:
+    """
+    Monetizasyon parametresini hesaplamaya hazır hale getirir.
+    Sabit sayılar olduğu gibi döner; plan ve listeler gün bazlı array'e çevrilir.
+    
+    Args:
+        schedule: Sabit değer, gün bazlı array veya PiecewiseSchedule
+        days: Gün sayısı
+    
+    Returns:
+        Sabit değer veya uzunluğu days olan array
+    """
+    if isinstance(schedule, PiecewiseSchedule):
+        return schedule.to_array(days)
+    if np.ndim(schedule) == 0:
+        return schedule
+    
+    values = np.asarray(schedule, dtype=float)
+    if len(values) != days:
+        raise ValueError(f"Gün bazlı parametre uzunluğu ({len(values)}) gün sayısına ({days}) eşit olmalı")
+    return values
+
+
 def calculate_dau(retention_model: RetentionModel, daily_new_users: int, days: int) -> np.ndarray:
     """
     Her gün için DAU (Daily Active Users) hesaplar.
@@ -47,34 +110,143 @@ def calculate_dau(retention_model: RetentionModel, daily_new_users: int, days: i
     return dau
 
 
-def simulate_variant(variant_config: VariantConfig, days: int) -> Dict[str, np.ndarray]:
+def convolve_cohorts(installs: np.ndarray, retention_kernel: np.ndarray) -> np.ndarray:
+    """
+    Günlük install vektörünü retention kernel'i ile convolve ederek DAU hesaplar.
+    DAU[d] = sum_{c=1..d} installs[c] * retention[d - c + 1]
+    
+    Args:
+        installs: Her gün gelen yeni kullanıcı sayıları (uzunluk = gün sayısı)
+        retention_kernel: Day 1, 2, 3, ... için retention oranları (en az installs kadar uzun)
+    
+    Returns:
+        Her gün için DAU değerlerini içeren array
+    
+    Kullanım: Task 1 - DAU engine
+    """
+    installs = np.asarray(installs, dtype=float)
+    days = len(installs)
+    kernel = np.asarray(retention_kernel, dtype=float)[:days]
+    
+    if days == 0:
+        return np.zeros(0)
+    
+    if days <= FFT_CONVOLUTION_THRESHOLD:
+        return np.convolve(installs, kernel)[:days]
+    
+    # FFT boyutu: lineer convolution için en az 2n - 1, hız için 2'nin kuvveti
+    n_fft = 1 << int(2 * days - 1).bit_length()
+    spectrum = np.fft.rfft(installs, n_fft) * np.fft.rfft(kernel, n_fft)
+    return np.fft.irfft(spectrum, n_fft)[:days]
+
+
+def calculate_dau_convolution(
+    retention_model: RetentionModel,
+    daily_new_users: Union[int, np.ndarray],
+    days: int
+) -> np.ndarray:
+    """
+    calculate_dau ile aynı sonucu convolution ile hesaplar.
+    Cohort döngüsü yerine retention kernel'i bir kez hesaplanır ve install vektörüyle convolve edilir.
+    
+    Args:
+        retention_model: Retention modeli instance'ı
+        daily_new_users: Her gün gelen yeni kullanıcı sayısı (sabit sayı veya gün bazlı array)
+        days: Simüle edilecek gün sayısı
+    
+    Returns:
+        Her gün için DAU değerlerini içeren array
+    
+    Kullanım: Task 1 - Soru a, c, d, e, f
+    """
+    if days <= 0:
+        return np.zeros(0)
+    
+    kernel = retention_model.get_retention_kernel(days)
+    
+    if np.ndim(daily_new_users) == 0:
+        # Sabit install sayısında convolution kümülatif toplama indirgenir
+        return daily_new_users * np.cumsum(kernel)
+    
+    installs = np.asarray(daily_new_users, dtype=float)
+    if len(installs) != days:
+        raise ValueError(f"daily_new_users uzunluğu ({len(installs)}) gün sayısına ({days}) eşit olmalı")
+    
+    return convolve_cohorts(installs, kernel)
+
+
+def simulate_variant(
+    variant_config: VariantConfig,
+    days: int,
+    daily_purchase_ratio: Optional[ScheduleSpec] = None,
+    ecpm: Optional[ScheduleSpec] = None,
+    ad_impressions_per_dau: Optional[ScheduleSpec] = None,
+    average_purchase_amount: Optional[ScheduleSpec] = None,
+    n_replicates: Optional[int] = None,
+    seed: Optional[int] = None,
+    retention_sample_size: Optional[int] = None,
+    percentiles: Optional[Sequence[float]] = None,
+    batch_size: Optional[int] = None
+) -> Dict[str, np.ndarray]:
     """
     Bir varyant için simülasyon çalıştırır.
     DAU ve revenue hesaplamalarını yapar.
+    Monetizasyon parametreleri verilirse varyant config'indeki değerlerin yerine kullanılır
+    (sabit değer, gün bazlı array veya PiecewiseSchedule).
+    n_replicates verilirse deterministik sonuç yerine Monte Carlo percentile bantları döner
+    (bkz. simulate_variant_monte_carlo).
     
     Args:
         variant_config: Varyant konfigürasyonu
         days: Simüle edilecek gün sayısı
+        daily_purchase_ratio: Günlük satın alma oranı planı (None ise config değeri)
+        ecpm: eCPM planı (None ise config değeri)
+        ad_impressions_per_dau: DAU başına ad impression planı (None ise config değeri)
+        average_purchase_amount: Ortalama satın alma tutarı planı (None ise config değeri)
+        n_replicates: Monte Carlo replicate sayısı (None ise deterministik mod)
+        seed: Monte Carlo RNG seed'i
+        retention_sample_size: Monte Carlo retention örneklem büyüklüğü (None ise varsayılan)
+        percentiles: Monte Carlo percentile'ları (None ise varsayılan)
+        batch_size: Monte Carlo batch büyüklüğü (None ise varsayılan)
     
     Returns:
         DAU ve revenue bilgilerini içeren dictionary
     
     Kullanım: Task 1 - Tüm sorular (a-f)
     """
+    monetization = {
+        'daily_purchase_ratio': variant_config.daily_purchase_ratio if daily_purchase_ratio is None else daily_purchase_ratio,
+        'ecpm': variant_config.ecpm if ecpm is None else ecpm,
+        'ad_impressions_per_dau': variant_config.ad_impressions_per_dau if ad_impressions_per_dau is None else ad_impressions_per_dau,
+        'average_purchase_amount': variant_config.average_purchase_amount if average_purchase_amount is None else average_purchase_amount
+    }
+    
+    # Verilen Monte Carlo seçenekleri; yalnızca n_replicates ile anlamlıdır
+    monte_carlo_options = {
+        name: value for name, value in (
+            ('seed', seed), ('retention_sample_size', retention_sample_size),
+            ('percentiles', percentiles), ('batch_size', batch_size)
+        ) if value is not None
+    }
+    
+    if n_replicates is not None:
+        return simulate_variant_monte_carlo(
+            variant_config, days, n_replicates=n_replicates,
+            monetization=monetization, **monte_carlo_options
+        )
+    if monte_carlo_options:
+        raise TypeError(
+            f"Monte Carlo seçenekleri ({', '.join(monte_carlo_options)}) yalnızca n_replicates ile kullanılabilir"
+        )
+    
     # Retention modelini oluştur
     retention_model = RetentionModel(variant_config.retention_points)
     
-    # DAU hesapla
-    dau = calculate_dau(retention_model, variant_config.daily_new_users, days)
+    # DAU hesapla (convolution engine)
+    dau = calculate_dau_convolution(retention_model, variant_config.daily_new_users, days)
     
     # Revenue hesapla
-    revenue_info = calculate_revenue(
-        dau=dau,
-        daily_purchase_ratio=variant_config.daily_purchase_ratio,
-        ecpm=variant_config.ecpm,
-        ad_impressions_per_dau=variant_config.ad_impressions_per_dau,
-        average_purchase_amount=variant_config.average_purchase_amount
-    )
+    revenue_info = calculate_revenue(dau=dau, **monetization)
     
     return {
         'dau': dau,
@@ -84,16 +256,125 @@ def simulate_variant(variant_config: VariantConfig, days: int) -> Dict[str, np.n
     }
 
 
+def convolve_cohorts_batch(installs: np.ndarray, retention_kernels: np.ndarray) -> np.ndarray:
+    """
+    Birden fazla (install, retention kernel) çiftinin convolution'ını tek seferde hesaplar.
+    
+    Args:
+        installs: Install matrisi (N x days)
+        retention_kernels: Retention kernel matrisi (N x days) veya tek kernel (days,)
+    
+    Returns:
+        DAU matrisi (N x days)
+    
+    Kullanım: Task 1 - Monte Carlo simülasyonu
+    """
+    installs = np.atleast_2d(np.asarray(installs, dtype=float))
+    days = installs.shape[1]
+    kernels = np.atleast_2d(np.asarray(retention_kernels, dtype=float))[:, :days]
+    n_fft = 1 << int(2 * days - 1).bit_length()
+    spectrum = np.fft.rfft(installs, n_fft, axis=1) * np.fft.rfft(kernels, n_fft, axis=1)
+    return np.fft.irfft(spectrum, n_fft, axis=1)[:, :days]
+
+
+def simulate_variant_monte_carlo(
+    variant_config: VariantConfig,
+    days: int,
+    n_replicates: int = 10000,
+    seed: Optional[int] = None,
+    retention_sample_size: int = 10000,
+    percentiles: Sequence[float] = (5, 50, 95),
+    batch_size: int = 10000,
+    monetization: Optional[Dict[str, ScheduleSpec]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    Bir varyant için Monte Carlo belirsizlik simülasyonu çalıştırır.
+    Her replicate için:
+    - Retention noktaları Binomial(retention_sample_size, p) / retention_sample_size ile örneklenir
+      ve Power Law eğrisi yeniden fit edilir (fit_power_law_batch)
+    - Günlük install'lar Poisson(daily_new_users) ile çekilir
+    - Günlük satın alma sayısı Binomial(DAU, daily_purchase_ratio) ile çekilir
+    Replicate'ler batch_size'lık bloklar halinde NumPy matrisleri olarak hesaplanır.
+    
+    Args:
+        variant_config: Varyant konfigürasyonu
+        days: Simüle edilecek gün sayısı
+        n_replicates: Replicate sayısı
+        seed: RNG seed'i (aynı seed ve batch_size ile sonuçlar tekrarlanabilir)
+        retention_sample_size: Retention ölçümünün yapıldığı cohort büyüklüğü
+        percentiles: Döndürülecek percentile'lar
+        batch_size: Bellekte aynı anda hesaplanan maksimum replicate sayısı
+        monetization: Config değerlerini ezen monetizasyon planları (calculate_revenue parametreleri)
+    
+    Returns:
+        'percentiles' ve her metrik için (len(percentiles) x days) percentile bantlarını,
+        ayrıca horizon toplam revenue'sunun percentile'larını içeren dictionary
+    
+    Kullanım: Task 1 - Belirsizlik analizi
+    """
+    percentiles = np.asarray(percentiles, dtype=float)
+    retention_points = np.asarray(variant_config.retention_points, dtype=float)
+    
+    # Monetizasyon parametreleri (sabit veya gün bazlı; gün ekseni boyunca broadcast edilir)
+    params = {
+        'daily_purchase_ratio': variant_config.daily_purchase_ratio,
+        'ecpm': variant_config.ecpm,
+        'ad_impressions_per_dau': variant_config.ad_impressions_per_dau,
+        'average_purchase_amount': variant_config.average_purchase_amount
+    }
+    params.update(monetization or {})
+    params = {name: resolve_schedule(value, days) for name, value in params.items()}
+    n_batches = -(-n_replicates // batch_size)
+    rngs = [np.random.default_rng(s) for s in np.random.SeedSequence(seed).spawn(n_batches)]
+    
+    # Replicate yörüngeleri percentile hesabı için float32 olarak saklanır
+    metrics = ('dau', 'iap_revenue', 'ad_revenue', 'total_revenue')
+    samples = {name: np.empty((n_replicates, days), dtype=np.float32) for name in metrics}
+    
+    for batch_index, rng in enumerate(rngs):
+        start = batch_index * batch_size
+        size = min(batch_size, n_replicates - start)
+        
+        # Gürültülü retention ölçümleri ve yeniden fit
+        measured = rng.binomial(retention_sample_size, retention_points, size=(size, len(retention_points)))
+        models = fit_power_law_batch(measured / retention_sample_size)
+        kernels = models.get_retention_kernel(days)
+        
+        # Poisson install'lar ve batch convolution ile DAU
+        installs = rng.poisson(variant_config.daily_new_users, size=(size, days))
+        dau = np.maximum(convolve_cohorts_batch(installs, kernels), 0.0)
+        
+        # Binomial satın almalar
+        purchases = rng.binomial(np.rint(dau).astype(np.int64), params['daily_purchase_ratio'])
+        iap_revenue = purchases * params['average_purchase_amount']
+        ad_revenue = (dau * params['ad_impressions_per_dau'] / 1000.0) * params['ecpm']
+        
+        samples['dau'][start:start + size] = dau
+        samples['iap_revenue'][start:start + size] = iap_revenue
+        samples['ad_revenue'][start:start + size] = ad_revenue
+        samples['total_revenue'][start:start + size] = iap_revenue + ad_revenue
+    
+    result = {'percentiles': percentiles}
+    for name in metrics:
+        result[name] = np.percentile(samples[name], percentiles, axis=0)
+    result['cumulative_total_revenue'] = np.percentile(
+        samples['total_revenue'].sum(axis=1, dtype=float), percentiles
+    )
+    return result
+
+
 def calculate_revenue(
     dau: np.ndarray,
-    daily_purchase_ratio: float,
-    ecpm: float,
-    ad_impressions_per_dau: float,
-    average_purchase_amount: float
+    daily_purchase_ratio: ScheduleSpec,
+    ecpm: ScheduleSpec,
+    ad_impressions_per_dau: ScheduleSpec,
+    average_purchase_amount: ScheduleSpec
 ) -> Dict[str, np.ndarray]:
     """
     Her gün için revenue hesaplar.
     IAP (In-App Purchase) ve Ad revenue'larını ayrı ayrı hesaplar.
+    Tüm monetizasyon parametreleri sabit değer, gün bazlı array veya PiecewiseSchedule
+    olabilir; tüm horizon tek bir vektörize işlemle hesaplanır.
     
     Args:
         dau: Her gün için DAU değerleri
@@ -107,6 +388,12 @@ def calculate_revenue(
     
     Kullanım: Task 1 - Soru b, c, d, e, f
     """
+    days = len(dau)
+    daily_purchase_ratio = resolve_schedule(daily_purchase_ratio, days)
+    ecpm = resolve_schedule(ecpm, days)
+    ad_impressions_per_dau = resolve_schedule(ad_impressions_per_dau, days)
+    average_purchase_amount = resolve_schedule(average_purchase_amount, days)
+    
     # IAP Revenue = DAU * daily_purchase_ratio * average_purchase_amount
     iap_revenue = dau * daily_purchase_ratio * average_purchase_amount
     
@@ -146,6 +433,107 @@ def exponential_retention(day: int, base: float, decay: float) -> float:
     return max(0.0, min(1.0, retention))
 
 
+class ExponentialRetention:
+    """
+    Exponential retention modeli: Retention = base * e^(-decay * (day - 1))
+    Hem tek gün için çağrılabilir (retention(day)) hem de vektörize kernel üretir.
+    
+    Kullanım: Task 1 - Soru e (yeni kullanıcı kaynağı retention'ı)
+    """
+    
+    def __init__(self, base: float, decay: float):
+        """
+        Args:
+            base: Başlangıç retention değeri
+            decay: Decay parametresi
+        """
+        self.base = base
+        self.decay = decay
+    
+    def __call__(self, day: int) -> float:
+        return exponential_retention(day, self.base, self.decay)
+    
+    def get_retention_kernel(self, n_days: int) -> np.ndarray:
+        """
+        Day 1..n_days için retention değerlerini döndürür.
+        """
+        days = np.arange(1, n_days + 1)
+        return np.clip(self.base * np.exp(-self.decay * (days - 1)), 0.0, 1.0)
+
+
+RetentionSpec = Union[RetentionModel, ExponentialRetention, np.ndarray, Sequence[float], Callable[[int], float]]
+
+
+@dataclass
+class AcquisitionSource:
+    """
+    Bir kullanıcı edinim kaynağı: gün bazlı install planı ve kaynağa özel retention.
+    retention bir RetentionModel, ExponentialRetention, tablo halinde retention değerleri
+    (Day 1, 2, 3, ... sırasıyla) ya da day -> retention fonksiyonu olabilir.
+    
+    Kullanım: Task 1 - Çok kaynaklı DAU hesabı
+    """
+    name: str
+    installs: np.ndarray  # Her gün bu kaynaktan gelen yeni kullanıcı sayısı (Day 1'den itibaren)
+    retention: RetentionSpec
+
+
+def build_retention_kernel(retention: RetentionSpec, n_days: int) -> np.ndarray:
+    """
+    Farklı retention tanımlarından Day 1..n_days retention kernel'i oluşturur.
+    
+    Args:
+        retention: RetentionModel, ExponentialRetention, tablo (array) veya day -> retention fonksiyonu
+        n_days: Kernel uzunluğu
+    
+    Returns:
+        Retention kernel array'i (tablo kısa kalırsa kalan günler 0)
+    
+    Kullanım: Task 1 - Çok kaynaklı DAU hesabı
+    """
+    if hasattr(retention, 'get_retention_kernel'):
+        return retention.get_retention_kernel(n_days)
+    if callable(retention):
+        # Fonksiyon her gün için yalnızca bir kez çağrılır
+        return np.array([retention(day) for day in range(1, n_days + 1)], dtype=float)
+    
+    table = np.asarray(retention, dtype=float)[:n_days]
+    kernel = np.zeros(n_days)
+    kernel[:len(table)] = table
+    return kernel
+
+
+def calculate_dau_multi_source(sources: List[AcquisitionSource], days: int) -> Dict[str, np.ndarray]:
+    """
+    Herhangi sayıda kullanıcı kaynağı için DAU hesaplar.
+    Her kaynağın install planı kendi retention kernel'i ile convolve edilir.
+    
+    Args:
+        sources: Kullanıcı kaynakları
+        days: Simüle edilecek gün sayısı
+    
+    Returns:
+        Kaynak adı -> DAU array'i ve toplam DAU için 'total' anahtarını içeren dictionary
+    
+    Kullanım: Task 1 - Soru e ve çok kaynaklı UA senaryoları
+    """
+    result = {}
+    total = np.zeros(days)
+    
+    for source in sources:
+        # Install planı horizon'a göre kırpılır veya 0 ile doldurulur
+        installs = np.zeros(days)
+        schedule = np.asarray(source.installs, dtype=float)[:days]
+        installs[:len(schedule)] = schedule
+        
+        dau = convolve_cohorts(installs, build_retention_kernel(source.retention, days))
+        result[source.name] = dau
+        total += dau
+    
+    result['total'] = total
+    return result
+
+
 def calculate_dau_with_mixed_sources(
     retention_model_old: RetentionModel,
     retention_func_new: Callable[[int], float],
@@ -158,6 +546,7 @@ def calculate_dau_with_mixed_sources(
     """
     İki farklı kullanıcı kaynağı için DAU hesaplar.
     Belirli bir günden itibaren yeni kaynak eklenir.
+    calculate_dau_multi_source üzerine kurulu iki kaynaklı özel durumdur.
     
     Args:
         retention_model_old: Eski kullanıcılar için retention modeli
@@ -174,39 +563,19 @@ def calculate_dau_with_mixed_sources(
     
     Kullanım: Task 1 - Soru e
     """
-    dau = np.zeros(days)
-    
     # Yeni kaynak başlamadan önce gelen kullanıcı sayısı
     if daily_new_users_before_new_source is None:
         daily_new_users_before_new_source = daily_new_users_old + daily_new_users_new
     
-    for current_day in range(1, days + 1):
-        total_dau = 0
-        
-        # Yeni kaynak başlamadan önceki günlerden gelen kullanıcılar (tümü eski kaynak)
-        for cohort_day in range(1, min(new_source_start_day, current_day + 1)):
-            days_since_cohort = current_day - cohort_day + 1
-            retention_rate = retention_model_old.get_retention(days_since_cohort)
-            active_from_cohort = daily_new_users_before_new_source * retention_rate
-            total_dau += active_from_cohort
-        
-        # Yeni kaynak başladıktan sonraki günlerden gelen kullanıcılar
-        if current_day >= new_source_start_day:
-            # Eski kaynaktan gelen kullanıcılar (20. günden itibaren)
-            for cohort_day in range(new_source_start_day, current_day + 1):
-                days_since_cohort = current_day - cohort_day + 1
-                retention_rate = retention_model_old.get_retention(days_since_cohort)
-                active_from_cohort = daily_new_users_old * retention_rate
-                total_dau += active_from_cohort
-            
-            # Yeni kaynaktan gelen kullanıcılar (20. günden itibaren)
-            for cohort_day in range(new_source_start_day, current_day + 1):
-                days_since_cohort = current_day - cohort_day + 1
-                retention_rate = retention_func_new(days_since_cohort)
-                active_from_cohort = daily_new_users_new * retention_rate
-                total_dau += active_from_cohort
-        
-        dau[current_day - 1] = total_dau
+    # Install planları: yeni kaynak başlangıç gününden önce tüm kullanıcılar eski kaynaktan gelir
+    switch_index = max(0, min(new_source_start_day - 1, days))
+    installs_old = np.full(days, float(daily_new_users_old))
+    installs_old[:switch_index] = daily_new_users_before_new_source
+    installs_new = np.full(days, float(daily_new_users_new))
+    installs_new[:switch_index] = 0.0
     
-    return dau
-
+    sources = [
+        AcquisitionSource(name='old', installs=installs_old, retention=retention_model_old),
+        AcquisitionSource(name='new', installs=installs_new, retention=retention_func_new)
+    ]
+    return calculate_dau_multi_source(sources, days)['total']
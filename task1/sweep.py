@@ -0,0 +1,217 @@
+# sweep.py
+# Task 1 - Scenario sweep engine
+# -ozgur
+
+"""
+Çok sayıda varyant x purchase ratio x eCPM x sale penceresi x horizon kombinasyonunu
+değerlendiren sweep modülü.
+DAU revenue parametrelerinden bağımsız olduğu için senaryolar DAU key'ine (retention,
+install) göre gruplanıp chunk'lara bölünür. Chunk'lar ProcessPoolExecutor'a dağıtılır; her
+worker kendi chunk'ındaki key'ler için retention fit'ini ve DAU'yu (en uzun horizon için)
+bir kez hesaplar, ardından revenue hesaplarını yapar. Sonuçlar tek bir tablo olarak döner.
+"""
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, replace
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from config import VariantConfig
+from retention_model import RetentionModel
+from simulation import PiecewiseSchedule, calculate_dau_convolution, calculate_revenue
+
+
+@dataclass(frozen=True)
+class SaleWindow:
+    """
+    Geçici sale kampanyası: start_day'den itibaren duration gün boyunca
+    purchase ratio'ya purchase_rate_boost (absolute) eklenir.
+
+    Kullanım: Task 1 - Soru d, f ve sweep senaryoları
+    """
+    start_day: int  # Sale'in başladığı gün (1-indexed)
+    duration: int  # Sale süresi (gün)
+    purchase_rate_boost: float  # Purchase ratio'ya eklenen absolute artış (örn: 0.01 = %1)
+
+    def purchase_ratio_schedule(self, base_ratio: float) -> PiecewiseSchedule:
+        """
+        Sale penceresini purchase ratio planına çevirir.
+
+        Args:
+            base_ratio: Sale dışındaki günlük purchase ratio
+
+        Returns:
+            PiecewiseSchedule
+        """
+        end_day = self.start_day + self.duration - 1
+        return PiecewiseSchedule(base_ratio, [(self.start_day, end_day, base_ratio + self.purchase_rate_boost)])
+
+
+def expand_grid(
+    variants: Sequence[VariantConfig],
+    horizons: Sequence[int],
+    purchase_ratios: Optional[Sequence[float]] = None,
+    ecpms: Optional[Sequence[float]] = None,
+    sale_windows: Optional[Sequence[Optional[SaleWindow]]] = None
+) -> List[Dict]:
+    """
+    Parametre grid'ini senaryo listesine açar.
+
+    Args:
+        variants: Varyant konfigürasyonları
+        horizons: Simüle edilecek gün sayıları
+        purchase_ratios: Denenecek günlük purchase ratio'lar (None ise varyantın kendi değeri)
+        ecpms: Denenecek eCPM değerleri (None ise varyantın kendi değeri)
+        sale_windows: Denenecek sale pencereleri (None elemanı = sale yok)
+
+    Returns:
+        Her biri 'variant' ve 'horizon' anahtarlarını içeren senaryo dictionary'leri
+
+    Kullanım: Task 1 - Scenario sweep
+    """
+    purchase_ratios = [None] if purchase_ratios is None else list(purchase_ratios)
+    ecpms = [None] if ecpms is None else list(ecpms)
+    sale_windows = [None] if sale_windows is None else list(sale_windows)
+
+    scenarios = []
+    for variant, purchase_ratio, ecpm, sale_window, horizon in itertools.product(
+        variants, purchase_ratios, ecpms, sale_windows, horizons
+    ):
+        overrides = {}
+        if purchase_ratio is not None:
+            overrides['daily_purchase_ratio'] = purchase_ratio
+        if ecpm is not None:
+            overrides['ecpm'] = ecpm
+        scenarios.append({
+            'variant': replace(variant, **overrides) if overrides else variant,
+            'horizon': int(horizon),
+            'sale_window': sale_window
+        })
+    return scenarios
+
+
+def _dau_key(variant: VariantConfig) -> tuple:
+    """DAU'yu belirleyen parametreler: retention noktaları ve günlük install sayısı."""
+    return tuple(float(x) for x in variant.retention_points), variant.daily_new_users
+
+
+def _evaluate_chunk(
+    chunk: List[Tuple[int, Dict]],
+    dau_specs: Dict[tuple, Tuple[VariantConfig, int]]
+) -> List[Tuple[int, Dict]]:
+    """
+    Bir senaryo chunk'ının DAU ve revenue hesaplarını yapar (worker process'te çalışır).
+
+    Args:
+        chunk: (senaryo sırası, senaryo) çiftleri
+        dau_specs: Chunk'taki DAU key'leri -> (key'i temsil eden varyant, en uzun horizon)
+
+    Returns:
+        Her senaryo için (senaryo sırası, sonuç satırı)
+    """
+    dau_by_key = {
+        key: calculate_dau_convolution(RetentionModel(variant.retention_points), variant.daily_new_users, horizon)
+        for key, (variant, horizon) in dau_specs.items()
+    }
+
+    rows = []
+    for index, scenario in chunk:
+        variant = scenario['variant']
+        horizon = scenario['horizon']
+        sale_window = scenario['sale_window']
+        dau = dau_by_key[_dau_key(variant)][:horizon]
+
+        purchase_ratio = variant.daily_purchase_ratio
+        if sale_window is not None:
+            purchase_ratio = sale_window.purchase_ratio_schedule(purchase_ratio)
+
+        revenue_info = calculate_revenue(
+            dau=dau,
+            daily_purchase_ratio=purchase_ratio,
+            ecpm=variant.ecpm,
+            ad_impressions_per_dau=variant.ad_impressions_per_dau,
+            average_purchase_amount=variant.average_purchase_amount
+        )
+
+        rows.append((index, {
+            'variant': variant.name,
+            'horizon': horizon,
+            'daily_purchase_ratio': variant.daily_purchase_ratio,
+            'ecpm': variant.ecpm,
+            'ad_impressions_per_dau': variant.ad_impressions_per_dau,
+            'sale_start_day': sale_window.start_day if sale_window else None,
+            'sale_duration': sale_window.duration if sale_window else None,
+            'sale_boost': sale_window.purchase_rate_boost if sale_window else None,
+            'final_dau': dau[-1] if horizon > 0 else 0.0,
+            'total_dau': dau.sum(),
+            'total_iap_revenue': revenue_info['iap_revenue'].sum(),
+            'total_ad_revenue': revenue_info['ad_revenue'].sum(),
+            'total_revenue': revenue_info['total_revenue'].sum()
+        }))
+    return rows
+
+
+def run_sweep(
+    scenarios: List[Dict],
+    max_workers: Optional[int] = None,
+    chunk_size: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Senaryo listesini değerlendirir ve tek bir sonuç tablosu döndürür.
+    Senaryolar DAU key'ine göre gruplanarak chunk'lara bölünür; retention fit'leri, DAU
+    convolution'ları ve revenue hesapları chunk'lar halinde process pool'da yapılır. Aynı
+    DAU'yu paylaşan senaryolar için DAU chunk başına bir kez hesaplanır.
+
+    Args:
+        scenarios: expand_grid çıktısı
+        max_workers: Worker process sayısı (None ise CPU sayısı, 1 ise process pool kullanılmaz)
+        chunk_size: Her worker görevindeki senaryo sayısı (None ise worker başına ~4 chunk)
+
+    Returns:
+        Her senaryo için bir satır içeren DataFrame (girdi sırasıyla)
+
+    Kullanım: Task 1 - Scenario sweep
+    """
+    if not scenarios:
+        return pd.DataFrame()
+
+    # Her DAU key'i için en uzun horizon'u bul; kısa horizon'lar bunun prefix'idir.
+    # Aynı key'in senaryoları ardışık chunk'lara düşsün diye senaryolar key'e göre gruplanır
+    max_horizon: Dict[tuple, int] = {}
+    variant_by_key: Dict[tuple, VariantConfig] = {}
+    groups: Dict[tuple, List[Tuple[int, Dict]]] = {}
+    for index, scenario in enumerate(scenarios):
+        key = _dau_key(scenario['variant'])
+        max_horizon[key] = max(max_horizon.get(key, 0), scenario['horizon'])
+        variant_by_key.setdefault(key, scenario['variant'])
+        groups.setdefault(key, []).append((index, scenario))
+    ordered = [item for group in groups.values() for item in group]
+
+    if max_workers is None:
+        max_workers = os.cpu_count() or 1
+    if max_workers == 1:
+        chunk_size = len(ordered)
+    elif chunk_size is None:
+        chunk_size = max(1, -(-len(ordered) // (max_workers * 4)))
+    chunks = [ordered[i:i + chunk_size] for i in range(0, len(ordered), chunk_size)]
+
+    def dau_specs(chunk):
+        """Chunk'taki DAU key'leri -> (varyant, en uzun horizon)."""
+        keys = dict.fromkeys(_dau_key(scenario['variant']) for _, scenario in chunk)
+        return {key: (variant_by_key[key], max_horizon[key]) for key in keys}
+
+    if len(chunks) == 1:
+        results = [_evaluate_chunk(chunk, dau_specs(chunk)) for chunk in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_evaluate_chunk, chunk, dau_specs(chunk)) for chunk in chunks]
+            results = [future.result() for future in futures]
+
+    rows = [None] * len(scenarios)
+    for chunk_rows in results:
+        for index, row in chunk_rows:
+            rows[index] = row
+    return pd.DataFrame(rows)
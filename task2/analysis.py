@@ -9,10 +9,147 @@ User segmentation, trend analizleri ve yaratıcı analizler bu modülde yer alı
 
 import pandas as pd
 import numpy as np
-from typing import Dict, Tuple, List
+from dataclasses import dataclass, field
+from pandas.api.types import union_categoricals
+from typing import Callable, Dict, Tuple, List, Optional, Sequence
 
+from sketches import BottomKSample, GroupedHyperLogLog, HyperLogLog, KLLSketch, hash_values
+from cohort_matrix import CohortMatrix
+from user_index import distinct_counts, encode_values
 
-def segment_users_by_first_day_engagement(df: pd.DataFrame) -> pd.DataFrame:
+
+# Her analizin ihtiyaç duyduğu ham sütunlar (preprocess_data'dan önceki isimlerle).
+# load_dataset(columns=required_columns(...)) ile yalnızca bu sütunlar yüklenir.
+ANALYSIS_COLUMNS = {
+    'first_day_engagement': [
+        'user_id', 'event_date', 'install_date', 'total_session_count', 'total_session_duration',
+        'match_start_count', 'iap_revenue', 'ad_revenue'
+    ],
+    'session_duration_trends': [
+        'user_id', 'event_date', 'install_date', 'total_session_count', 'total_session_duration'
+    ],
+    'retention_by_segment': [
+        'user_id', 'event_date', 'install_date', 'total_session_count', 'total_session_duration',
+        'match_start_count', 'iap_revenue', 'ad_revenue'
+    ],
+    'monetization_segments': ['user_id', 'iap_revenue', 'ad_revenue'],
+    'match_completion_trends': ['event_date', 'install_date', 'match_start_count', 'match_end_count'],
+    'platform_country_comparison': [
+        'user_id', 'platform', 'country', 'total_session_count', 'total_session_duration',
+        'iap_revenue', 'ad_revenue', 'victory_count', 'defeat_count'
+    ],
+    'win_rate_trends': ['event_date', 'install_date', 'victory_count', 'defeat_count']
+}
+
+
+# First-day engagement segmentasyonu varsayılanları: puanlanan metrikler, her metrik için
+# quantile kesim noktaları ve (Medium, High) segmentleri için minimum toplam puan
+ENGAGEMENT_METRICS = ('total_session_count', 'total_session_duration', 'match_start_count')
+ENGAGEMENT_QUANTILES = (0.33, 0.66)
+ENGAGEMENT_SEGMENT_THRESHOLDS = (5, 8)
+
+
+def required_columns(*analysis_names: str) -> List[str]:
+    """
+    Verilen analizlerin ihtiyaç duyduğu ham sütunların birleşimini döndürür.
+    
+    Args:
+        analysis_names: ANALYSIS_COLUMNS anahtarları (boşsa tüm analizler)
+    
+    Returns:
+        Sütun listesi (ilk görülme sırasıyla)
+    
+    Kullanım: Task 2 - Column projection
+    """
+    if not analysis_names:
+        analysis_names = tuple(ANALYSIS_COLUMNS)
+    columns = []
+    for name in analysis_names:
+        columns.extend(ANALYSIS_COLUMNS[name])
+    return list(dict.fromkeys(columns))
+
+
+@dataclass(frozen=True)
+class SegmentRule:
+    """
+    Deklaratif segment kuralı: condition, tüm kullanıcılar için tek seferde
+    boolean array döndüren vektörel bir fonksiyondur.
+    
+    Kullanım: Task 2 - Monetization segmentation
+    """
+    label: str  # Kurala uyan kullanıcıların segmenti
+    condition: Callable[[pd.DataFrame], np.ndarray]  # DataFrame -> boolean mask
+
+
+def classify_segments(frame: pd.DataFrame, rules: Sequence[SegmentRule], default: str) -> pd.Categorical:
+    """
+    Kuralları sırayla uygular; her satır uyduğu ilk kuralın segmentini alır (np.select).
+    
+    Args:
+        frame: Kullanıcı bazlı metrikler
+        rules: Öncelik sırasına göre kurallar
+        default: Hiçbir kurala uymayan satırların segmenti
+    
+    Returns:
+        Kategorileri kural sırasında olan (default en sonda) categorical
+    
+    Kullanım: Task 2 - Monetization segmentation
+    """
+    labels = [rule.label for rule in rules]
+    conditions = [np.asarray(rule.condition(frame), dtype=bool) for rule in rules]
+    categories = list(dict.fromkeys(labels + [default]))
+    # np.select kategori kodları üzerinde çalışır, string array oluşturulmaz
+    codes = np.select(conditions, [categories.index(label) for label in labels], default=categories.index(default))
+    return pd.Categorical.from_codes(codes, categories=categories)
+
+
+def revenue_percentile_at_least(column: str, percentile: float) -> Callable[[pd.DataFrame], np.ndarray]:
+    """
+    Paying kullanıcılar (column > 0) arasında column değeri verilen percentile'ın
+    üzerinde olanları seçen kural koşulu.
+    
+    Args:
+        column: Revenue sütunu
+        percentile: 0-100 arası percentile (ör. 99 = en çok harcayan %1)
+    
+    Returns:
+        SegmentRule.condition olarak kullanılabilecek fonksiyon
+    """
+    def condition(frame: pd.DataFrame) -> np.ndarray:
+        values = frame[column].to_numpy(dtype=float)
+        paying = values > 0
+        if not paying.any():
+            return np.zeros(len(values), dtype=bool)
+        return paying & (values >= np.percentile(values[paying], percentile))
+    return condition
+
+
+# Varsayılan monetization segmentleri: IAP-focused, Ad-focused, Mixed, Non-paying
+# (hiçbir kurala uymayanlar 'Mixed (Ad-dominant)')
+MONETIZATION_RULES = (
+    SegmentRule('Non-paying', lambda f: f['total_revenue'].to_numpy() == 0),
+    SegmentRule('IAP-focused', lambda f: (f['iap_revenue'].to_numpy() > 0) & (f['ad_revenue'].to_numpy() == 0)),
+    SegmentRule('Ad-focused', lambda f: (f['ad_revenue'].to_numpy() > 0) & (f['iap_revenue'].to_numpy() == 0)),
+    SegmentRule('Mixed (IAP-dominant)', lambda f: f['iap_revenue'].to_numpy() > f['ad_revenue'].to_numpy())
+)
+
+# Harcama tier'ları (paying kullanıcılar içinde total revenue percentile'ına göre)
+SPEND_TIER_RULES = (
+    SegmentRule('Whale', revenue_percentile_at_least('total_revenue', 99)),
+    SegmentRule('Dolphin', revenue_percentile_at_least('total_revenue', 90)),
+    SegmentRule('Minnow', lambda f: f['total_revenue'].to_numpy() > 0)
+)
+
+
+def segment_users_by_first_day_engagement(
+    df: pd.DataFrame,
+    metrics: Sequence[str] = ENGAGEMENT_METRICS,
+    quantiles: Sequence[float] = ENGAGEMENT_QUANTILES,
+    segment_thresholds: Sequence[int] = ENGAGEMENT_SEGMENT_THRESHOLDS,
+    approximate: bool = False,
+    rank_error: float = 0.01,
+    first_day_metrics: Optional[pd.DataFrame] = None
+) -> pd.DataFrame:
     """
     Kullanıcıları ilk gün engagement'lerine göre segmentlere ayırır.
     
@@ -24,101 +161,349 @@ def segment_users_by_first_day_engagement(df: pd.DataFrame) -> pd.DataFrame:
     
     Args:
         df: Preprocessed DataFrame
+        metrics: Puanlanacak metrikler (ilk gün toplamları alınır)
+        quantiles: Her metrik için quantile kesim noktaları
+        segment_thresholds: (Medium, High) için minimum toplam puan
+        approximate: True ise quantile threshold'ları KLL sketch'i ile yaklaşık hesaplanır
+        rank_error: approximate modunda threshold'ların normalized rank error'u
+        first_day_metrics: first_day_user_metrics sonucu (None ise df üzerinden hesaplanır)
     
     Returns:
         Segment bilgilerini içeren DataFrame (user_id ve segment)
     
+    Kullanım: Task 2 - First-day engagement segmentation
+    """
+    if first_day_metrics is None:
+        first_day_metrics = first_day_user_metrics(df, metrics)
+    
+    thresholds = sketch_thresholds(first_day_metrics, metrics, quantiles, rank_error) if approximate else None
+    return assign_engagement_segments(first_day_metrics, metrics, quantiles, segment_thresholds, thresholds)
+
+
+def first_day_user_metrics(df: pd.DataFrame, metrics: Sequence[str] = ENGAGEMENT_METRICS) -> pd.DataFrame:
+    """
+    Kullanıcı bazında ilk gün (days_since_install == 0) toplamlarını hesaplar.
+    
+    İlk gün metrikleri:
+    - Session count
+    - Session duration
+    - Match count
+    - Revenue
+    
+    Args:
+        df: Preprocessed DataFrame
+        metrics: Ek olarak toplanacak metrikler
+    
+    Returns:
+        user_id ve metrik sütunlarını içeren DataFrame
+    
     Kullanım: Task 2 - First-day engagement segmentation
     """
     # Her kullanıcının ilk gün verilerini al
-    first_day = df[df['days_since_install'] == 0].copy()
+    first_day = df[df['days_since_install'] == 0]
     
     # Kullanıcı bazında ilk gün metriklerini hesapla
-    first_day_metrics = first_day.groupby('user_id').agg({
+    aggregations = {
         'total_session_count': 'sum',
         'total_session_duration': 'sum',
         'match_start_count': 'sum',
         'total_revenue': 'sum'
-    }).reset_index()
+    }
+    aggregations.update({metric: 'sum' for metric in metrics})
+    return first_day.groupby('user_id', observed=True).agg(aggregations).reset_index()
+
+
+def score_by_quantiles(
+    values: pd.Series,
+    quantiles: Sequence[float] = ENGAGEMENT_QUANTILES,
+    thresholds: Optional[Sequence[float]] = None
+) -> np.ndarray:
+    """
+    Değerleri quantile threshold'larına göre puanlar: ilk threshold'un altı 1, her aşılan
+    (>=) threshold için +1. NaN değerler (ve NaN threshold'lar) en düşük puanı alır.
+    
+    Args:
+        values: Puanlanacak metrik
+        quantiles: Artan sırada quantile kesim noktaları (ör. (0.33, 0.66) -> 1, 2, 3 puan)
+        thresholds: Önceden hesaplanmış threshold değerleri (ör. quantile sketch'inden);
+                    None ise values.quantile ile tam hesaplanır
+    
+    Returns:
+        Integer puan array'i
     
-    # Segmentasyon için threshold'ları belirle (percentile bazlı)
-    session_count_q33 = first_day_metrics['total_session_count'].quantile(0.33)
-    session_count_q66 = first_day_metrics['total_session_count'].quantile(0.66)
+    Kullanım: Task 2 - First-day engagement segmentation
+    """
+    array = values.to_numpy(dtype=float, na_value=np.nan)
+    if thresholds is None:
+        thresholds = values.quantile(sorted(quantiles)).to_numpy(dtype=float)
+    scores = np.ones(len(array), dtype=np.int64)
+    for threshold in thresholds:
+        scores += array >= threshold
+    return scores
+
+
+def sketch_thresholds(
+    first_day_metrics: pd.DataFrame,
+    metrics: Sequence[str] = ENGAGEMENT_METRICS,
+    quantiles: Sequence[float] = ENGAGEMENT_QUANTILES,
+    rank_error: float = 0.01
+) -> Dict[str, np.ndarray]:
+    """
+    Metrik başına quantile threshold'larını KLL sketch'i ile yaklaşık hesaplar.
+    
+    Args:
+        first_day_metrics: Kullanıcı bazlı ilk gün metrikleri
+        metrics: Metrik sütunları
+        quantiles: Quantile kesim noktaları
+        rank_error: Sketch'in normalized rank error'u
+    
+    Returns:
+        Metrik -> artan sırada threshold değerleri
+    
+    Kullanım: Task 2 - Yaklaşık analizler
+    """
+    thresholds = {}
+    for metric in metrics:
+        sketch = KLLSketch.from_error(rank_error, seed=0)
+        sketch.update(first_day_metrics[metric].to_numpy(dtype=float, na_value=np.nan))
+        thresholds[metric] = sketch.quantile(sorted(quantiles))
+    return thresholds
+
+
+def assign_engagement_segments(
+    first_day_metrics: pd.DataFrame,
+    metrics: Sequence[str] = ENGAGEMENT_METRICS,
+    quantiles: Sequence[float] = ENGAGEMENT_QUANTILES,
+    segment_thresholds: Sequence[int] = ENGAGEMENT_SEGMENT_THRESHOLDS,
+    thresholds: Optional[Dict[str, Sequence[float]]] = None
+) -> pd.DataFrame:
+    """
+    Kullanıcı bazlı ilk gün metriklerinden engagement segmentlerini belirler.
+    Her metrik quantile threshold'larına göre puanlanır, puanlar toplanır ve toplam puan
+    segment_thresholds ile Low / Medium / High segmentlerine çevrilir (vektörel, np.select).
+    
+    Args:
+        first_day_metrics: Kullanıcı bazlı ilk gün metrikleri (user_id ve metrics sütunları)
+        metrics: Puanlanacak metrik sütunları
+        quantiles: Her metrik için quantile kesim noktaları
+        segment_thresholds: (Medium, High) için minimum toplam puan
+        thresholds: Metrik -> önceden hesaplanmış threshold değerleri (None ise tam quantile)
+    
+    Returns:
+        Segment bilgilerini içeren DataFrame (user_id ve segment)
+    
+    Kullanım: Task 2 - First-day engagement segmentation
+    """
+    score = np.zeros(len(first_day_metrics), dtype=np.int64)
+    for metric in metrics:
+        metric_thresholds = None if thresholds is None else thresholds[metric]
+        score += score_by_quantiles(first_day_metrics[metric], quantiles, metric_thresholds)
+    
+    # Segment belirleme (girdi tablosu değiştirilmez; pipeline'da paylaşılan bir ara sonuçtur)
+    medium_threshold, high_threshold = segment_thresholds
+    return first_day_metrics[['user_id']].assign(segment=np.select(
+        [score >= high_threshold, score >= medium_threshold],
+        ['High Engagement', 'Medium Engagement'],
+        default='Low Engagement'
+    ))
+
+
+# Trend analizlerinin ihtiyaç duyduğu aggregation'lar: group key -> [(sütun, fonksiyon), ...]
+SESSION_TREND_AGGREGATIONS = {
+    'event_date': [('avg_session_duration', 'mean'), ('total_session_duration', 'mean'), ('total_session_count', 'sum')],
+    'days_since_install': [('avg_session_duration', 'mean'), ('total_session_duration', 'mean'), ('user_id', 'nunique')]
+}
+MATCH_TREND_AGGREGATIONS = {
+    'event_date': [('match_start_count', 'sum'), ('match_end_count', 'sum')],
+    'days_since_install': [('match_start_count', 'sum'), ('match_end_count', 'sum')]
+}
+WIN_RATE_TREND_AGGREGATIONS = {
+    'event_date': [('victory_count', 'sum'), ('defeat_count', 'sum'), ('win_rate', 'mean')],
+    'days_since_install': [('victory_count', 'sum'), ('defeat_count', 'sum'), ('win_rate', 'mean')]
+}
+
+# Platform / country karşılaştırmasının aggregation'ları (her iki key için aynı)
+COMPARISON_AGGREGATIONS = [
+    ('user_id', 'nunique'), ('total_session_count', 'sum'), ('total_session_duration', 'mean'),
+    ('total_revenue', 'sum'), ('iap_revenue', 'sum'), ('ad_revenue', 'sum'), ('win_rate', 'mean')
+]
+
+
+def merge_aggregations(*specs: Dict[str, List[Tuple[str, str]]]) -> Dict[str, List[Tuple[str, str]]]:
+    """
+    Birden fazla analizin aggregation tanımlarını key bazında birleştirir (tekrarlar atılır).
     
-    session_duration_q33 = first_day_metrics['total_session_duration'].quantile(0.33)
-    session_duration_q66 = first_day_metrics['total_session_duration'].quantile(0.66)
+    Kullanım: Task 2 - Ortak groupby engine
+    """
+    merged = {}
+    for spec in specs:
+        for key, aggregations in spec.items():
+            merged.setdefault(key, [])
+            merged[key].extend(agg for agg in aggregations if agg not in merged[key])
+    return merged
+
+
+# Üç trend analizinin ortak aggregation'ları (her key için tek geçiş)
+TREND_AGGREGATIONS = merge_aggregations(
+    SESSION_TREND_AGGREGATIONS, MATCH_TREND_AGGREGATIONS, WIN_RATE_TREND_AGGREGATIONS
+)
+
+
+@dataclass
+class KeyAggregates:
+    """
+    Tek bir group key için hesaplanmış aggregation sonuçları.
+    keys sıralı group değerleri, values (sütun, fonksiyon) -> group başına değer array'i.
     
-    match_count_q33 = first_day_metrics['match_start_count'].quantile(0.33)
-    match_count_q66 = first_day_metrics['match_start_count'].quantile(0.66)
+    Kullanım: Task 2 - Ortak groupby engine
+    """
+    key: str
+    keys: pd.Index
+    values: Dict[Tuple[str, str], np.ndarray]
     
-    # Segmentasyon fonksiyonu
-    def assign_segment(row):
-        score = 0
+    def frame(self, aggregations: List[Tuple[str, str]]) -> pd.DataFrame:
+        """
+        İstenen aggregation'ları df.groupby(key).agg({...}).reset_index() formatında döndürür.
         
-        # Session count puanı
-        if row['total_session_count'] >= session_count_q66:
-            score += 3
-        elif row['total_session_count'] >= session_count_q33:
-            score += 2
-        else:
-            score += 1
+        Args:
+            aggregations: [(sütun, fonksiyon), ...]
         
-        # Session duration puanı
-        if row['total_session_duration'] >= session_duration_q66:
-            score += 3
-        elif row['total_session_duration'] >= session_duration_q33:
-            score += 2
+        Returns:
+            Key sütunu ve her aggregation için bir sütun içeren DataFrame
+        """
+        data = {self.key: self.keys}
+        for column, func in aggregations:
+            data[column] = self.values[(column, func)]
+        return pd.DataFrame(data)
+
+
+def _numeric_column(df: pd.DataFrame, column: str, cache: Dict[str, Tuple]) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+    """
+    Sütunu float array'e çevirir (key'ler arasında cache'lenir).
+    İkinci eleman null olmayan satırların maskesidir (sütunda null yoksa None).
+    """
+    if column not in cache:
+        array = df[column].to_numpy(dtype=float, na_value=np.nan)
+        not_null = ~np.isnan(array)
+        if not_null.all():
+            not_null = None
         else:
-            score += 1
+            array = np.where(not_null, array, 0.0)
+        cache[column] = (array, not_null)
+    return cache[column]
+
+
+def aggregate_by_key(
+    df: pd.DataFrame,
+    key: str,
+    aggregations: List[Tuple[str, str]],
+    column_cache: Optional[Dict[str, Tuple]] = None
+) -> KeyAggregates:
+    """
+    Key'i bir kez factorize eder ve tüm aggregation'ları group kodları üzerinden
+    np.bincount ile hesaplar (sum, mean, count; nunique için kullanıcı bitmap'leri).
+    Sonuçlar groupby ile aynıdır: NaN key'ler atılır, sum NaN'ları yok sayar,
+    mean/count yalnızca non-null değerleri, nunique yalnızca non-null distinct değerleri sayar.
+    
+    Args:
+        df: Preprocessed DataFrame
+        key: Group key sütunu
+        aggregations: [(sütun, fonksiyon), ...]; fonksiyon 'sum', 'mean', 'count' veya 'nunique'
+        column_cache: Birden fazla key için çağrılırken sütun array'lerinin paylaşıldığı dictionary
+    
+    Returns:
+        KeyAggregates
+    
+    Kullanım: Task 2 - Ortak groupby engine
+    """
+    if column_cache is None:
+        column_cache = {}
+    
+    codes, uniques = pd.factorize(df[key], sort=True)
+    n_groups = len(uniques)
+    # NaN key'li satırlar ayrı bir (atılan) gruba yazılır, böylece sütunlar maskelenmez
+    codes = np.where(codes >= 0, codes, n_groups)
+    sizes = np.bincount(codes, minlength=n_groups + 1)
+    
+    values = {}
+    for column, func in aggregations:
+        if func == 'nunique':
+            # Grup başına distinct değerler bitmap'ler üzerinden sayılır (bkz. user_index)
+            value_codes, n_values = encode_values(df[column])
+            group_codes = np.where(codes < n_groups, codes, -1)
+            values[(column, func)] = distinct_counts(group_codes, value_codes, n_groups, n_values)
+            continue
         
-        # Match count puanı
-        if row['match_start_count'] >= match_count_q66:
-            score += 3
-        elif row['match_start_count'] >= match_count_q33:
-            score += 2
-        else:
-            score += 1
+        array, not_null = _numeric_column(df, column, column_cache)
+        total = np.bincount(codes, weights=array, minlength=n_groups + 1)[:n_groups]
+        count = (sizes if not_null is None else np.bincount(codes[not_null], minlength=n_groups + 1))[:n_groups]
         
-        # Segment belirleme
-        if score >= 8:
-            return 'High Engagement'
-        elif score >= 5:
-            return 'Medium Engagement'
+        if func == 'sum':
+            values[(column, func)] = total.astype(np.int64) if pd.api.types.is_integer_dtype(df[column].dtype) else total
+        elif func == 'mean':
+            with np.errstate(invalid='ignore', divide='ignore'):
+                values[(column, func)] = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+        elif func == 'count':
+            values[(column, func)] = count
         else:
-            return 'Low Engagement'
+            raise ValueError(f"Desteklenmeyen aggregation: {func}")
+    
+    return KeyAggregates(key=key, keys=pd.Index(uniques, name=key), values=values)
+
+
+def compute_key_aggregates(
+    df: pd.DataFrame,
+    aggregations: Dict[str, List[Tuple[str, str]]] = None
+) -> Dict[str, KeyAggregates]:
+    """
+    Her group key için tüm aggregation'ları tek geçişte hesaplar.
+    Varsayılan olarak session, match completion ve win rate trendlerinin ihtiyaç duyduğu
+    tüm metrikler hesaplanır; sonuç bu analizlere aggregates parametresiyle verilebilir.
+    
+    Args:
+        df: Preprocessed DataFrame
+        aggregations: Group key -> [(sütun, fonksiyon), ...] (None ise TREND_AGGREGATIONS)
     
-    first_day_metrics['segment'] = first_day_metrics.apply(assign_segment, axis=1)
+    Returns:
+        Group key -> KeyAggregates
     
-    return first_day_metrics[['user_id', 'segment']]
+    Kullanım: Task 2 - Ortak groupby engine
+    """
+    if aggregations is None:
+        aggregations = TREND_AGGREGATIONS
+    column_cache = {}
+    return {
+        key: aggregate_by_key(df, key, key_aggregations, column_cache)
+        for key, key_aggregations in aggregations.items()
+    }
 
 
-def analyze_session_duration_trends(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_session_duration_trends(
+    df: pd.DataFrame,
+    aggregates: Optional[Dict[str, KeyAggregates]] = None
+) -> pd.DataFrame:
     """
     Session duration'ın zaman içindeki trendlerini analiz eder.
     Hem gün bazlı hem de kullanıcı yaşına göre trendleri hesaplar.
     
     Args:
         df: Preprocessed DataFrame
+        aggregates: compute_key_aggregates sonucu (None ise df üzerinden hesaplanır)
     
     Returns:
         Trend analizi sonuçlarını içeren DataFrame
     
     Kullanım: Task 2 - Session duration trends analysis
     """
+    if aggregates is None:
+        aggregates = compute_key_aggregates(df, SESSION_TREND_AGGREGATIONS)
+    
     # Gün bazlı ortalama session duration
-    daily_avg_duration = df.groupby('event_date').agg({
-        'avg_session_duration': 'mean',
-        'total_session_duration': 'mean',
-        'total_session_count': 'sum'
-    }).reset_index()
+    daily_avg_duration = aggregates['event_date'].frame(SESSION_TREND_AGGREGATIONS['event_date'])
     daily_avg_duration.columns = ['date', 'avg_session_duration', 'avg_total_duration', 'total_sessions']
     
     # Kullanıcı lifetime'ına göre (days_since_install) session duration trendi
-    lifetime_duration = df.groupby('days_since_install').agg({
-        'avg_session_duration': 'mean',
-        'total_session_duration': 'mean',
-        'user_id': 'nunique'
-    }).reset_index()
+    lifetime_duration = aggregates['days_since_install'].frame(SESSION_TREND_AGGREGATIONS['days_since_install'])
     lifetime_duration.columns = ['days_since_install', 'avg_session_duration', 'avg_total_duration', 'unique_users']
     
     return {
@@ -127,7 +512,11 @@ def analyze_session_duration_trends(df: pd.DataFrame) -> pd.DataFrame:
     }
 
 
-def analyze_retention_by_segment(df: pd.DataFrame, user_segments: pd.DataFrame) -> pd.DataFrame:
+def analyze_retention_by_segment(
+    df: pd.DataFrame,
+    user_segments: pd.DataFrame,
+    cohort_matrix: Optional[CohortMatrix] = None
+) -> pd.DataFrame:
     """
     Segment bazlı retention analizi yapar.
     Her segment için gün bazlı retention oranlarını hesaplar.
@@ -135,102 +524,120 @@ def analyze_retention_by_segment(df: pd.DataFrame, user_segments: pd.DataFrame)
     Args:
         df: Preprocessed DataFrame
         user_segments: User segmentation DataFrame (user_id, segment)
+        cohort_matrix: Önceden oluşturulmuş CohortMatrix (None ise df'ten oluşturulur)
     
     Returns:
         Segment bazlı retention DataFrame
     
     Kullanım: Task 2 - Retention analysis by segment
     """
-    # Segment bilgilerini ana DataFrame'e ekle
-    df_with_segment = df.merge(user_segments, on='user_id', how='left')
-    
-    # Her segment için gün bazlı aktif kullanıcı sayısı
-    retention_by_segment = df_with_segment.groupby(['segment', 'days_since_install']).agg({
-        'user_id': 'nunique'
-    }).reset_index()
-    retention_by_segment.columns = ['segment', 'day', 'active_users']
-    
-    # Her segment için Day 0'daki kullanıcı sayısını bul
-    day0_users = df_with_segment[df_with_segment['days_since_install'] == 0].groupby('segment')['user_id'].nunique().reset_index()
-    day0_users.columns = ['segment', 'day0_users']
-    
-    # Retention oranını hesapla
-    retention_by_segment = retention_by_segment.merge(day0_users, on='segment')
-    retention_by_segment['retention_rate'] = retention_by_segment['active_users'] / retention_by_segment['day0_users']
-    
-    return retention_by_segment
+    # Segmentler ham satırlara merge edilmez; cohort matrisinin aktiviteleri segment
+    # etiketleriyle tek bincount'ta sayılır
+    if cohort_matrix is None:
+        cohort_matrix = CohortMatrix(df)
+    return cohort_matrix.retention_by_labels(user_segments['user_id'], user_segments['segment'], 'segment')
 
 
-def analyze_monetization_segments(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_monetization_segments(df: pd.DataFrame, user_revenue: Optional[pd.DataFrame] = None) -> pd.DataFrame:
     """
     Kullanıcıları monetization davranışlarına göre segmentlere ayırır.
     IAP vs Ad revenue bazlı segmentasyon.
     
     Args:
         df: Preprocessed DataFrame
+        user_revenue: user_revenue_totals sonucu (None ise df üzerinden hesaplanır)
     
     Returns:
         Monetization segment bilgilerini içeren DataFrame
     
     Kullanım: Task 2 - Monetization segmentation
     """
-    # Kullanıcı bazında toplam revenue hesapla
-    user_revenue = df.groupby('user_id').agg({
+    if user_revenue is None:
+        user_revenue = user_revenue_totals(df)
+    return assign_monetization_segments(user_revenue)
+
+
+def user_revenue_totals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Kullanıcı bazında toplam IAP, ad ve total revenue'yu hesaplar.
+    
+    Args:
+        df: Preprocessed DataFrame
+    
+    Returns:
+        user_id, iap_revenue, ad_revenue, total_revenue sütunlarını içeren DataFrame
+    
+    Kullanım: Task 2 - Monetization segmentation
+    """
+    return df.groupby('user_id', observed=True).agg({
         'iap_revenue': 'sum',
         'ad_revenue': 'sum',
         'total_revenue': 'sum'
     }).reset_index()
+
+
+def assign_monetization_segments(
+    user_revenue: pd.DataFrame,
+    rules: Sequence[SegmentRule] = MONETIZATION_RULES,
+    default: str = 'Mixed (Ad-dominant)',
+    tier_rules: Optional[Sequence[SegmentRule]] = None,
+    tier_default: str = 'Non-paying'
+) -> pd.DataFrame:
+    """
+    Kullanıcı bazlı revenue toplamlarından monetization segmentlerini belirler.
     
-    # Segmentasyon: IAP-focused, Ad-focused, Mixed, Non-paying
-    def assign_monetization_segment(row):
-        total_rev = row['total_revenue']
-        iap_rev = row['iap_revenue']
-        ad_rev = row['ad_revenue']
-        
-        if total_rev == 0:
-            return 'Non-paying'
-        elif iap_rev > 0 and ad_rev == 0:
-            return 'IAP-focused'
-        elif ad_rev > 0 and iap_rev == 0:
-            return 'Ad-focused'
-        elif iap_rev > ad_rev:
-            return 'Mixed (IAP-dominant)'
-        else:
-            return 'Mixed (Ad-dominant)'
+    Args:
+        user_revenue: Kullanıcı bazlı revenue toplamları (user_id, iap_revenue, ad_revenue, total_revenue)
+        rules: Monetization segment kuralları (varsayılan: IAP vs Ad revenue)
+        default: Hiçbir kurala uymayan kullanıcıların segmenti
+        tier_rules: Verilirse ek 'spend_tier' sütunu için kurallar (ör. SPEND_TIER_RULES)
+        tier_default: Hiçbir tier kuralına uymayan kullanıcıların tier'ı
+    
+    Returns:
+        Monetization segment bilgilerini içeren DataFrame (segmentler categorical)
+    
+    Kullanım: Task 2 - Monetization segmentation
+    """
+    # Girdi tablosu değiştirilmez; pipeline'da paylaşılan bir ara sonuçtur
+    user_revenue = user_revenue.assign(monetization_segment=classify_segments(user_revenue, rules, default))
+    columns = ['user_id', 'monetization_segment', 'iap_revenue', 'ad_revenue', 'total_revenue']
     
-    user_revenue['monetization_segment'] = user_revenue.apply(assign_monetization_segment, axis=1)
+    if tier_rules is not None:
+        user_revenue = user_revenue.assign(spend_tier=classify_segments(user_revenue, tier_rules, tier_default))
+        columns.append('spend_tier')
     
-    return user_revenue[['user_id', 'monetization_segment', 'iap_revenue', 'ad_revenue', 'total_revenue']]
+    return user_revenue[columns]
 
 
-def analyze_match_completion_trends(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_match_completion_trends(
+    df: pd.DataFrame,
+    aggregates: Optional[Dict[str, KeyAggregates]] = None
+) -> pd.DataFrame:
     """
     Match completion rate'lerinin zaman içindeki trendlerini analiz eder.
     Match start vs match end oranlarını hesaplar.
     
     Args:
         df: Preprocessed DataFrame
+        aggregates: compute_key_aggregates sonucu (None ise df üzerinden hesaplanır)
     
     Returns:
         Match completion trend DataFrame
     
     Kullanım: Task 2 - Match completion trends
     """
+    if aggregates is None:
+        aggregates = compute_key_aggregates(df, MATCH_TREND_AGGREGATIONS)
+    
     # Gün bazlı match completion rate
-    daily_match_stats = df.groupby('event_date').agg({
-        'match_start_count': 'sum',
-        'match_end_count': 'sum'
-    }).reset_index()
+    daily_match_stats = aggregates['event_date'].frame(MATCH_TREND_AGGREGATIONS['event_date'])
     
     daily_match_stats['completion_rate'] = (
         daily_match_stats['match_end_count'] / daily_match_stats['match_start_count'].replace(0, 1)
     )
     
     # Kullanıcı lifetime'ına göre (days_since_install) match completion rate
-    lifetime_match_stats = df.groupby('days_since_install').agg({
-        'match_start_count': 'sum',
-        'match_end_count': 'sum'
-    }).reset_index()
+    lifetime_match_stats = aggregates['days_since_install'].frame(MATCH_TREND_AGGREGATIONS['days_since_install'])
     
     lifetime_match_stats['completion_rate'] = (
         lifetime_match_stats['match_end_count'] / lifetime_match_stats['match_start_count'].replace(0, 1)
@@ -254,27 +661,12 @@ def analyze_platform_country_comparison(df: pd.DataFrame) -> pd.DataFrame:
     
     Kullanım: Task 2 - Platform and country analysis
     """
-    # Platform bazlı metrikler
-    platform_stats = df.groupby('platform').agg({
-        'user_id': 'nunique',
-        'total_session_count': 'sum',
-        'total_session_duration': 'mean',
-        'total_revenue': 'sum',
-        'iap_revenue': 'sum',
-        'ad_revenue': 'sum',
-        'win_rate': 'mean'
-    }).reset_index()
+    # Platform ve country için tüm metrikler key başına tek geçişte hesaplanır
+    platform_stats = aggregate_by_key(df, 'platform', COMPARISON_AGGREGATIONS).frame(COMPARISON_AGGREGATIONS)
     
     # Country bazlı metrikler (top 10)
-    country_stats = df.groupby('country').agg({
-        'user_id': 'nunique',
-        'total_session_count': 'sum',
-        'total_session_duration': 'mean',
-        'total_revenue': 'sum',
-        'iap_revenue': 'sum',
-        'ad_revenue': 'sum',
-        'win_rate': 'mean'
-    }).reset_index().sort_values('user_id', ascending=False).head(10)
+    country_stats = aggregate_by_key(df, 'country', COMPARISON_AGGREGATIONS).frame(COMPARISON_AGGREGATIONS)
+    country_stats = country_stats.sort_values('user_id', ascending=False).head(10)
     
     return {
         'platform_stats': platform_stats,
@@ -282,35 +674,34 @@ def analyze_platform_country_comparison(df: pd.DataFrame) -> pd.DataFrame:
     }
 
 
-def analyze_win_rate_trends(df: pd.DataFrame) -> pd.DataFrame:
+def analyze_win_rate_trends(
+    df: pd.DataFrame,
+    aggregates: Optional[Dict[str, KeyAggregates]] = None
+) -> pd.DataFrame:
     """
     Win rate'lerin zaman içindeki trendlerini analiz eder.
     
     Args:
         df: Preprocessed DataFrame
+        aggregates: compute_key_aggregates sonucu (None ise df üzerinden hesaplanır)
     
     Returns:
         Win rate trend DataFrame
     
     Kullanım: Task 2 - Win rate trends analysis
     """
+    if aggregates is None:
+        aggregates = compute_key_aggregates(df, WIN_RATE_TREND_AGGREGATIONS)
+    
     # Gün bazlı win rate
-    daily_win_rate = df.groupby('event_date').agg({
-        'victory_count': 'sum',
-        'defeat_count': 'sum',
-        'win_rate': 'mean'
-    }).reset_index()
+    daily_win_rate = aggregates['event_date'].frame(WIN_RATE_TREND_AGGREGATIONS['event_date'])
     
     daily_win_rate['overall_win_rate'] = (
         daily_win_rate['victory_count'] / (daily_win_rate['victory_count'] + daily_win_rate['defeat_count']).replace(0, 1)
     )
     
     # Kullanıcı lifetime'ına göre (days_since_install) win rate
-    lifetime_win_rate = df.groupby('days_since_install').agg({
-        'victory_count': 'sum',
-        'defeat_count': 'sum',
-        'win_rate': 'mean'
-    }).reset_index()
+    lifetime_win_rate = aggregates['days_since_install'].frame(WIN_RATE_TREND_AGGREGATIONS['days_since_install'])
     
     lifetime_win_rate['overall_win_rate'] = (
         lifetime_win_rate['victory_count'] / (lifetime_win_rate['victory_count'] + lifetime_win_rate['defeat_count']).replace(0, 1)
@@ -321,3 +712,735 @@ def analyze_win_rate_trends(df: pd.DataFrame) -> pd.DataFrame:
         'lifetime_trend': lifetime_win_rate
     }
 
+
+
+# ---------------------------------------------------------------------------
+# Streaming (chunk bazlı) analizler
+# Her analizin birleştirilebilir bir partial formu vardır: chunk üzerinde toplamlar, sayılar
+# ve distinct (key, user_id) çiftleri hesaplanır, partial'lar birleştirilir ve sonunda
+# finalize ile tam dataset üzerinde çalışan fonksiyonla aynı çıktı üretilir.
+# ---------------------------------------------------------------------------
+
+
+@dataclass
+class PartialAggregate:
+    """
+    Birleştirilebilir ara sonuç.
+    sums: Key bazlı toplam/sayı tabloları (index = group key), birleştirmede toplanır
+    distinct: Distinct (key, user_id) tabloları (ör. (day, user_id) çiftleri), birleştirmede
+              union alınır. user_id 64-bit hash olarak tutulur (bkz. sketches.hash_values);
+              birleştirmeler string'ler yerine integer'lar üzerinden yapılır
+    
+    Kullanım: Task 2 - Streaming analizler
+    """
+    sums: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    distinct: Dict[str, pd.DataFrame] = field(default_factory=dict)
+    
+    def merge(self, other: "PartialAggregate") -> "PartialAggregate":
+        """
+        İki partial'ı birleştirir (bkz. merge_all).
+        """
+        return PartialAggregate.merge_all([self, other])
+    
+    @staticmethod
+    def merge_all(partials: Sequence["PartialAggregate"]) -> "PartialAggregate":
+        """
+        Partial'ları tek seferde birleştirir: her tablo için parçalar bir kez birleştirilip
+        toplamlar tek groupby ile, distinct satırlar tek drop_duplicates ile hesaplanır.
+        
+        Args:
+            partials: Birleştirilecek partial'lar
+        
+        Returns:
+            Birleştirilmiş PartialAggregate
+        """
+        sums, distinct = {}, {}
+        for name in dict.fromkeys(name for partial in partials for name in partial.sums):
+            tables = _non_empty([partial.sums[name] for partial in partials if name in partial.sums])
+            sums[name] = tables[0] if len(tables) == 1 else pd.concat(tables).groupby(level=0, sort=False).sum()
+        for name in dict.fromkeys(name for partial in partials for name in partial.distinct):
+            tables = _non_empty([partial.distinct[name] for partial in partials if name in partial.distinct])
+            distinct[name] = tables[0] if len(tables) == 1 else _union_distinct(tables)
+        return PartialAggregate(sums=sums, distinct=distinct)
+
+
+def _non_empty(tables: List[pd.DataFrame]) -> List[pd.DataFrame]:
+    """Boş tabloları atar (index / kategori tipleri belirsiz olabilir); hepsi boşsa ilkini bırakır."""
+    return [table for table in tables if len(table) > 0] or tables[:1]
+
+
+def _union_distinct(tables: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Distinct tabloların birleşimi. Categorical sütunlar union_categoricals ile birleştirilir
+    (kodlar yeniden eşlenir, değerler object'e çevrilmez).
+    """
+    columns = {}
+    for column in tables[0].columns:
+        parts = [table[column] for table in tables]
+        if all(isinstance(part.dtype, pd.CategoricalDtype) for part in parts):
+            try:
+                columns[column] = union_categoricals(parts)
+            except TypeError:
+                columns[column] = pd.Categorical(pd.concat([part.astype(object) for part in parts], ignore_index=True))
+        else:
+            columns[column] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(columns).drop_duplicates(ignore_index=True)
+
+
+def _plain_values(df: pd.DataFrame) -> pd.DataFrame:
+    """Categorical sütunları düz değerlere çevirir (ör. kullanıcı segmentleri)."""
+    for column in df.columns:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].astype(df[column].cat.categories.dtype)
+    return df
+
+
+# _prepare_chunk'ın user_id hash'lerini eklediği sütun
+USER_HASH_COLUMN = '_user_hash'
+
+
+def _prepare_chunk(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Partial'lardan önce chunk'ı bir kez hazırlar: categorical sütunlar chunk'taki değerlere
+    indirgenir ve user_id hash'leri (distinct tablolar için) tek seferde hesaplanır.
+    """
+    chunk = chunk.copy(deep=False)
+    for column in chunk.columns:
+        chunk[column] = _compact(chunk[column])
+    chunk[USER_HASH_COLUMN] = hash_values(chunk['user_id'])
+    return chunk
+
+
+def _compact(values: pd.Series) -> pd.Series:
+    """
+    Categorical sütundan chunk'ta görülmeyen kategorileri atar; groupby ve hash işlemleri
+    dataset'in tüm kategori seti yerine yalnızca chunk'taki değerler üzerinden yapılır.
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.remove_unused_categories()
+    return values
+
+
+def _grouped_sums(df: pd.DataFrame, key, sum_columns: List[str], mean_columns: List[str] = ()) -> pd.DataFrame:
+    """
+    Key bazında toplamları ve ortalamalar için (toplam, non-null sayısı) çiftlerini hesaplar.
+    """
+    named = {f"{column}_sum": (column, 'sum') for column in sum_columns}
+    for column in mean_columns:
+        named[f"{column}_sum"] = (column, 'sum')
+        named[f"{column}_count"] = (column, 'count')
+    table = df.groupby(_compact(df[key]), observed=True).agg(**named).astype(float)
+    if isinstance(table.index, pd.CategoricalIndex):
+        table.index = table.index.astype(table.index.categories.dtype)
+    return table
+
+
+def _distinct_pairs(df: pd.DataFrame, key: str) -> pd.DataFrame:
+    """
+    Distinct (key, user_id hash) çiftlerini döndürür (key'i veya user_id'si NaN olanlar hariç).
+    """
+    valid = (df[key].notna() & df['user_id'].notna()).to_numpy()
+    if USER_HASH_COLUMN in df.columns:
+        hashes = df[USER_HASH_COLUMN].to_numpy()[valid]
+    else:
+        hashes = hash_values(_compact(df['user_id'][valid]))
+    pairs = pd.DataFrame({key: _compact(df[key][valid]), 'user_id': hashes})
+    return pairs.drop_duplicates(ignore_index=True)
+
+
+def _distinct_counts(table: pd.DataFrame, key: str) -> pd.Series:
+    """Distinct tablodan key başına satır (ör. kullanıcı) sayısı; index düz değerlerle."""
+    counts = table.groupby(key, observed=True).size()
+    if isinstance(counts.index, pd.CategoricalIndex):
+        counts.index = counts.index.astype(counts.index.categories.dtype)
+    return counts
+
+
+def _mean(table: pd.DataFrame, column: str) -> pd.Series:
+    """Partial toplam/sayı çiftinden ortalama (sayı 0 ise NaN)."""
+    return table[f"{column}_sum"] / table[f"{column}_count"].replace(0, np.nan)
+
+
+def first_day_engagement_partial(df: pd.DataFrame) -> PartialAggregate:
+    """
+    segment_users_by_first_day_engagement için partial: kullanıcı bazlı ilk gün toplamları.
+    """
+    first_day = df[df['days_since_install'] == 0]
+    table = _grouped_sums(first_day, 'user_id', [
+        'total_session_count', 'total_session_duration', 'match_start_count', 'total_revenue'
+    ])
+    return PartialAggregate(sums={'first_day': table})
+
+
+def first_day_engagement_finalize(partial: PartialAggregate) -> pd.DataFrame:
+    """
+    first_day_engagement_partial sonucundan segmentleri hesaplar.
+    """
+    table = partial.sums['first_day'].sort_index()
+    first_day_metrics = pd.DataFrame({
+        'user_id': table.index,
+        'total_session_count': table['total_session_count_sum'].values,
+        'total_session_duration': table['total_session_duration_sum'].values,
+        'match_start_count': table['match_start_count_sum'].values,
+        'total_revenue': table['total_revenue_sum'].values
+    })
+    return assign_engagement_segments(first_day_metrics)
+
+
+def session_duration_trends_partial(df: pd.DataFrame) -> PartialAggregate:
+    """
+    analyze_session_duration_trends için partial.
+    """
+    return PartialAggregate(
+        sums={
+            'daily': _grouped_sums(df, 'event_date', ['total_session_count'],
+                                   ['avg_session_duration', 'total_session_duration']),
+            'lifetime': _grouped_sums(df, 'days_since_install', [],
+                                      ['avg_session_duration', 'total_session_duration'])
+        },
+        distinct={'lifetime_users': _distinct_pairs(df, 'days_since_install')}
+    )
+
+
+def session_duration_trends_finalize(partial: PartialAggregate) -> Dict[str, pd.DataFrame]:
+    """
+    session_duration_trends_partial sonucundan trendleri hesaplar.
+    """
+    daily = partial.sums['daily'].sort_index()
+    daily_avg_duration = pd.DataFrame({
+        'date': daily.index,
+        'avg_session_duration': _mean(daily, 'avg_session_duration').values,
+        'avg_total_duration': _mean(daily, 'total_session_duration').values,
+        'total_sessions': daily['total_session_count_sum'].values
+    })
+    
+    lifetime = partial.sums['lifetime'].sort_index()
+    unique_users = _distinct_counts(partial.distinct['lifetime_users'], 'days_since_install')
+    lifetime_duration = pd.DataFrame({
+        'days_since_install': lifetime.index,
+        'avg_session_duration': _mean(lifetime, 'avg_session_duration').values,
+        'avg_total_duration': _mean(lifetime, 'total_session_duration').values,
+        'unique_users': unique_users.reindex(lifetime.index, fill_value=0).values
+    })
+    
+    return {
+        'daily_trend': daily_avg_duration,
+        'lifetime_trend': lifetime_duration
+    }
+
+
+def retention_by_segment_partial(df: pd.DataFrame) -> PartialAggregate:
+    """
+    analyze_retention_by_segment için partial: distinct (days_since_install, user_id hash) çiftleri.
+    """
+    return PartialAggregate(distinct={'activity': _distinct_pairs(df, 'days_since_install')})
+
+
+def retention_by_segment_finalize(partial: PartialAggregate, user_segments: pd.DataFrame) -> pd.DataFrame:
+    """
+    retention_by_segment_partial sonucundan ve kullanıcı segmentlerinden retention hesaplar.
+    Aktiviteler user_id hash'leriyle tutulduğu için segmentlerin user_id'leri de aynı şekilde hash'lenir.
+    """
+    user_segments = _plain_values(user_segments.copy())
+    user_segments['user_id'] = hash_values(user_segments['user_id'])
+    return analyze_retention_by_segment(partial.distinct['activity'], user_segments)
+
+
+def monetization_segments_partial(df: pd.DataFrame) -> PartialAggregate:
+    """
+    analyze_monetization_segments için partial: kullanıcı bazlı revenue toplamları.
+    """
+    return PartialAggregate(sums={'user_revenue': _grouped_sums(df, 'user_id', ['iap_revenue', 'ad_revenue', 'total_revenue'])})
+
+
+def monetization_segments_finalize(partial: PartialAggregate) -> pd.DataFrame:
+    """
+    monetization_segments_partial sonucundan monetization segmentlerini hesaplar.
+    """
+    table = partial.sums['user_revenue'].sort_index()
+    user_revenue = pd.DataFrame({
+        'user_id': table.index,
+        'iap_revenue': table['iap_revenue_sum'].values,
+        'ad_revenue': table['ad_revenue_sum'].values,
+        'total_revenue': table['total_revenue_sum'].values
+    })
+    return assign_monetization_segments(user_revenue)
+
+
+def match_completion_trends_partial(df: pd.DataFrame) -> PartialAggregate:
+    """
+    analyze_match_completion_trends için partial.
+    """
+    columns = ['match_start_count', 'match_end_count']
+    return PartialAggregate(sums={
+        'daily': _grouped_sums(df, 'event_date', columns),
+        'lifetime': _grouped_sums(df, 'days_since_install', columns)
+    })
+
+
+def match_completion_trends_finalize(partial: PartialAggregate) -> Dict[str, pd.DataFrame]:
+    """
+    match_completion_trends_partial sonucundan trendleri hesaplar.
+    """
+    result = {}
+    for name, key in (('daily', 'event_date'), ('lifetime', 'days_since_install')):
+        table = partial.sums[name].sort_index()
+        stats = pd.DataFrame({
+            key: table.index,
+            'match_start_count': table['match_start_count_sum'].values,
+            'match_end_count': table['match_end_count_sum'].values
+        })
+        stats['completion_rate'] = stats['match_end_count'] / stats['match_start_count'].replace(0, 1)
+        result[f"{name}_trend"] = stats
+    return result
+
+
+def platform_country_comparison_partial(df: pd.DataFrame) -> PartialAggregate:
+    """
+    analyze_platform_country_comparison için partial.
+    """
+    sum_columns = ['total_session_count', 'total_revenue', 'iap_revenue', 'ad_revenue']
+    mean_columns = ['total_session_duration', 'win_rate']
+    return PartialAggregate(
+        sums={
+            'platform': _grouped_sums(df, 'platform', sum_columns, mean_columns),
+            'country': _grouped_sums(df, 'country', sum_columns, mean_columns)
+        },
+        distinct={
+            'platform_users': _distinct_pairs(df, 'platform'),
+            'country_users': _distinct_pairs(df, 'country')
+        }
+    )
+
+
+def platform_country_comparison_finalize(partial: PartialAggregate) -> Dict[str, pd.DataFrame]:
+    """
+    platform_country_comparison_partial sonucundan platform ve country istatistiklerini hesaplar.
+    """
+    result = {}
+    for key in ('platform', 'country'):
+        table = partial.sums[key].sort_index()
+        users = _distinct_counts(partial.distinct[f"{key}_users"], key)
+        result[f"{key}_stats"] = pd.DataFrame({
+            key: table.index,
+            'user_id': users.reindex(table.index, fill_value=0).values,
+            'total_session_count': table['total_session_count_sum'].values,
+            'total_session_duration': _mean(table, 'total_session_duration').values,
+            'total_revenue': table['total_revenue_sum'].values,
+            'iap_revenue': table['iap_revenue_sum'].values,
+            'ad_revenue': table['ad_revenue_sum'].values,
+            'win_rate': _mean(table, 'win_rate').values
+        })
+    result['country_stats'] = result['country_stats'].sort_values('user_id', ascending=False).head(10)
+    return result
+
+
+def win_rate_trends_partial(df: pd.DataFrame) -> PartialAggregate:
+    """
+    analyze_win_rate_trends için partial.
+    """
+    return PartialAggregate(sums={
+        'daily': _grouped_sums(df, 'event_date', ['victory_count', 'defeat_count'], ['win_rate']),
+        'lifetime': _grouped_sums(df, 'days_since_install', ['victory_count', 'defeat_count'], ['win_rate'])
+    })
+
+
+def win_rate_trends_finalize(partial: PartialAggregate) -> Dict[str, pd.DataFrame]:
+    """
+    win_rate_trends_partial sonucundan trendleri hesaplar.
+    """
+    result = {}
+    for name, key in (('daily', 'event_date'), ('lifetime', 'days_since_install')):
+        table = partial.sums[name].sort_index()
+        stats = pd.DataFrame({
+            key: table.index,
+            'victory_count': table['victory_count_sum'].values,
+            'defeat_count': table['defeat_count_sum'].values,
+            'win_rate': _mean(table, 'win_rate').values
+        })
+        stats['overall_win_rate'] = (
+            stats['victory_count'] / (stats['victory_count'] + stats['defeat_count']).replace(0, 1)
+        )
+        result[f"{name}_trend"] = stats
+    return result
+
+
+# Analiz adı -> (partial, finalize) fonksiyonları
+STREAMING_ANALYSES = {
+    'first_day_engagement': (first_day_engagement_partial, first_day_engagement_finalize),
+    'session_duration_trends': (session_duration_trends_partial, session_duration_trends_finalize),
+    'retention_by_segment': (retention_by_segment_partial, retention_by_segment_finalize),
+    'monetization_segments': (monetization_segments_partial, monetization_segments_finalize),
+    'match_completion_trends': (match_completion_trends_partial, match_completion_trends_finalize),
+    'platform_country_comparison': (platform_country_comparison_partial, platform_country_comparison_finalize),
+    'win_rate_trends': (win_rate_trends_partial, win_rate_trends_finalize)
+}
+
+
+def _with_dependencies(analyses: List[str]) -> List[str]:
+    """Retention segmentlere ihtiyaç duyar; gerekirse first_day_engagement eklenir."""
+    needed = list(analyses)
+    if 'retention_by_segment' in needed and 'first_day_engagement' not in needed:
+        needed.append('first_day_engagement')
+    return needed
+
+
+# Birleştirme ağacında bir seviyede tek seferde birleştirilen partial sayısı
+PARTIAL_MERGE_FAN_IN = 8
+
+
+class PartialAccumulator:
+    """
+    Chunk partial'larını bir birleştirme ağacında toplar.
+    Her chunk'ın partial'ı önce ayrı tutulur; aynı seviyede PARTIAL_MERGE_FAN_IN partial
+    biriktiğinde tek seferde birleştirilip bir üst seviyeye çıkar. Böylece her satır
+    log_fan_in(chunk sayısı) kez birleştirilir (büyüyen toplam tabloya her chunk'ta eklemenin
+    karesel maliyeti oluşmaz) ve bellekte seviye başına en fazla fan_in - 1 partial bekler.
+    
+    Kullanım: Task 2 - Streaming ve incremental analizler
+    """
+    
+    def __init__(self, analyses: List[str] = None, fan_in: int = PARTIAL_MERGE_FAN_IN):
+        """
+        Args:
+            analyses: Partial'ı hesaplanacak analizler (None ise tümü)
+            fan_in: Bir seviyede birleştirilen partial sayısı (en az 2)
+        """
+        self.analyses = _with_dependencies(list(STREAMING_ANALYSES) if analyses is None else analyses)
+        self.fan_in = max(2, fan_in)
+        self._levels: List[Tuple[int, Dict[str, PartialAggregate]]] = []
+    
+    def add_chunk(self, chunk: pd.DataFrame):
+        """Chunk'ın partial'larını hesaplar ve ağaca ekler (chunk preprocessed olmalı)."""
+        chunk = _prepare_chunk(chunk)
+        self.add({name: STREAMING_ANALYSES[name][0](chunk) for name in self.analyses})
+    
+    def add(self, partials: Dict[str, PartialAggregate]):
+        """Hazır partial'ları (ör. bir shard'ın sonucu) ağaca ekler."""
+        self._levels.append((0, partials))
+        while len(self._levels) >= self.fan_in:
+            level = self._levels[-1][0]
+            group = self._levels[-self.fan_in:]
+            if any(entry_level != level for entry_level, _ in group):
+                break
+            del self._levels[-self.fan_in:]
+            self._levels.append((level + 1, merge_partials([entry for _, entry in group])))
+    
+    def result(self) -> Dict[str, PartialAggregate]:
+        """Ağaçta bekleyen tüm partial'ları tek seferde birleştirir."""
+        merged = merge_partials([entry for _, entry in self._levels])
+        self._levels = [(0, merged)] if merged else []
+        return merged
+
+
+def merge_partials(partial_sets: Sequence[Dict[str, PartialAggregate]]) -> Dict[str, PartialAggregate]:
+    """
+    Analiz adı -> PartialAggregate sözlüklerini analiz bazında tek seferde birleştirir.
+    
+    Kullanım: Task 2 - Streaming ve incremental analizler
+    """
+    names = dict.fromkeys(name for partials in partial_sets for name in partials)
+    return {
+        name: PartialAggregate.merge_all([partials[name] for partials in partial_sets if name in partials])
+        for name in names
+    }
+
+
+def update_partials(partials: Dict[str, PartialAggregate], chunk: pd.DataFrame, analyses: List[str] = None):
+    """
+    Bir chunk'ın partial'larını hesaplar ve mevcut partial'lara (in place) ekler.
+    Çok sayıda chunk için PartialAccumulator kullanılmalıdır; her çağrı büyüyen tabloları
+    baştan birleştirir.
+    
+    Args:
+        partials: Analiz adı -> birleştirilmiş PartialAggregate
+        chunk: Preprocessed DataFrame chunk'ı
+        analyses: Güncellenecek analizler (None ise tümü)
+    
+    Kullanım: Task 2 - Streaming ve incremental analizler
+    """
+    names = _with_dependencies(list(STREAMING_ANALYSES) if analyses is None else analyses)
+    chunk = _prepare_chunk(chunk)
+    partials.update(merge_partials([partials, {name: STREAMING_ANALYSES[name][0](chunk) for name in names}]))
+
+
+def finalize_partials(partials: Dict[str, PartialAggregate], analyses: List[str] = None) -> Dict[str, object]:
+    """
+    Birleştirilmiş partial'lardan analiz sonuçlarını üretir.
+    
+    Args:
+        partials: Analiz adı -> birleştirilmiş PartialAggregate
+        analyses: Sonucu istenen analizler (None ise tümü)
+    
+    Returns:
+        Analiz adı -> tam dataset fonksiyonlarıyla aynı formatta sonuç
+    
+    Kullanım: Task 2 - Streaming ve incremental analizler
+    """
+    if analyses is None:
+        analyses = list(STREAMING_ANALYSES)
+    needed = _with_dependencies(analyses)
+    
+    results = {}
+    for name in needed:
+        if name != 'retention_by_segment':
+            results[name] = STREAMING_ANALYSES[name][1](partials[name])
+    if 'retention_by_segment' in needed:
+        results['retention_by_segment'] = retention_by_segment_finalize(
+            partials['retention_by_segment'], results['first_day_engagement']
+        )
+    return {name: results[name] for name in analyses}
+
+
+def stream_analyses(chunks, analyses: List[str] = None) -> Dict[str, object]:
+    """
+    Preprocessed chunk'lar üzerinden analizleri tek geçişte ve sınırlı bellekle hesaplar.
+    Bellekte yalnızca bir chunk ve birleştirme ağacındaki partial'lar tutulur (bkz. PartialAccumulator).
+    
+    Args:
+        chunks: Preprocessed DataFrame chunk'ları (ör. data_loader.iter_dataset)
+        analyses: Hesaplanacak analizler (STREAMING_ANALYSES anahtarları, None ise tümü)
+    
+    Returns:
+        Analiz adı -> tam dataset fonksiyonlarıyla aynı formatta sonuç
+    
+    Kullanım: Task 2 - Streaming analizler
+    """
+    accumulator = PartialAccumulator(analyses)
+    for chunk in chunks:
+        accumulator.add_chunk(chunk)
+    return finalize_partials(accumulator.result(), analyses)
+
+
+# ---------------------------------------------------------------------------
+# Yaklaşık (approximate) analizler
+# Keşif amaçlı çalıştırmalar için tek geçişli, sabit bellekli mod: distinct kullanıcılar
+# HyperLogLog ile, quantile'lar KLL sketch'i ile, segment payları kullanıcı hash'ine göre
+# seçilen bottom-k örneklem üzerinden tahmin edilir. Hata payları sonuçla birlikte raporlanır.
+# ---------------------------------------------------------------------------
+
+
+# Session duration dağılımı için raporlanan quantile'lar
+SESSION_DURATION_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9, 0.99)
+
+
+class ApproximateAggregator:
+    """
+    Chunk'lar üzerinden tek geçişte güncellenen yaklaşık analiz durumu.
+    Aynı ayarlarla oluşturulmuş aggregator'lar merge ile birleştirilebilir.
+    
+    Kullanım: Task 2 - Yaklaşık analizler
+    """
+    
+    def __init__(
+        self,
+        relative_error: float = 0.01,
+        rank_error: float = 0.01,
+        sample_size: int = 10000,
+        metrics: Sequence[str] = ENGAGEMENT_METRICS,
+        quantiles: Sequence[float] = ENGAGEMENT_QUANTILES,
+        seed: int = 0
+    ):
+        """
+        Args:
+            relative_error: Distinct kullanıcı sayılarının relative standard error'u (HyperLogLog)
+            rank_error: Quantile'ların normalized rank error'u (KLL)
+            sample_size: Engagement threshold'ları ve segment payları için örneklemdeki kullanıcı sayısı
+            metrics: Engagement segmentasyonu metrikleri
+            quantiles: Engagement threshold quantile'ları
+            seed: KLL compaction'ları için random seed
+        """
+        self.metrics = list(metrics)
+        self.quantiles = sorted(quantiles)
+        self.users = HyperLogLog.from_error(relative_error)
+        self.first_day_users = HyperLogLog(self.users.precision)
+        self.users_by_key = {key: GroupedHyperLogLog(self.users.precision) for key in ('event_date', 'platform', 'country')}
+        self.session_sketches = {
+            column: KLLSketch.from_error(rank_error, seed=seed)
+            for column in ('avg_session_duration', 'total_session_duration')
+        }
+        self.sample = BottomKSample(sample_size)
+    
+    def update(self, chunk: pd.DataFrame):
+        """
+        Preprocessed bir chunk'ı sketch'lere ekler.
+        Engagement metrikleri kullanıcı bazında segmentlendiği için satır değerleri quantile
+        sketch'ine verilmez: ilk gün satırları kullanıcı örnekleminde kullanıcı bazında toplanır
+        (kullanıcının ilk günü birden fazla satıra dağılmış olabilir).
+        """
+        users = chunk['user_id']
+        self.users.add(users)
+        for key, sketch in self.users_by_key.items():
+            if key in chunk.columns:
+                sketch.add(chunk[key], users)
+        for column, sketch in self.session_sketches.items():
+            if column in chunk.columns:
+                sketch.update(chunk[column].to_numpy(dtype=float, na_value=np.nan))
+        
+        first_day = chunk[chunk['days_since_install'] == 0]
+        self.first_day_users.add(first_day['user_id'])
+        present = first_day['user_id'].notna().to_numpy()
+        self.sample.add(
+            hash_values(first_day['user_id'])[present],
+            first_day.loc[present, self.metrics].astype(float)
+        )
+    
+    def merge(self, other: "ApproximateAggregator") -> "ApproximateAggregator":
+        """İki aggregator'ı birleştirir (ayarlar aynı olmalı)."""
+        merged = object.__new__(ApproximateAggregator)
+        merged.metrics = self.metrics
+        merged.quantiles = self.quantiles
+        merged.users = self.users.merge(other.users)
+        merged.first_day_users = self.first_day_users.merge(other.first_day_users)
+        merged.users_by_key = {key: sketch.merge(other.users_by_key[key]) for key, sketch in self.users_by_key.items()}
+        merged.session_sketches = {
+            column: sketch.merge(other.session_sketches[column]) for column, sketch in self.session_sketches.items()
+        }
+        merged.sample = self.sample.merge(other.sample)
+        return merged
+    
+    def result(self, segment_thresholds: Sequence[int] = ENGAGEMENT_SEGMENT_THRESHOLDS) -> Dict[str, object]:
+        """
+        Yaklaşık analiz sonuçlarını ve hata paylarını döndürür.
+        
+        Args:
+            segment_thresholds: (Medium, High) için minimum toplam puan
+        
+        Returns:
+            Dictionary:
+            - total_users, first_day_users: Tahmini distinct kullanıcı sayıları
+            - users_by_date / users_by_platform / users_by_country: Key başına tahmini distinct kullanıcılar
+            - engagement_thresholds: Metrik başına tahmini quantile threshold'ları (kullanıcı örnekleminden)
+            - users_by_segment: Segment başına tahmini pay ve kullanıcı sayısı
+            - session_duration_quantiles: Session duration dağılımının quantile'ları
+            - error_bounds: Raporlanan hata payları
+        """
+        users_by = {}
+        for key, name in (('event_date', 'date'), ('platform', 'platform'), ('country', 'country')):
+            counts = self.users_by_key[key].counts()
+            users_by[key] = pd.DataFrame({name: counts.index, 'unique_users': counts.values})
+        users_by['country'] = users_by['country'].sort_values('unique_users', ascending=False, ignore_index=True)
+        
+        # Engagement threshold'ları, tam yoldaki gibi kullanıcı bazlı ilk gün toplamlarının
+        # quantile'larıdır: hash ile seçilen örneklem ilk gün kullanıcılarından uniform bir
+        # örneklem olduğu için threshold'lar örneklem quantile'larıyla tahmin edilir
+        sample = self.sample.rows.rename(columns={'user_hash': 'user_id'})
+        sample_size = len(sample)
+        first_day_users = self.first_day_users.count()
+        thresholds = {
+            metric: sample[metric].quantile(self.quantiles).to_numpy(dtype=float) if sample_size
+            else np.full(len(self.quantiles), np.nan)
+            for metric in self.metrics
+        }
+        engagement_thresholds = pd.DataFrame(
+            [[metric] + list(values) for metric, values in thresholds.items()],
+            columns=['metric'] + [f"q{q:g}" for q in self.quantiles]
+        )
+        
+        # Segment payları: örneklemdeki kullanıcılar örneklem threshold'larıyla segmentlenir
+        if sample_size:
+            segments = assign_engagement_segments(
+                sample, self.metrics, self.quantiles, segment_thresholds, thresholds
+            )['segment'].value_counts()
+            share = segments.values / sample_size
+            users_by_segment = pd.DataFrame({
+                'segment': segments.index,
+                'share': share,
+                'share_error': 1.96 * np.sqrt(share * (1 - share) / sample_size),
+                'unique_users': share * first_day_users
+            })
+        else:
+            users_by_segment = pd.DataFrame(columns=['segment', 'share', 'share_error', 'unique_users'])
+        
+        session_duration_quantiles = pd.DataFrame({'quantile': SESSION_DURATION_QUANTILES})
+        for column, sketch in self.session_sketches.items():
+            session_duration_quantiles[column] = sketch.quantile(list(SESSION_DURATION_QUANTILES))
+        
+        return {
+            'total_users': self.users.count(),
+            'first_day_users': first_day_users,
+            'users_by_date': users_by['event_date'],
+            'users_by_platform': users_by['platform'],
+            'users_by_country': users_by['country'],
+            'engagement_thresholds': engagement_thresholds,
+            'users_by_segment': users_by_segment,
+            'session_duration_quantiles': session_duration_quantiles,
+            'error_bounds': {
+                # Distinct sayımların relative standard error'u (~%68; 2 katı ~%95 güven)
+                'unique_users_relative_error': self.users.relative_error,
+                # Session duration quantile'larının normalized rank error'u (KLL, ~%99 güven)
+                'quantile_rank_error': next(iter(self.session_sketches.values())).rank_error,
+                # Engagement threshold'larının rank error'u (örneklem quantile'ı, DKW eşitsizliği, %95 güven)
+                'engagement_threshold_rank_error': float(np.sqrt(np.log(2 / 0.05) / (2 * sample_size))) if sample_size else np.nan,
+                # Segment paylarının en kötü durum %95 güven aralığı yarı genişliği
+                'segment_share_error': float(1.96 * np.sqrt(0.25 / sample_size)) if sample_size else np.nan,
+                'segment_sample_size': sample_size
+            }
+        }
+
+
+def approximate_analyses(chunks, **options) -> Dict[str, object]:
+    """
+    Preprocessed chunk'lar üzerinden yaklaşık analizleri tek geçişte hesaplar.
+    Bellek kullanımı dataset boyutundan bağımsızdır (sketch boyutları hata paylarıyla belirlenir).
+    
+    Args:
+        chunks: Preprocessed DataFrame chunk'ları (ör. data_loader.iter_dataset)
+        options: ApproximateAggregator parametreleri (relative_error, rank_error, sample_size, ...)
+    
+    Returns:
+        ApproximateAggregator.result çıktısı
+    
+    Kullanım: Task 2 - Yaklaşık analizler
+    """
+    aggregator = ApproximateAggregator(**options)
+    for chunk in chunks:
+        aggregator.update(chunk)
+    return aggregator.result()
+
+
+def compare_with_exact(result: Dict[str, object], df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Yaklaşık sonuçları tam dataset üzerinden hesaplanan değerlerle karşılaştırır ve her
+    büyüklüğün hatasını raporlanan hata payıyla birlikte döndürür.
+    Threshold'lar için hata rank cinsindendir: tahmini threshold'un tam kullanıcı bazlı
+    dağılımdaki rank aralığının hedef quantile'a uzaklığı.
+    
+    Args:
+        result: ApproximateAggregator.result / approximate_analyses çıktısı
+        df: Aynı veri üzerinden preprocessed DataFrame
+    
+    Returns:
+        quantity, approximate, exact, error, bound, within_bound sütunlarını içeren DataFrame
+    
+    Kullanım: Task 2 - Yaklaşık analizlerin doğrulanması
+    """
+    bounds = result['error_bounds']
+    first_day_metrics = first_day_user_metrics(df)
+    rows = []
+    
+    # Distinct sayımlar: relative error, %95 güven için 2 standard error
+    for name, exact in (('total_users', df['user_id'].nunique()), ('first_day_users', len(first_day_metrics))):
+        approximate = result[name]
+        rows.append((name, approximate, exact, abs(approximate - exact) / max(exact, 1), 2 * bounds['unique_users_relative_error']))
+    
+    # Engagement threshold'ları: rank hatası
+    thresholds = result['engagement_thresholds'].set_index('metric')
+    for metric, values in thresholds.iterrows():
+        exact_values = first_day_metrics[metric].dropna().to_numpy(dtype=float)
+        exact_thresholds = first_day_metrics[metric].quantile([float(c[1:]) for c in values.index]).to_numpy()
+        for (column, threshold), exact in zip(values.items(), exact_thresholds):
+            q = float(column[1:])
+            low, high = np.mean(exact_values < threshold), np.mean(exact_values <= threshold)
+            error = max(low - q, q - high, 0.0)
+            rows.append((f"{metric} {column}", threshold, exact, error, bounds['engagement_threshold_rank_error']))
+    
+    # Segment payları: mutlak fark
+    exact_shares = assign_engagement_segments(first_day_metrics)['segment'].value_counts(normalize=True)
+    for _, row in result['users_by_segment'].iterrows():
+        exact = float(exact_shares.get(row['segment'], 0.0))
+        rows.append((f"share {row['segment']}", row['share'], exact, abs(row['share'] - exact), bounds['segment_share_error']))
+    
+    comparison = pd.DataFrame(rows, columns=['quantity', 'approximate', 'exact', 'error', 'bound'])
+    comparison['within_bound'] = comparison['error'] <= comparison['bound']
+    return comparison
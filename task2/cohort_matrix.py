@@ -0,0 +1,187 @@
+# cohort_matrix.py
+# Task 2 - Cohort retention matrisi
+# -ozgur
+
+"""
+Integer kodlu kullanıcılardan bir kez oluşturulan cohort matrisi.
+Ham satırlar yalnızca bir kez okunur: distinct (kullanıcı, days_since_install) aktiviteleri ve
+kullanıcı başına install cohort'u çıkarılır. (install_date x days_since_install) aktif kullanıcı
+sayıları bu aktiviteler üzerinde np.bincount ile hesaplanır.
+Segment, platform, country gibi kullanıcı etiketlerine veya install haftasına göre retention,
+ham DataFrame'e merge yapılmadan aynı aktiviteler üzerinden tek bincount ile elde edilir.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from user_index import UserIndex
+
+
+class CohortMatrix:
+    """
+    Distinct kullanıcı aktivitelerinden oluşan cohort matrisi.
+    Bir kullanıcı birden fazla install_date ile görünüyorsa en erken install cohort'una yazılır.
+    
+    Kullanım: Task 2 - Retention analizleri
+    """
+    
+    def __init__(self, df: pd.DataFrame, attributes: Sequence[str] = ()):
+        """
+        Args:
+            df: Preprocessed DataFrame (user_id, days_since_install; varsa install_date)
+            attributes: Kullanıcı başına saklanacak etiket sütunları (ör. platform, country);
+                        kullanıcının son görülen değeri kullanılır
+        """
+        self.user_index = UserIndex.from_values(df['user_id'])
+        n_users = len(self.user_index)
+        user_codes = self.user_index.encode(df['user_id'])
+        
+        day_codes, days = pd.factorize(df['days_since_install'], sort=True)
+        self.days = pd.Index(days, name='day')
+        
+        if 'install_date' in df.columns:
+            install_codes, installs = pd.factorize(df['install_date'], sort=True)
+        else:
+            install_codes, installs = np.zeros(len(df), dtype=np.int64), pd.Index([pd.NaT])
+        self.installs = pd.Index(installs, name='install_date')
+        
+        valid = (user_codes >= 0) & (day_codes >= 0)
+        
+        # Kullanıcı başına install cohort'u (en erken install_date)
+        self.user_install = np.full(n_users, len(self.installs), dtype=np.int64)
+        has_install = valid & (install_codes >= 0)
+        np.minimum.at(self.user_install, user_codes[has_install], install_codes[has_install])
+        self.user_install[self.user_install == len(self.installs)] = -1
+        
+        # Distinct (kullanıcı, gün) aktiviteleri
+        n_days = max(len(self.days), 1)
+        activity = pd.unique(user_codes[valid].astype(np.int64) * n_days + day_codes[valid])
+        self.activity_users = (activity // n_days).astype(np.int32)
+        self.activity_days = (activity % n_days).astype(np.int32)
+        
+        # Kullanıcı etiketleri: kullanıcı kodu -> etiket kodu
+        self.attributes: Dict[str, Tuple[np.ndarray, pd.Index]] = {}
+        for column in attributes:
+            label_codes, labels = pd.factorize(df[column], sort=True)
+            per_user = np.full(n_users, -1, dtype=np.int32)
+            labelled = valid & (label_codes >= 0)
+            per_user[user_codes[labelled]] = label_codes[labelled]
+            self.attributes[column] = (per_user, pd.Index(labels, name=column))
+        
+        self.matrix = self.counts()
+    
+    def counts(self, user_labels: Optional[np.ndarray] = None, n_labels: int = 1, by_install: bool = True) -> np.ndarray:
+        """
+        Aktif kullanıcı sayılarını tek np.bincount ile hesaplar.
+        
+        Args:
+            user_labels: Kullanıcı kodu -> etiket kodu (-1 = dahil değil); None ise tüm kullanıcılar
+            n_labels: Etiket sayısı
+            by_install: False ise install ekseni toplanmış olarak hesaplanır
+        
+        Returns:
+            by_install ise (n_labels, n_installs, n_days), değilse (n_labels, n_days) matris;
+            user_labels None ise ilk eksen atılır
+        """
+        n_days = len(self.days)
+        n_installs = len(self.installs) if by_install else 1
+        
+        labels = np.zeros(len(self.activity_users), dtype=np.int64) if user_labels is None \
+            else user_labels[self.activity_users].astype(np.int64)
+        installs = self.user_install[self.activity_users] if by_install \
+            else np.zeros(len(self.activity_users), dtype=np.int64)
+        keep = (labels >= 0) & (installs >= 0)
+        
+        flat = (labels[keep] * n_installs + installs[keep]) * n_days + self.activity_days[keep]
+        result = np.bincount(flat, minlength=n_labels * n_installs * n_days)
+        result = result.reshape(n_labels, n_installs, n_days) if by_install else result.reshape(n_labels, n_days)
+        return result[0] if user_labels is None else result
+    
+    def label_users(self, user_ids: pd.Series, labels: pd.Series) -> Tuple[np.ndarray, pd.Index]:
+        """
+        Kullanıcı bazlı bir etiket tablosunu (ör. user_segments) kullanıcı kodu -> etiket koduna çevirir.
+        
+        Args:
+            user_ids: Etiket tablosundaki user_id'ler
+            labels: Aynı sıradaki etiketler
+        
+        Returns:
+            (kullanıcı kodu -> etiket kodu array'i, sıralı etiketler)
+        """
+        label_codes, label_values = pd.factorize(labels, sort=True)
+        codes = self.user_index.encode(user_ids)
+        per_user = np.full(len(self.user_index), -1, dtype=np.int32)
+        known = codes >= 0
+        per_user[codes[known]] = label_codes[known]
+        return per_user, pd.Index(label_values)
+    
+    def retention(self, user_labels: np.ndarray, labels: pd.Index, label_name: str) -> pd.DataFrame:
+        """
+        Etiket bazlı gün gün retention tablosu.
+        Day 0'da aktif kullanıcısı olmayan etiketler ve aktif kullanıcısı olmayan günler atılır.
+        
+        Args:
+            user_labels: Kullanıcı kodu -> etiket kodu
+            labels: Etiket değerleri
+            label_name: Çıktıdaki etiket sütununun adı
+        
+        Returns:
+            label_name, day, active_users, day0_users, retention_rate sütunlarını içeren DataFrame
+        """
+        active = self.counts(user_labels, len(labels), by_install=False)
+        day0_position = np.flatnonzero(np.asarray(self.days) == 0)
+        day0_users = active[:, day0_position[0]] if len(day0_position) else np.zeros(len(labels), dtype=np.int64)
+        
+        present = (active > 0) & (day0_users > 0)[:, None]
+        label_positions, day_positions = np.nonzero(present)
+        retention_df = pd.DataFrame({
+            label_name: np.asarray(labels, dtype=object)[label_positions] if len(labels) else pd.Series(dtype=object),
+            'day': np.asarray(self.days)[day_positions],
+            'active_users': active[present],
+            'day0_users': day0_users[label_positions]
+        })
+        retention_df['retention_rate'] = retention_df['active_users'] / retention_df['day0_users']
+        return retention_df
+    
+    def retention_by_labels(self, user_ids: pd.Series, labels: pd.Series, label_name: str = 'segment') -> pd.DataFrame:
+        """
+        Kullanıcı bazlı etiket tablosuna göre retention (ör. engagement segmentleri).
+        
+        Kullanım: Task 2 - Retention analysis by segment
+        """
+        user_labels, label_values = self.label_users(user_ids, labels)
+        return self.retention(user_labels, label_values, label_name)
+    
+    def retention_by_attribute(self, column: str) -> pd.DataFrame:
+        """
+        Oluştururken saklanan bir kullanıcı etiketine göre retention (ör. platform, country).
+        
+        Kullanım: Task 2 - Retention analizleri
+        """
+        user_labels, labels = self.attributes[column]
+        return self.retention(user_labels, labels, column)
+    
+    def retention_by_install_week(self) -> pd.DataFrame:
+        """
+        Install haftası cohort'larına göre retention: matrisin install ekseni haftalara toplanır.
+        
+        Kullanım: Task 2 - Retention analizleri
+        """
+        week_codes, weeks = pd.factorize(pd.DatetimeIndex(self.installs).to_period('W'), sort=True)
+        weekly = np.zeros((len(weeks), len(self.days)), dtype=np.int64)
+        np.add.at(weekly, week_codes, self.matrix)
+        
+        day0_position = np.flatnonzero(np.asarray(self.days) == 0)
+        day0_users = weekly[:, day0_position[0]] if len(day0_position) else np.zeros(len(weeks), dtype=np.int64)
+        present = (weekly > 0) & (day0_users > 0)[:, None]
+        week_positions, day_positions = np.nonzero(present)
+        retention_df = pd.DataFrame({
+            'install_week': weeks.start_time[week_positions],
+            'day': np.asarray(self.days)[day_positions],
+            'active_users': weekly[present],
+            'day0_users': day0_users[week_positions]
+        })
+        retention_df['retention_rate'] = retention_df['active_users'] / retention_df['day0_users']
+        return retention_df
@@ -0,0 +1,340 @@
+# column_store.py
+# Task 2 - Memory-mapped column store
+# -ozgur
+
+"""
+Event dataset'i için disk üzerinde sütun bazlı saklama.
+Her sütun ayrı bir ham binary dosyada (<sütun>.bin) tutulur, tip bilgileri küçük bir
+manifest.json dosyasındadır. Açarken dosyalar np.memmap ile read-only map edilir:
+- Sayısal sütunlar olduğu gibi map edilir
+- Tarih sütunları int64 olarak saklanır ve datetime64 view'i ile açılır
+- Categorical sütunların kodları map edilir, kategoriler orijinal tipleriyle
+  <sütun>.categories.npy dosyasından okunur
+DataFrame bu array'ler üzerine kopyalanmadan kurulur; Parquet -> pandas dönüşümü yapılmaz
+ve aynı store'u açan process'ler aynı sayfaları (OS page cache) paylaşır.
+Store, shard'ların fingerprint'leriyle birlikte saklanır; shard'lar değiştiğinde yeniden oluşturulur.
+"""
+
+import json
+import os
+import shutil
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_loader import CACHE_DIR_NAME, find_shards, iter_dataset, shard_fingerprint, shard_unchanged
+
+
+# Store formatı değiştiğinde artırılır
+STORE_VERSION = 2
+
+# Store klasörünün cache klasörü içindeki adı
+STORE_DIR_NAME = "column_store"
+
+# Manifest dosyasının adı
+MANIFEST_NAME = "manifest.json"
+
+
+def default_store_dir(data_dir: str) -> str:
+    """Store'un varsayılan klasörü (data_dir/.cache/column_store)."""
+    return os.path.join(data_dir, CACHE_DIR_NAME, STORE_DIR_NAME)
+
+
+def _code_dtype(n_categories: int) -> np.dtype:
+    """pandas'ın bu kadar kategori için kullandığı kod tipi (kodlar açılışta cast edilmeden sarılır)."""
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def _column_kind(series: pd.Series) -> str:
+    """Sütunun store'daki türü: category, datetime veya numeric."""
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category'
+    if pd.api.types.is_datetime64_dtype(dtype):
+        return 'datetime'
+    if pd.api.types.is_numeric_dtype(dtype) and isinstance(dtype, np.dtype):
+        return 'numeric'
+    raise ValueError(f"Column store'da desteklenmeyen sütun tipi: {series.name} ({dtype})")
+
+
+def _union_categories(parts: List[pd.Index]) -> pd.Index:
+    """
+    Shard kategorilerinin sıralı birleşimi (load_dataset'teki union_categoricals ile aynı sıra).
+    Boş shard'ların kategorileri (tipi belirsiz) atlanır; sıralanamayan karışık tipler görülme sırasıyla kalır.
+    """
+    parts = [p for p in parts if len(p) > 0]
+    if not parts:
+        return pd.Index([])
+    categories = parts[0].append(parts[1:]).unique() if len(parts) > 1 else parts[0]
+    try:
+        return categories.sort_values()
+    except TypeError:
+        return categories
+
+
+def _save_categories(path: str, categories: pd.Index) -> Dict:
+    """
+    Kategorileri orijinal tipiyle kaydeder: sayısal / tarih kategoriler typed array, string
+    kategoriler unicode array, diğerleri object array (pickle) olarak. Manifest girdisini döndürür.
+    """
+    if isinstance(categories.dtype, np.dtype) and categories.dtype != object:
+        values, pickled = categories.to_numpy(), False
+    elif categories.inferred_type in ('string', 'empty'):
+        values, pickled = np.asarray(categories, dtype=str), False
+    else:
+        values, pickled = np.asarray(categories, dtype=object), True
+    np.save(path, values, allow_pickle=pickled)
+    return {'categories': os.path.basename(path), 'categories_pickled': pickled}
+
+
+def build_column_store(
+    data_dir: Optional[str] = None,
+    store_dir: Optional[str] = None,
+    use_cache: bool = True
+) -> str:
+    """
+    Dataset'i shard shard kompakt tiplerle okur ve sütun sütun store'a yazar; bellekte aynı
+    anda yalnızca bir shard tutulur.
+    Her shard'ın sütunları önce kendi tipiyle geçici parça dosyalarına yazılır. Sonunda her
+    sütun için ortak tip (integer genişliklerinin / tarih birimlerinin en genişi) ve sıralı
+    kategori birleşimi belirlenir, parçalar shard shard bu tipe çevrilerek (categorical kodlar
+    birleşime göre yeniden kodlanarak) sütun dosyasına eklenir. Sonuç load_dataset(compact=True)
+    ile aynıdır.
+    Eski manifest build başında silinir ve yenisi en son (atomik olarak) yazılır; böylece yarım
+    kalan bir build store'u geçerli göstermez.
+    
+    Args:
+        data_dir: Dataset klasörünün yolu (None ise otomatik bulunur)
+        store_dir: Store klasörü (None ise data_dir/.cache/column_store)
+        use_cache: Shard başına Parquet cache kullanılsın mı
+    
+    Returns:
+        Store klasörü
+    
+    Kullanım: Task 2 - Column store
+    """
+    data_dir, csv_files = find_shards(data_dir)
+    if store_dir is None:
+        store_dir = default_store_dir(data_dir)
+    os.makedirs(store_dir, exist_ok=True)
+    
+    # Fingerprint'ler okumadan önce alınır: okuma sırasında değişen shard bir sonraki açılışta yakalanır
+    shards = {os.path.basename(path): shard_fingerprint(path) for path in csv_files}
+    
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+    parts_dir = os.path.join(store_dir, f"parts.tmp{os.getpid()}")
+    os.makedirs(parts_dir, exist_ok=True)
+    
+    # Sütun -> (tür, shard başına (parça dosyası, dtype, kategoriler))
+    columns: Dict[str, Dict] = {}
+    n_rows = 0
+    try:
+        for i, df in enumerate(iter_dataset(data_dir, preprocess=False, use_cache=use_cache, compact=True)):
+            if not columns:
+                columns = {column: {'kind': _column_kind(df[column]), 'parts': []} for column in df.columns}
+            elif list(df.columns) != list(columns):
+                raise ValueError(f"Shard sütunları farklı: {list(df.columns)} != {list(columns)}")
+            for column, state in columns.items():
+                series = df[column]
+                if _column_kind(series) != state['kind']:
+                    raise ValueError(f"Shard'lar arasında sütun tipi farklı: {column}")
+                part_path = os.path.join(parts_dir, f"{column}.{i}.bin")
+                if state['kind'] == 'category':
+                    values, categories = series.cat.codes.to_numpy(), series.cat.categories
+                else:
+                    values, categories = series.to_numpy(), None
+                np.ascontiguousarray(values).tofile(part_path)
+                state['parts'].append((part_path, values.dtype, categories))
+            n_rows += len(df)
+        
+        manifest_columns = {}
+        for column, state in columns.items():
+            manifest_columns[column] = _write_column(store_dir, column, state['kind'], state['parts'])
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+    
+    tmp_path = f"{manifest_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': STORE_VERSION, 'n_rows': n_rows, 'columns': manifest_columns, 'shards': shards}, f)
+    os.replace(tmp_path, manifest_path)
+    return store_dir
+
+
+def _write_column(store_dir: str, column: str, kind: str, parts: List) -> Dict:
+    """
+    Sütunun shard parçalarını ortak tipe çevirerek tek dosyada birleştirir ve manifest girdisini döndürür.
+    """
+    spec = {'kind': kind, 'file': f"{column}.bin"}
+    if kind == 'category':
+        categories = _union_categories([part_categories for _, _, part_categories in parts])
+        dtype = _code_dtype(len(categories))
+        spec.update(_save_categories(os.path.join(store_dir, f"{column}.categories.npy"), categories))
+    else:
+        dtype = np.result_type(*[part_dtype for _, part_dtype, _ in parts]) if parts else np.dtype(np.float64)
+        if kind == 'datetime':
+            spec['unit'] = np.datetime_data(dtype)[0]
+    
+    with open(os.path.join(store_dir, spec['file']), 'wb') as f:
+        for part_path, part_dtype, part_categories in parts:
+            values = np.fromfile(part_path, dtype=part_dtype)
+            if kind == 'category':
+                # Shard kodu -> birleşim kodu (-1 NaN için korunur)
+                mapping = np.append(categories.get_indexer(part_categories), -1).astype(dtype)
+                values = mapping[values]
+            else:
+                values = values.astype(dtype, copy=False)
+            if kind == 'datetime':
+                values = values.view(np.int64)
+            values.tofile(f)
+    spec['dtype'] = (np.dtype(np.int64) if kind == 'datetime' else dtype).str
+    return spec
+
+
+class ColumnStore:
+    """
+    Read-only açılmış column store.
+    
+    Kullanım: Task 2 - Column store
+    """
+    
+    def __init__(self, store_dir: str, manifest: Dict):
+        """
+        Args:
+            store_dir: Store klasörü
+            manifest: Okunmuş manifest
+        """
+        self.store_dir = store_dir
+        self.manifest = manifest
+        self._arrays: Dict[str, object] = {}
+    
+    @classmethod
+    def open(cls, store_dir: str) -> "ColumnStore":
+        """
+        Store'u açar (dosyalar ilk erişimde map edilir).
+    
+        Args:
+            store_dir: Store klasörü
+    
+        Returns:
+            ColumnStore
+        """
+        with open(os.path.join(store_dir, MANIFEST_NAME), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') != STORE_VERSION:
+            raise ValueError(f"Column store versiyonu desteklenmiyor: {manifest.get('version')}")
+        return cls(store_dir, manifest)
+    
+    def __len__(self) -> int:
+        return self.manifest['n_rows']
+    
+    @property
+    def columns(self) -> List[str]:
+        return list(self.manifest['columns'])
+    
+    def _map(self, spec: Dict) -> np.ndarray:
+        """Sütun dosyasını read-only map eder (boş store'da boş array)."""
+        dtype = np.dtype(spec['dtype'])
+        if len(self) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(os.path.join(self.store_dir, spec['file']), dtype=dtype, mode='r', shape=(len(self),))
+    
+    def array(self, column: str):
+        """
+        Sütunu kopyasız döndürür: sayısal ve tarih sütunları için memory-mapped array
+        (tarihler datetime64 view'i), categorical sütunlar için map edilmiş kodları saran
+        pd.Categorical (.codes map edilmiş array'in kendisidir; Series.cat.codes ise yeni bir
+        Series olarak kopyalar).
+    
+        Args:
+            column: Sütun adı
+    
+        Returns:
+            np.ndarray veya pd.Categorical
+        """
+        if column not in self._arrays:
+            spec = self.manifest['columns'][column]
+            values = self._map(spec)
+            if spec['kind'] == 'datetime':
+                values = values.view(f"datetime64[{spec['unit']}]")
+            elif spec['kind'] == 'category':
+                categories = np.load(os.path.join(self.store_dir, spec['categories']),
+                                     allow_pickle=spec['categories_pickled'])
+                # Kodlar build sırasında doğrulandığı ve pandas'ın kod tipiyle yazıldığı için
+                # tekrar taranmaz ve cast edilmez: Categorical map edilmiş array'i doğrudan sarar
+                values = pd.Categorical.from_codes(values, categories=pd.Index(categories), validate=False)
+            self._arrays[column] = values
+        return self._arrays[column]
+    
+    def frame(self, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """
+        Sütunlardan kopyasız bir DataFrame kurar.
+        preprocess_data türetilen sütunları yeni array'ler olarak ekler, ham sütunlar map edilmiş kalır.
+    
+        Args:
+            columns: İstenen sütunlar (None ise tümü; store'da olmayanlar atlanır)
+    
+        Returns:
+            DataFrame
+        """
+        if columns is None:
+            columns = self.columns
+        columns = [c for c in dict.fromkeys(columns) if c in self.manifest['columns']]
+        return pd.DataFrame({column: self.array(column) for column in columns}, copy=False)
+
+
+def store_is_fresh(store_dir: str, data_dir: Optional[str] = None) -> bool:
+    """
+    Store'un mevcut shard'larla güncel olup olmadığını kontrol eder (bkz. data_loader.shard_unchanged).
+    
+    Kullanım: Task 2 - Column store
+    """
+    manifest_path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(manifest_path):
+        return False
+    try:
+        with open(manifest_path, 'r') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if manifest.get('version') != STORE_VERSION:
+        return False
+    
+    _, csv_files = find_shards(data_dir)
+    shard_paths = {os.path.basename(path): path for path in csv_files}
+    shards = manifest.get('shards', {})
+    if set(shards) != set(shard_paths):
+        return False
+    return all(shard_unchanged(shard_paths[name], fingerprint) for name, fingerprint in shards.items())
+
+
+def open_column_store(
+    data_dir: Optional[str] = None,
+    store_dir: Optional[str] = None,
+    use_cache: bool = True
+) -> ColumnStore:
+    """
+    Store güncel değilse (ilk çalıştırma veya shard'lar değişmiş) oluşturur ve açar.
+    
+    Args:
+        data_dir: Dataset klasörünün yolu (None ise otomatik bulunur)
+        store_dir: Store klasörü (None ise data_dir/.cache/column_store)
+        use_cache: Build sırasında shard başına Parquet cache kullanılsın mı
+    
+    Returns:
+        ColumnStore
+    
+    Kullanım: Task 2 - Column store
+    """
+    data_dir, _ = find_shards(data_dir)
+    if store_dir is None:
+        store_dir = default_store_dir(data_dir)
+    if not store_is_fresh(store_dir, data_dir):
+        print("Column store oluşturuluyor...")
+        build_column_store(data_dir, store_dir, use_cache)
+    return ColumnStore.open(store_dir)
@@ -8,23 +8,324 @@ CSV.gz dosyalarını okur ve birleştirir.
 Tarih dönüşümleri ve feature engineering işlemlerini yapar.
 """
 
+import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 import glob
+import hashlib
+import json
 import os
-from typing import Optional
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
 
+try:
+    import pyarrow.parquet  # Parquet cache için gerekli
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
 
-def load_dataset(data_dir: Optional[str] = None) -> pd.DataFrame:
+
+# Shard cache klasörünün dataset klasörü içindeki adı
+CACHE_DIR_NAME = ".cache"
+
+# Kompakt modda categorical (dictionary-encoded) tutulan string sütunlar
+CATEGORICAL_COLUMNS = ['platform', 'country', 'user_id']
+
+# Kompakt modda load sırasında datetime'a çevrilen sütunlar
+DATE_COLUMNS = ['event_date', 'install_date']
+
+
+def _file_hash(file_path: str) -> str:
     """
-    Tüm CSV.gz dosyalarını yükler ve birleştirir.
+    Dosyanın SHA-256 hash'ini hesaplar (1 MB'lık bloklar halinde okuyarak).
+    """
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _cache_paths(file_path: str, cache_dir: str) -> tuple:
+    """Shard için (parquet, metadata) cache dosya yollarını döndürür."""
+    name = os.path.basename(file_path)
+    if name.endswith('.csv.gz'):
+        name = name[:-len('.csv.gz')]
+    return os.path.join(cache_dir, f"{name}.parquet"), os.path.join(cache_dir, f"{name}.meta.json")
+
+
+def shard_fingerprint(file_path: str) -> Dict:
+    """
+    Shard'ın değişip değişmediğini anlamak için size, mtime ve içerik hash'ini döndürür.
+    
+    Kullanım: Task 2 - Parquet cache ve incremental refresh
+    """
+    stat = os.stat(file_path)
+    return {
+        'size': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+        'sha256': _file_hash(file_path)
+    }
+
+
+def shard_unchanged(file_path: str, fingerprint: Dict) -> bool:
+    """
+    Shard'ın fingerprint'teki haliyle aynı olup olmadığını kontrol eder.
+    mtime ve size aynıysa shard değişmemiştir. Size aynı fakat mtime farklıysa içerik hash'i
+    karşılaştırılır (ör. dosya sadece touch edilmişse); eşleşirse fingerprint'in mtime'ı güncellenir.
+    
+    Kullanım: Task 2 - Parquet cache ve incremental refresh
+    """
+    if not os.path.exists(file_path):
+        return False
+    stat = os.stat(file_path)
+    if stat.st_size != fingerprint.get('size'):
+        return False
+    if stat.st_mtime_ns == fingerprint.get('mtime_ns'):
+        return True
+    if _file_hash(file_path) != fingerprint.get('sha256'):
+        return False
+    fingerprint['mtime_ns'] = stat.st_mtime_ns
+    return True
+
+
+def _is_cache_fresh(file_path: str, meta_path: str) -> bool:
+    """
+    Cache'in shard ile güncel olup olmadığını kontrol eder (bkz. shard_unchanged).
+    """
+    if not os.path.exists(meta_path):
+        return False
+    try:
+        with open(meta_path, 'r') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    
+    mtime_ns = meta.get('mtime_ns')
+    if not shard_unchanged(file_path, meta):
+        return False
+    
+    # İçerik değişmemiş: sadece mtime'ı güncelle
+    if meta['mtime_ns'] != mtime_ns:
+        _write_json_atomic(meta_path, meta)
+    return True
+
+
+def _write_json_atomic(path: str, data: dict):
+    """JSON dosyasını önce geçici dosyaya yazıp rename ederek atomik olarak yazar."""
+    tmp_path = f"{path}.tmp{os.getpid()}"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f)
+    os.replace(tmp_path, path)
+
+
+def _build_filters(
+    event_date_range: Optional[Tuple] = None,
+    install_date_range: Optional[Tuple] = None,
+    platforms: Optional[Sequence[str]] = None,
+    countries: Optional[Sequence[str]] = None
+) -> Dict:
+    """
+    Satır filtrelerini sütun adı -> filtre şeklinde toplar.
+    Tarih aralıkları (başlangıç, bitiş) şeklindedir, iki uç da dahildir; None uç sınırsızdır.
+    """
+    filters = {}
+    if event_date_range is not None:
+        filters['event_date'] = ('range', event_date_range)
+    if install_date_range is not None:
+        filters['install_date'] = ('range', install_date_range)
+    if platforms is not None:
+        filters['platform'] = ('isin', list(platforms))
+    if countries is not None:
+        filters['country'] = ('isin', list(countries))
+    return filters
+
+
+def _apply_filters(df: pd.DataFrame, filters: Dict) -> pd.DataFrame:
+    """
+    Shard'a satır filtrelerini uygular (birleştirmeden önce, shard bazında).
+    """
+    if not filters:
+        return df
+    
+    mask = pd.Series(True, index=df.index)
+    for column, (kind, value) in filters.items():
+        if kind == 'range':
+            dates = pd.to_datetime(df[column])
+            start, end = value
+            if start is not None:
+                mask &= dates >= pd.Timestamp(start)
+            if end is not None:
+                mask &= dates <= pd.Timestamp(end)
+        else:
+            mask &= df[column].isin(value)
+    return df[mask].reset_index(drop=True)
+
+
+def filter_rows(
+    df: pd.DataFrame,
+    event_date_range: Optional[Tuple] = None,
+    install_date_range: Optional[Tuple] = None,
+    platforms: Optional[Sequence[str]] = None,
+    countries: Optional[Sequence[str]] = None
+) -> pd.DataFrame:
+    """
+    Yüklenmiş bir DataFrame'e load_dataset ile aynı satır filtrelerini uygular
+    (ör. column store'dan açılan tam dataset). Filtre yoksa DataFrame olduğu gibi döner.
+    
+    Kullanım: Task 2 - Satır filtreleri
+    """
+    return _apply_filters(df, _build_filters(event_date_range, install_date_range, platforms, countries))
+
+
+def _project(df: pd.DataFrame, columns: Optional[List[str]], filters: Dict) -> pd.DataFrame:
+    """
+    Filtreleri uygular ve yalnızca istenen sütunları (shard'da varsa) bırakır.
+    """
+    df = _apply_filters(df, filters)
+    if columns is not None:
+        df = df[[c for c in columns if c in df.columns]]
+    return df
+
+
+def _read_shard(
+    file_path: str,
+    cache_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    filters: Optional[Dict] = None
+) -> pd.DataFrame:
+    """
+    Tek bir CSV.gz dosyasını okur (worker thread/process içinde çalışır).
+    cache_dir verilirse shard ilk okumada Parquet'e çevrilir; sonraki okumalarda
+    (mtime, size ve hash ile geçerliliği kontrol edilen) Parquet dosyası okunur.
+    columns verilirse yalnızca bu sütunlar (ve filtre sütunları) okunur; filtreler
+    shard bazında birleştirmeden önce uygulanır.
     
     Args:
-        data_dir: Dataset klasörünün yolu (None ise script'in bulunduğu dizine göre otomatik bulur)
+        file_path: CSV.gz dosyasının yolu
+        cache_dir: Parquet cache klasörü (None ise cache kullanılmaz)
+        columns: Okunacak sütunlar (None ise tümü)
+        filters: _build_filters çıktısı
     
     Returns:
-        Birleştirilmiş DataFrame
+        Dosyanın DataFrame'i
+    """
+    filters = filters or {}
+    read_columns = None
+    if columns is not None:
+        read_columns = list(dict.fromkeys(list(columns) + list(filters)))
     
-    Kullanım: Task 2 - Dataset yükleme
+    if cache_dir is None:
+        usecols = None if read_columns is None else (lambda c: c in read_columns)
+        df = pd.read_csv(file_path, compression='gzip', usecols=usecols)
+        return _project(df, columns, filters)
+    
+    parquet_path, meta_path = _cache_paths(file_path, cache_dir)
+    if os.path.exists(parquet_path) and _is_cache_fresh(file_path, meta_path):
+        try:
+            if read_columns is not None:
+                available = pyarrow.parquet.read_schema(parquet_path).names
+                read_columns = [c for c in read_columns if c in available]
+            return _project(pd.read_parquet(parquet_path, columns=read_columns), columns, filters)
+        except Exception as e:
+            print(f"Uyarı: {parquet_path} cache'i okunamadı, CSV'den yeniden oluşturuluyor: {e}")
+    
+    # Stat, okumadan önce alınır; okuma sırasında dosya değişirse sonraki çalıştırmada cache yenilenir
+    stat = os.stat(file_path)
+    df = pd.read_csv(file_path, compression='gzip')
+    
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_path = f"{parquet_path}.tmp{os.getpid()}"
+        df.to_parquet(tmp_path, index=False)
+        os.replace(tmp_path, parquet_path)
+        _write_json_atomic(meta_path, {
+            'source': os.path.basename(file_path),
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': _file_hash(file_path)
+        })
+    except Exception as e:
+        print(f"Uyarı: {file_path} için cache yazılamadı: {e}")
+    
+    return _project(df, columns, filters)
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shard'ı bellek açısından kompakt tiplere çevirir (in place):
+    - Integer sayaçlar güvenli en küçük integer genişliğine indirilir
+    - platform, country, user_id categorical olur
+    - Tarih sütunları datetime64 olur
+    
+    Args:
+        df: Shard DataFrame'i
+    
+    Returns:
+        Aynı DataFrame (kompakt tiplerle)
+    
+    Kullanım: Task 2 - Bellek optimizasyonu
+    """
+    for column in df.columns:
+        if column in CATEGORICAL_COLUMNS:
+            df[column] = df[column].astype('category')
+        elif column in DATE_COLUMNS:
+            df[column] = pd.to_datetime(df[column])
+        elif pd.api.types.is_integer_dtype(df[column].dtype):
+            df[column] = pd.to_numeric(df[column], downcast='integer')
+    return df
+
+
+def _concat_frames(dataframes: List[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Shard'ları birleştirir. Categorical sütunlar union_categoricals ile birleştirilir
+    (pd.concat farklı kategorili sütunları object'e çevirirdi); kategoriler sıralı tutulur.
+    """
+    categorical = [
+        column for column in dataframes[0].columns
+        if all(isinstance(df[column].dtype, pd.CategoricalDtype) for df in dataframes if column in df.columns)
+        and all(column in df.columns for df in dataframes)
+    ]
+    if not categorical:
+        return pd.concat(dataframes, ignore_index=True)
+    
+    combined = pd.concat([df.drop(columns=categorical) for df in dataframes], ignore_index=True)
+    for column in categorical:
+        parts = [df[column] for df in dataframes]
+        # Tamamen boş shard'ların kategori tipi (ör. float) diğerleriyle eşitlenir
+        non_empty = [p for p in parts if len(p.cat.categories) > 0]
+        if non_empty:
+            reference = non_empty[0].cat.categories[:0]
+            parts = [p if len(p.cat.categories) > 0 else p.cat.set_categories(reference) for p in parts]
+        try:
+            values = union_categoricals(parts, sort_categories=True)
+        except TypeError:
+            values = pd.Categorical(pd.concat([p.astype(object) for p in parts], ignore_index=True))
+        combined[column] = values
+    return combined[list(dataframes[0].columns)]
+
+
+def _load_shard(
+    file_path: str,
+    cache_dir: Optional[str],
+    columns: Optional[List[str]],
+    filters: Dict,
+    compact: bool
+) -> pd.DataFrame:
+    """Shard'ı okur ve istenirse kompakt tiplere çevirir (worker içinde çalışır)."""
+    df = _read_shard(file_path, cache_dir, columns, filters)
+    return compact_dtypes(df) if compact else df
+
+
+def find_shards(data_dir: Optional[str]) -> Tuple[str, List[str]]:
+    """
+    Dataset klasörünü ve içindeki CSV.gz dosyalarını (sorted) bulur.
+    
+    Args:
+        data_dir: Dataset klasörünün yolu (None ise script'in bulunduğu dizine göre otomatik bulur)
+    
+    Returns:
+        (data_dir, csv_files)
     """
     # Eğer data_dir verilmemişse, script'in bulunduğu dizine göre bul
     if data_dir is None:
@@ -43,63 +344,156 @@ def load_dataset(data_dir: Optional[str] = None) -> pd.DataFrame:
     if not csv_files:
         raise FileNotFoundError(f"Dataset klasöründe CSV.gz dosyası bulunamadı: {data_dir}")
     
+    return data_dir, csv_files
+
+
+def _resolve_cache_dir(data_dir: str, use_cache: bool, cache_dir: Optional[str]) -> Optional[str]:
+    """Parquet cache klasörünü döndürür (cache kapalıysa veya pyarrow yoksa None)."""
+    if use_cache and not PARQUET_AVAILABLE:
+        print("Uyarı: pyarrow kurulu değil, Parquet cache devre dışı.")
+        use_cache = False
+    if not use_cache:
+        return None
+    if cache_dir is None:
+        cache_dir = os.path.join(data_dir, CACHE_DIR_NAME)
+    return cache_dir
+
+
+def load_dataset(
+    data_dir: Optional[str] = None,
+    n_workers: Optional[int] = None,
+    use_processes: bool = False,
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    event_date_range: Optional[Tuple] = None,
+    install_date_range: Optional[Tuple] = None,
+    platforms: Optional[Sequence[str]] = None,
+    countries: Optional[Sequence[str]] = None,
+    compact: bool = True
+) -> pd.DataFrame:
+    """
+    Tüm CSV.gz dosyalarını yükler ve birleştirir.
+    Dosyalar paralel olarak (thread veya process pool ile) açılır ve parse edilir;
+    birleştirme sırası her zaman sorted(glob) sırasıdır.
+    use_cache açıksa (ve pyarrow kuruluysa) her shard ilk okumada Parquet'e çevrilir,
+    sonraki çalıştırmalarda CSV yerine Parquet dosyası okunur.
+    columns ve satır filtreleri her shard okunurken uygulanır, böylece bellekte yalnızca
+    gereken sütunlar ve satırlar birleştirilir.
+    compact açıksa her shard okunurken kompakt tiplere çevrilir (bkz. compact_dtypes).
+    
+    Args:
+        data_dir: Dataset klasörünün yolu (None ise script'in bulunduğu dizine göre otomatik bulur)
+        n_workers: Paralel worker sayısı (None ise CPU sayısı, 1 ise sıralı okuma)
+        use_processes: True ise ThreadPoolExecutor yerine ProcessPoolExecutor kullanılır
+        use_cache: Shard başına Parquet cache kullanılsın mı
+        cache_dir: Cache klasörü (None ise data_dir/.cache)
+        columns: Yüklenecek sütunlar (None ise tümü)
+        event_date_range: (başlangıç, bitiş) event_date aralığı, uçlar dahil
+        install_date_range: (başlangıç, bitiş) install_date aralığı, uçlar dahil
+        platforms: Yalnızca bu platformlar
+        countries: Yalnızca bu ülkeler
+        compact: Sayaçlar küçük integer, string sütunlar categorical olarak tutulsun mu
+    
+    Returns:
+        Birleştirilmiş DataFrame
+    
+    Kullanım: Task 2 - Dataset yükleme
+    """
+    data_dir, csv_files = find_shards(data_dir)
+    
     print(f"Toplam {len(csv_files)} dosya bulundu. Yükleniyor...")
     
-    # Tüm dosyaları oku ve birleştir
-    dataframes = []
-    for i, file_path in enumerate(csv_files, 1):
-        try:
-            df = pd.read_csv(file_path, compression='gzip')
-            dataframes.append(df)
-            if i % 5 == 0 or i == len(csv_files):
-                print(f"  {i}/{len(csv_files)} dosya yüklendi...")
-        except Exception as e:
-            print(f"Uyarı: {file_path} yüklenirken hata oluştu: {e}")
-            continue
+    cache_dir = _resolve_cache_dir(data_dir, use_cache, cache_dir)
+    
+    filters = _build_filters(event_date_range, install_date_range, platforms, countries)
+    
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+    n_workers = max(1, min(n_workers, len(csv_files)))
+    
+    # Tüm dosyaları oku; sonuçlar dosya sırasına göre saklanır, progress tamamlanma sırasına göre basılır
+    results = [None] * len(csv_files)
+    
+    def report_progress(done_count):
+        if done_count % 5 == 0 or done_count == len(csv_files):
+            print(f"  {done_count}/{len(csv_files)} dosya yüklendi...")
+    
+    if n_workers == 1:
+        for i, file_path in enumerate(csv_files):
+            try:
+                results[i] = _load_shard(file_path, cache_dir, columns, filters, compact)
+            except Exception as e:
+                print(f"Uyarı: {file_path} yüklenirken hata oluştu: {e}")
+                continue
+            report_progress(i + 1)
+    else:
+        executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+        with executor_class(max_workers=n_workers) as executor:
+            futures = {executor.submit(_load_shard, file_path, cache_dir, columns, filters, compact): i for i, file_path in enumerate(csv_files)}
+            done_count = 0
+            for future in as_completed(futures):
+                i = futures[future]
+                try:
+                    results[i] = future.result()
+                except Exception as e:
+                    print(f"Uyarı: {csv_files[i]} yüklenirken hata oluştu: {e}")
+                    continue
+                done_count += 1
+                report_progress(done_count)
+    
+    dataframes = [df for df in results if df is not None]
     
     if not dataframes:
         raise ValueError("Hiçbir dosya yüklenemedi!")
     
     # Tüm DataFrame'leri birleştir
-    combined_df = pd.concat(dataframes, ignore_index=True)
+    combined_df = _concat_frames(dataframes)
     
     print(f"\nDataset yüklendi: {len(combined_df):,} satır, {len(combined_df.columns)} sütun")
     
     return combined_df
 
 
-def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
+def preprocess_data(df: pd.DataFrame, copy: bool = False) -> pd.DataFrame:
     """
     Dataset'i preprocessing yapar.
     Tarih sütunlarını datetime'a çevirir ve gerekli hesaplamaları yapar.
+    Türetilen sütunlar varsayılan olarak verilen DataFrame üzerine (in place) eklenir;
+    böylece tüm dataset'in bir kopyası oluşturulmaz.
     
     Args:
         df: Ham DataFrame
+        copy: True ise orijinal DataFrame korunur ve bir kopya üzerinde çalışılır
     
     Returns:
         Preprocessed DataFrame
     
     Kullanım: Task 2 - Data preprocessing
     """
-    df = df.copy()
+    if copy:
+        df = df.copy()
     
-    # Tarih sütunlarını datetime'a çevir
-    if 'event_date' in df.columns:
-        df['event_date'] = pd.to_datetime(df['event_date'])
-    if 'install_date' in df.columns:
-        df['install_date'] = pd.to_datetime(df['install_date'])
+    # Tarih sütunlarını datetime'a çevir (kompakt yüklemede ve column store'da zaten datetime'dır;
+    # bu durumda sütun değiştirilmez, memory-mapped array'ler kopyalanmaz)
+    for column in ('event_date', 'install_date'):
+        if column in df.columns and not pd.api.types.is_datetime64_any_dtype(df[column].dtype):
+            df[column] = pd.to_datetime(df[column])
     
     # Days since install hesapla
     if 'event_date' in df.columns and 'install_date' in df.columns:
-        df['days_since_install'] = (df['event_date'] - df['install_date']).dt.days
+        days_since_install = (df['event_date'] - df['install_date']).dt.days
+        if not days_since_install.isna().any():
+            days_since_install = pd.to_numeric(days_since_install, downcast='integer')
+        df['days_since_install'] = days_since_install
     
     # Session başına ortalama süre hesapla
     if 'total_session_count' in df.columns and 'total_session_duration' in df.columns:
         df['avg_session_duration'] = df['total_session_duration'] / df['total_session_count'].replace(0, 1)
     
-    # Win rate hesapla
+    # Win rate hesapla (küçük integer tiplerinde taşmayı önlemek için int64 ile toplanır)
     if 'victory_count' in df.columns and 'defeat_count' in df.columns:
-        total_matches = df['victory_count'] + df['defeat_count']
+        total_matches = df['victory_count'].astype(np.int64) + df['defeat_count'].astype(np.int64)
         df['win_rate'] = df['victory_count'] / total_matches.replace(0, 1)
     
     # Total revenue hesapla
@@ -108,3 +502,64 @@ def preprocess_data(df: pd.DataFrame) -> pd.DataFrame:
     
     return df
 
+
+def iter_dataset(
+    data_dir: Optional[str] = None,
+    chunk_rows: Optional[int] = None,
+    preprocess: bool = True,
+    use_cache: bool = True,
+    cache_dir: Optional[str] = None,
+    columns: Optional[List[str]] = None,
+    event_date_range: Optional[Tuple] = None,
+    install_date_range: Optional[Tuple] = None,
+    platforms: Optional[Sequence[str]] = None,
+    countries: Optional[Sequence[str]] = None,
+    compact: bool = True,
+    files: Optional[Sequence[str]] = None,
+    skip_errors: bool = True
+) -> Iterator[pd.DataFrame]:
+    """
+    Dataset'i shard shard (istenirse chunk_rows satırlık parçalar halinde) döndüren generator.
+    Bellekte aynı anda yalnızca bir shard tutulur; RAM'e sığmayan dataset'ler
+    analysis.stream_analyses ile bu generator üzerinden işlenebilir.
+    Okuma, cache ve filtre seçenekleri load_dataset ile aynıdır.
+    
+    Args:
+        data_dir: Dataset klasörünün yolu (None ise script'in bulunduğu dizine göre otomatik bulur)
+        chunk_rows: Her chunk'taki maksimum satır sayısı (None ise shard başına bir chunk)
+        preprocess: Chunk'lar preprocess_data'dan geçirilsin mi
+        use_cache: Shard başına Parquet cache kullanılsın mı
+        cache_dir: Cache klasörü (None ise data_dir/.cache)
+        columns: Yüklenecek sütunlar (None ise tümü)
+        event_date_range: (başlangıç, bitiş) event_date aralığı, uçlar dahil
+        install_date_range: (başlangıç, bitiş) install_date aralığı, uçlar dahil
+        platforms: Yalnızca bu platformlar
+        countries: Yalnızca bu ülkeler
+        compact: Sayaçlar küçük integer, string sütunlar categorical olarak tutulsun mu
+        files: Yalnızca bu shard dosyaları okunur (None ise klasördeki tüm shard'lar)
+        skip_errors: True ise okunamayan shard'lar uyarı verilerek atlanır, False ise hata yükseltilir
+    
+    Yields:
+        DataFrame chunk'ları (dosya sırasıyla)
+    
+    Kullanım: Task 2 - Streaming analizler
+    """
+    data_dir, csv_files = find_shards(data_dir)
+    if files is not None:
+        csv_files = list(files)
+    cache_dir = _resolve_cache_dir(data_dir, use_cache, cache_dir)
+    filters = _build_filters(event_date_range, install_date_range, platforms, countries)
+    
+    for file_path in csv_files:
+        try:
+            df = _load_shard(file_path, cache_dir, columns, filters, compact)
+        except Exception as e:
+            if not skip_errors:
+                raise
+            print(f"Uyarı: {file_path} yüklenirken hata oluştu: {e}")
+            continue
+        
+        step = chunk_rows if chunk_rows else max(len(df), 1)
+        for start in range(0, len(df), step):
+            chunk = df.iloc[start:start + step]
+            yield preprocess_data(chunk, copy=True) if preprocess else chunk
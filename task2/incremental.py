@@ -0,0 +1,226 @@
+# incremental.py
+# Task 2 - Incremental daily refresh
+# -ozgur
+
+"""
+Task 2 analizlerinin günlük incremental güncellemesi.
+Her analizin birleştirilebilir partial'ları (bkz. analysis.PartialAggregate) ve işlenmiş
+shard'ların fingerprint'leri diskte bir state dosyasında saklanır. Yeni bir gün shard'ı
+geldiğinde yalnızca o shard okunup mevcut partial'lara eklenir; sonuçlar partial'lardan
+finalize edilir ve tam yeniden hesaplama ile aynıdır.
+İşlenmiş bir shard değişmiş veya silinmişse ya da filtre seçenekleri farklıysa state
+geçersiz sayılır ve tüm shard'lar baştan işlenir.
+"""
+
+import json
+import os
+import pickle
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from analysis import PartialAccumulator, PartialAggregate, finalize_partials, merge_partials
+from data_loader import CACHE_DIR_NAME, find_shards, iter_dataset, shard_fingerprint, shard_unchanged
+from user_features import USER_FEATURE_COLUMNS, UserFeatures
+
+
+# State formatı değiştiğinde artırılır; farklı versiyondaki state dosyaları yeniden oluşturulur
+STATE_VERSION = 3
+
+# State dosyasının cache klasörü içindeki adı
+STATE_FILE_NAME = "incremental_state.pkl"
+
+# Kullanıcı feature tablosunun cache klasörü içindeki adı
+USER_FEATURES_DIR_NAME = "user_features"
+
+
+@dataclass
+class IncrementalState:
+    """
+    Incremental refresh state'i.
+    shards: Shard dosya adı -> fingerprint (bkz. data_loader.shard_fingerprint)
+    partials: Analiz adı -> birleştirilmiş PartialAggregate
+    options: State'in hesaplandığı filtre seçenekleri
+    
+    Kullanım: Task 2 - Incremental refresh
+    """
+    shards: Dict[str, Dict] = field(default_factory=dict)
+    partials: Dict[str, PartialAggregate] = field(default_factory=dict)
+    options: Dict = field(default_factory=dict)
+    version: int = STATE_VERSION
+
+
+def default_state_path(data_dir: str) -> str:
+    """State dosyasının varsayılan yolu (data_dir/.cache/incremental_state.pkl)."""
+    return os.path.join(data_dir, CACHE_DIR_NAME, STATE_FILE_NAME)
+
+
+def load_state(state_path: str) -> Optional[IncrementalState]:
+    """
+    State dosyasını okur.
+    
+    Args:
+        state_path: State dosyasının yolu
+    
+    Returns:
+        IncrementalState (dosya yoksa, okunamıyorsa veya versiyonu farklıysa None)
+    """
+    if not os.path.exists(state_path):
+        return None
+    try:
+        with open(state_path, 'rb') as f:
+            state = pickle.load(f)
+    except Exception as e:
+        print(f"Uyarı: {state_path} okunamadı, state yeniden oluşturulacak: {e}")
+        return None
+    if not isinstance(state, IncrementalState) or state.version != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state: IncrementalState, state_path: str):
+    """
+    State'i önce geçici dosyaya yazıp rename ederek atomik olarak kaydeder.
+    
+    Args:
+        state: Kaydedilecek state
+        state_path: State dosyasının yolu
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(state_path)), exist_ok=True)
+    tmp_path = f"{state_path}.tmp{os.getpid()}"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, state_path)
+
+
+def _state_is_valid(shards: Dict[str, Dict], state_options: Dict, shard_paths: Dict[str, str], options: Dict) -> bool:
+    """
+    İşlenmiş shard'ların ve seçeneklerin mevcut dataset ile hâlâ geçerli olup olmadığını kontrol eder.
+    """
+    if state_options != options:
+        print("Uyarı: Filtre seçenekleri değişmiş, incremental state yeniden oluşturulacak.")
+        return False
+    for name, fingerprint in shards.items():
+        if name not in shard_paths or not shard_unchanged(shard_paths[name], fingerprint):
+            print(f"Uyarı: {name} değişmiş veya silinmiş, incremental state yeniden oluşturulacak.")
+            return False
+    return True
+
+
+def refresh(
+    data_dir: Optional[str] = None,
+    state_path: Optional[str] = None,
+    analyses: List[str] = None,
+    use_cache: bool = True,
+    **filter_options
+) -> Tuple[Dict[str, object], List[str]]:
+    """
+    State'i yeni shard'larla günceller ve analiz sonuçlarını döndürür.
+    Yalnızca state'te olmayan shard'lar okunur; okunamayan shard'lar state'e yazılmaz ve
+    bir sonraki refresh'te tekrar denenir.
+    
+    Args:
+        data_dir: Dataset klasörünün yolu (None ise otomatik bulunur)
+        state_path: State dosyasının yolu (None ise data_dir/.cache/incremental_state.pkl)
+        analyses: Sonucu istenen analizler (STREAMING_ANALYSES anahtarları, None ise tümü)
+        use_cache: Shard başına Parquet cache kullanılsın mı
+        **filter_options: iter_dataset filtre seçenekleri (event_date_range, install_date_range,
+                          platforms, countries)
+    
+    Returns:
+        (analiz adı -> sonuç, bu refresh'te işlenen shard yolları)
+    
+    Kullanım: Task 2 - Incremental refresh
+    """
+    data_dir, csv_files = find_shards(data_dir)
+    if state_path is None:
+        state_path = default_state_path(data_dir)
+    shard_paths = {os.path.basename(path): path for path in csv_files}
+    
+    state = load_state(state_path)
+    if state is None or not _state_is_valid(state.shards, state.options, shard_paths, filter_options):
+        state = IncrementalState(options=dict(filter_options))
+    
+    new_files = [path for name, path in shard_paths.items() if name not in state.shards]
+    processed = []
+    # Yeni shard'ların partial'ları birleştirme ağacında toplanır ve state'e en sonda bir kez eklenir
+    new_partials = PartialAccumulator()
+    for file_path in new_files:
+        # Fingerprint okumadan önce alınır: okuma sırasında değişen shard bir sonraki refresh'te yakalanır
+        fingerprint = shard_fingerprint(file_path)
+        shard_partials = PartialAccumulator()
+        try:
+            for chunk in iter_dataset(
+                data_dir, use_cache=use_cache, files=[file_path], skip_errors=False, **filter_options
+            ):
+                shard_partials.add_chunk(chunk)
+        except Exception as e:
+            print(f"Uyarı: {file_path} işlenirken hata oluştu, bir sonraki refresh'te tekrar denenecek: {e}")
+            continue
+        new_partials.add(shard_partials.result())
+        state.shards[os.path.basename(file_path)] = fingerprint
+        processed.append(file_path)
+    if processed:
+        state.partials = merge_partials([state.partials, new_partials.result()])
+    
+    save_state(state, state_path)
+    if not state.partials:
+        raise ValueError("Hiçbir shard işlenemedi, analiz sonuçları hesaplanamıyor.")
+    return finalize_partials(state.partials, analyses), processed
+
+
+def refresh_user_features(
+    data_dir: Optional[str] = None,
+    directory: Optional[str] = None,
+    use_cache: bool = True,
+    **filter_options
+) -> Tuple[UserFeatures, List[str]]:
+    """
+    Kayıtlı kullanıcı feature tablosunu yeni shard'larla günceller (bkz. user_features.UserFeatures).
+    İşlenmiş shard'lar ve filtre seçenekleri tablonun metadata'sında saklanır; refresh ile aynı
+    kurallarla yalnızca yeni shard'lar okunur veya tablo baştan oluşturulur.
+    
+    Args:
+        data_dir: Dataset klasörünün yolu (None ise otomatik bulunur)
+        directory: Tablonun kayıt klasörü (None ise data_dir/.cache/user_features)
+        use_cache: Shard başına Parquet cache kullanılsın mı
+        **filter_options: iter_dataset filtre seçenekleri
+    
+    Returns:
+        (güncel UserFeatures, bu refresh'te işlenen shard yolları)
+    
+    Kullanım: Task 2 - Kullanıcı bazlı segmentasyonlar
+    """
+    data_dir, csv_files = find_shards(data_dir)
+    if directory is None:
+        directory = os.path.join(data_dir, CACHE_DIR_NAME, USER_FEATURES_DIR_NAME)
+    shard_paths = {os.path.basename(path): path for path in csv_files}
+    # Metadata JSON olarak saklandığı için seçenekler JSON karşılıklarıyla karşılaştırılır
+    options = json.loads(json.dumps(filter_options, default=str))
+    
+    features = UserFeatures.load(directory)
+    if features is not None and not _state_is_valid(
+        features.metadata.get('shards', {}), features.metadata.get('options'), shard_paths, options
+    ):
+        features = None
+    shards = {} if features is None else dict(features.metadata['shards'])
+    
+    processed = []
+    for file_path in [path for name, path in shard_paths.items() if name not in shards]:
+        fingerprint = shard_fingerprint(file_path)
+        try:
+            for chunk in iter_dataset(
+                data_dir, use_cache=use_cache, columns=USER_FEATURE_COLUMNS, files=[file_path],
+                skip_errors=False, **filter_options
+            ):
+                features = UserFeatures.from_frame(chunk) if features is None else features.update(chunk)
+        except Exception as e:
+            print(f"Uyarı: {file_path} işlenirken hata oluştu, bir sonraki refresh'te tekrar denenecek: {e}")
+            continue
+        shards[os.path.basename(file_path)] = fingerprint
+        processed.append(file_path)
+    
+    if features is None:
+        raise ValueError("Hiçbir shard işlenemedi, feature tablosu oluşturulamıyor.")
+    features.metadata = {'shards': shards, 'options': options}
+    features.save(directory)
+    return features, processed
@@ -0,0 +1,245 @@
+# pipeline.py
+# Task 2 - Analiz bağımlılık grafiği
+# -ozgur
+
+"""
+Task 2 analizleri için küçük bir bağımlılık grafiği (DAG) yürütücüsü.
+Her node ihtiyaç duyduğu ham sütunları ve girdi olarak kullandığı diğer node'ları bildirir.
+İlk gün metrikleri, kullanıcı bazlı revenue toplamları, trend aggregation'ları ve cohort
+matrisi gibi ortak ara sonuçlar bir kez hesaplanıp tüm tüketicilerine verilir.
+Yalnızca istenen analizler ve bağımlılıkları hesaplanır (lazy); birbirine bağımlı olmayan
+node'lar ThreadPoolExecutor üzerinde eşzamanlı çalışır (NumPy / pandas işlemlerinin büyük
+kısmı GIL'i bırakır). Çıktı ve grafikler yürütme bittikten sonra sırayla üretilir.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from analysis import (
+    ANALYSIS_COLUMNS,
+    analyze_match_completion_trends,
+    analyze_monetization_segments,
+    analyze_platform_country_comparison,
+    analyze_retention_by_segment,
+    analyze_session_duration_trends,
+    analyze_win_rate_trends,
+    assign_engagement_segments,
+    compute_key_aggregates,
+    first_day_user_metrics,
+    user_revenue_totals
+)
+from cohort_matrix import CohortMatrix
+from user_features import USER_FEATURE_COLUMNS, UserFeatures
+
+
+# Ham DataFrame'i temsil eden kaynak node'un adı
+DATA_NODE = 'data'
+
+
+@dataclass(frozen=True)
+class Node:
+    """
+    Grafikteki bir hesaplama adımı.
+    func, inputs sırasıyla girdi node'larının sonuçlarını pozisyonel argüman olarak alır.
+    columns, node DATA_NODE'u kullanıyorsa ihtiyaç duyduğu ham sütunlardır.
+    
+    Kullanım: Task 2 - Analiz pipeline'ı
+    """
+    name: str
+    func: Callable
+    inputs: Tuple[str, ...] = ()
+    columns: Tuple[str, ...] = ()
+
+
+class AnalysisPipeline:
+    """
+    Node'ları bağımlılık sırasına göre çalıştıran yürütücü.
+    
+    Kullanım: Task 2 - Analiz pipeline'ı
+    """
+    
+    def __init__(self, nodes: Sequence[Node]):
+        """
+        Args:
+            nodes: Node listesi (isimler tekil olmalı; DATA_NODE dışındaki girdiler listede bulunmalı)
+        """
+        self.nodes = {node.name: node for node in nodes}
+        for node in nodes:
+            for name in node.inputs:
+                if name != DATA_NODE and name not in self.nodes:
+                    raise ValueError(f"{node.name} node'unun girdisi tanımlı değil: {name}")
+    
+    def dependencies(self, targets: Sequence[str], available: Sequence[str] = ()) -> List[str]:
+        """
+        Hedeflerin ve tüm bağımlılıklarının topolojik sıralı listesini döndürür (DATA_NODE hariç).
+        
+        Args:
+            targets: Hesaplanması istenen node'lar
+            available: Sonucu zaten bilinen node'lar (kendileri ve yalnızca onlar için gereken
+                       bağımlılıklar listeye alınmaz)
+        
+        Returns:
+            Node adları (her node girdilerinden sonra gelir)
+        """
+        order, visiting = [], set()
+        
+        def visit(name):
+            if name == DATA_NODE or name in order or name in available:
+                return
+            if name not in self.nodes:
+                raise KeyError(f"Bilinmeyen node: {name}")
+            if name in visiting:
+                raise ValueError(f"Döngüsel bağımlılık: {name}")
+            visiting.add(name)
+            for input_name in self.nodes[name].inputs:
+                visit(input_name)
+            visiting.discard(name)
+            order.append(name)
+        
+        for target in targets:
+            visit(target)
+        return order
+    
+    def required_columns(self, targets: Sequence[str], available: Sequence[str] = ()) -> List[str]:
+        """
+        Hedeflerin hesaplanması için yüklenmesi gereken ham sütunların birleşimi.
+        
+        Kullanım: Task 2 - Column projection
+        """
+        columns = []
+        for name in self.dependencies(targets, available):
+            if DATA_NODE in self.nodes[name].inputs:
+                columns.extend(self.nodes[name].columns)
+        return list(dict.fromkeys(columns))
+    
+    def run(
+        self,
+        targets: Sequence[str],
+        load_data: Callable[[List[str]], pd.DataFrame],
+        data: Optional[pd.DataFrame] = None,
+        precomputed: Optional[Dict[str, object]] = None,
+        max_workers: Optional[int] = None,
+        share_data: bool = True
+    ) -> Dict[str, object]:
+        """
+        Hedefleri ve bağımlılıklarını hesaplar.
+        
+        Args:
+            targets: Hesaplanması istenen node'lar
+            load_data: Sütun listesi alıp preprocessed DataFrame döndüren fonksiyon
+            data: Önceden yüklenmiş DataFrame (None ise gerekirse load_data ile yüklenir)
+            precomputed: Node adı -> önceden hesaplanmış sonuç (ör. kayıtlı kullanıcı feature tablosu)
+            max_workers: Eşzamanlı çalışan node sayısı (None ise CPU sayısı, 1 ise sıralı)
+            share_data: False ise her node kendi sütunlarını ayrı yükler ve iş bitince bırakır
+                        (low-memory modu; max_workers=1 ile bellekte tek projeksiyon tutulur)
+        
+        Returns:
+            Node adı -> sonuç (hedefler ve hesaplanan ara sonuçlar)
+        
+        Kullanım: Task 2 - Analiz pipeline'ı
+        """
+        results = dict(precomputed or {})
+        order = self.dependencies(targets, results)
+        if share_data and data is None and any(DATA_NODE in self.nodes[name].inputs for name in order):
+            data = load_data(self.required_columns(targets, results))
+        
+        def execute(name):
+            node = self.nodes[name]
+            arguments = []
+            for input_name in node.inputs:
+                if input_name != DATA_NODE:
+                    arguments.append(results[input_name])
+                elif share_data:
+                    arguments.append(data)
+                else:
+                    arguments.append(load_data(list(node.columns)))
+            return node.func(*arguments)
+        
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        if max_workers == 1:
+            for name in order:
+                results[name] = execute(name)
+            return results
+        
+        pending = list(order)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            running = {}
+            while pending or running:
+                # Girdileri hazır olan node'ları başlat
+                for name in list(pending):
+                    if all(input_name == DATA_NODE or input_name in results for input_name in self.nodes[name].inputs):
+                        running[executor.submit(execute, name)] = name
+                        pending.remove(name)
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        return results
+
+
+def _columns(*analysis_names: str) -> Tuple[str, ...]:
+    """ANALYSIS_COLUMNS'taki sütunların birleşimi."""
+    columns = []
+    for name in analysis_names:
+        columns.extend(ANALYSIS_COLUMNS[name])
+    return tuple(dict.fromkeys(columns))
+
+
+# Task 2 analiz grafiği. Analiz node'larının adları ANALYSIS_COLUMNS anahtarlarıyla aynıdır.
+TASK2_NODES = (
+    # Ortak ara sonuçlar
+    Node('first_day_metrics', first_day_user_metrics, (DATA_NODE,), _columns('first_day_engagement')),
+    Node('user_revenue', user_revenue_totals, (DATA_NODE,), _columns('monetization_segments')),
+    Node('key_aggregates', compute_key_aggregates, (DATA_NODE,),
+         _columns('session_duration_trends', 'match_completion_trends', 'win_rate_trends')),
+    Node('cohort_matrix', CohortMatrix, (DATA_NODE,), ('user_id', 'event_date', 'install_date')),
+    # Analizler
+    Node('first_day_engagement', assign_engagement_segments, ('first_day_metrics',)),
+    Node('session_duration_trends', lambda aggregates: analyze_session_duration_trends(None, aggregates),
+         ('key_aggregates',)),
+    Node('retention_by_segment', lambda cohort_matrix, user_segments: analyze_retention_by_segment(
+        None, user_segments, cohort_matrix), ('cohort_matrix', 'first_day_engagement')),
+    Node('monetization_segments', lambda user_revenue: analyze_monetization_segments(None, user_revenue),
+         ('user_revenue',)),
+    Node('match_completion_trends', lambda aggregates: analyze_match_completion_trends(None, aggregates),
+         ('key_aggregates',)),
+    Node('platform_country_comparison', analyze_platform_country_comparison, (DATA_NODE,),
+         _columns('platform_country_comparison')),
+    Node('win_rate_trends', lambda aggregates: analyze_win_rate_trends(None, aggregates), ('key_aggregates',))
+)
+
+# Kullanıcı bazlı segmentasyonların ham event'ler yerine kullanıcı feature tablosundan okuduğu
+# node'lar (run'a precomputed olarak kayıtlı bir tablo verildiğinde kullanılır)
+USER_FEATURE_NODES = (
+    Node('user_features', UserFeatures.from_frame, (DATA_NODE,), tuple(USER_FEATURE_COLUMNS)),
+    Node('first_day_metrics', UserFeatures.first_day_metrics, ('user_features',)),
+    Node('user_revenue', UserFeatures.revenue_totals, ('user_features',))
+)
+
+# Çıktı sırasıyla Task 2 analizleri
+TASK2_ANALYSES = tuple(ANALYSIS_COLUMNS)
+
+
+def task2_pipeline(user_features: bool = False) -> AnalysisPipeline:
+    """
+    Task 2 analiz grafiğini döndürür.
+    
+    Args:
+        user_features: True ise ilk gün metrikleri ve kullanıcı revenue toplamları kullanıcı
+                       feature tablosundan okunur (USER_FEATURE_NODES). Tablo precomputed
+                       verilmediğinde ham event'lerden tek seferlik oluşturmak daha pahalı
+                       olduğu için varsayılan olarak hafif node'lar kullanılır.
+    
+    Returns:
+        AnalysisPipeline
+    
+    Kullanım: Task 2 - Analiz pipeline'ı
+    """
+    if not user_features:
+        return AnalysisPipeline(TASK2_NODES)
+    replaced = {node.name for node in USER_FEATURE_NODES}
+    return AnalysisPipeline(USER_FEATURE_NODES + tuple(node for node in TASK2_NODES if node.name not in replaced))
@@ -7,8 +7,10 @@ Task 2 için exploratory data analysis scripti.
 Tüm analizleri çalıştırır ve görselleştirmeleri oluşturur.
 """
 
-from data_loader import load_dataset, preprocess_data
+from data_loader import filter_rows, iter_dataset, load_dataset, preprocess_data
 from analysis import (
+    approximate_analyses,
+    compare_with_exact,
     segment_users_by_first_day_engagement,
     analyze_session_duration_trends,
     analyze_retention_by_segment,
@@ -26,6 +28,11 @@ from visualization import (
     plot_platform_country_comparison,
     plot_win_rate_trends
 )
+from column_store import open_column_store
+from incremental import refresh, refresh_user_features
+from pipeline import TASK2_ANALYSES, task2_pipeline
+from user_index import count_distinct
+import argparse
 import os
 import glob
 
@@ -59,7 +66,7 @@ def cleanup_old_graphs():
         print(f"Eski grafikler temizlendi: {deleted_count} dosya silindi.")
 
 
-def analysis_1_first_day_engagement(df):
+def analysis_1_first_day_engagement(df, precomputed=None):
     """
     Analiz 1: First-day engagement bazlı user segmentation.
     
@@ -69,7 +76,7 @@ def analysis_1_first_day_engagement(df):
     print("ANALİZ 1: First-Day Engagement Segmentation")
     print("="*60)
     
-    user_segments = segment_users_by_first_day_engagement(df)
+    user_segments = segment_users_by_first_day_engagement(df) if precomputed is None else precomputed
     
     # Segment istatistikleri
     segment_stats = user_segments['segment'].value_counts()
@@ -87,7 +94,7 @@ def analysis_1_first_day_engagement(df):
     return user_segments
 
 
-def analysis_2_session_duration_trends(df):
+def analysis_2_session_duration_trends(df, aggregates=None, precomputed=None):
     """
     Analiz 2: Session duration trendleri analizi.
     
@@ -97,7 +104,7 @@ def analysis_2_session_duration_trends(df):
     print("ANALİZ 2: Session Duration Trends")
     print("="*60)
     
-    trend_data = analyze_session_duration_trends(df)
+    trend_data = analyze_session_duration_trends(df, aggregates) if precomputed is None else precomputed
     
     # Günlük trend özeti
     daily_trend = trend_data['daily_trend']
@@ -122,7 +129,7 @@ def analysis_2_session_duration_trends(df):
     return trend_data
 
 
-def analysis_3_retention_by_segment(df, user_segments):
+def analysis_3_retention_by_segment(df, user_segments, precomputed=None):
     """
     Analiz 3: Segment bazlı retention analizi.
     
@@ -132,7 +139,7 @@ def analysis_3_retention_by_segment(df, user_segments):
     print("ANALİZ 3: Retention Analysis by Engagement Segment")
     print("="*60)
     
-    retention_df = analyze_retention_by_segment(df, user_segments)
+    retention_df = analyze_retention_by_segment(df, user_segments) if precomputed is None else precomputed
     
     # Her segment için retention özeti
     segments = retention_df['segment'].unique()
@@ -153,7 +160,7 @@ def analysis_3_retention_by_segment(df, user_segments):
     return retention_df
 
 
-def analysis_4_monetization_segments(df):
+def analysis_4_monetization_segments(df, precomputed=None):
     """
     Analiz 4: Monetization segmentasyonu.
     
@@ -163,10 +170,12 @@ def analysis_4_monetization_segments(df):
     print("ANALİZ 4: Monetization Segmentation")
     print("="*60)
     
-    monetization_df = analyze_monetization_segments(df)
+    monetization_df = analyze_monetization_segments(df) if precomputed is None else precomputed
     
     # Segment istatistikleri
+    # Segmentler categorical; veride bulunmayan segmentler listelenmez
     segment_stats = monetization_df['monetization_segment'].value_counts()
+    segment_stats = segment_stats[segment_stats > 0]
     print("\nMonetization Segment Dağılımı:")
     for segment, count in segment_stats.items():
         percentage = (count / len(monetization_df)) * 100
@@ -182,7 +191,7 @@ def analysis_4_monetization_segments(df):
     return monetization_df
 
 
-def analysis_5_match_completion_trends(df):
+def analysis_5_match_completion_trends(df, aggregates=None, precomputed=None):
     """
     Analiz 5: Match completion rate trendleri.
     
@@ -192,7 +201,7 @@ def analysis_5_match_completion_trends(df):
     print("ANALİZ 5: Match Completion Trends")
     print("="*60)
     
-    completion_data = analyze_match_completion_trends(df)
+    completion_data = analyze_match_completion_trends(df, aggregates) if precomputed is None else precomputed
     
     # Günlük trend özeti
     daily_trend = completion_data['daily_trend']
@@ -216,7 +225,7 @@ def analysis_5_match_completion_trends(df):
     return completion_data
 
 
-def analysis_6_platform_country_comparison(df):
+def analysis_6_platform_country_comparison(df, precomputed=None):
     """
     Analiz 6: Platform ve country karşılaştırması.
     
@@ -226,7 +235,7 @@ def analysis_6_platform_country_comparison(df):
     print("ANALİZ 6: Platform and Country Comparison")
     print("="*60)
     
-    comparison_data = analyze_platform_country_comparison(df)
+    comparison_data = analyze_platform_country_comparison(df) if precomputed is None else precomputed
     
     # Platform istatistikleri
     platform_stats = comparison_data['platform_stats']
@@ -255,7 +264,7 @@ def analysis_6_platform_country_comparison(df):
     return comparison_data
 
 
-def analysis_7_win_rate_trends(df):
+def analysis_7_win_rate_trends(df, aggregates=None, precomputed=None):
     """
     Analiz 7: Win rate trendleri.
     
@@ -265,7 +274,7 @@ def analysis_7_win_rate_trends(df):
     print("ANALİZ 7: Win Rate Trends")
     print("="*60)
     
-    win_rate_data = analyze_win_rate_trends(df)
+    win_rate_data = analyze_win_rate_trends(df, aggregates) if precomputed is None else precomputed
     
     # Günlük trend özeti
     daily_trend = win_rate_data['daily_trend']
@@ -290,10 +299,143 @@ def analysis_7_win_rate_trends(df):
     return win_rate_data
 
 
-def main():
+def run_approximate(load_options, relative_error, rank_error, check_exact=False):
+    """
+    Yaklaşık mod: dataset'i shard shard tek geçişte okur ve sketch'lerle özet çıkarır.
+    
+    Kullanım: Task 2 - Yaklaşık analizler
+    """
+    print("\n" + "="*60)
+    print("YAKLAŞIK ANALİZ (HyperLogLog + KLL)")
+    print("="*60)
+    
+    result = approximate_analyses(
+        iter_dataset(**load_options), relative_error=relative_error, rank_error=rank_error
+    )
+    bounds = result['error_bounds']
+    
+    print(f"\nUnique kullanıcı sayısı: ~{result['total_users']:,.0f} (±{bounds['unique_users_relative_error'] * 100:.2f}%)")
+    
+    print("\nPlatform Bazlı Unique Kullanıcılar:")
+    for _, row in result['users_by_platform'].iterrows():
+        print(f"  {row['platform']}: ~{row['unique_users']:,.0f}")
+    
+    print("\nTop 5 Country (Unique Kullanıcı):")
+    for _, row in result['users_by_country'].head(5).iterrows():
+        print(f"  {row['country']}: ~{row['unique_users']:,.0f}")
+    
+    print(f"\nEngagement Threshold'ları (rank error ±{bounds['engagement_threshold_rank_error'] * 100:.2f}%):")
+    for _, row in result['engagement_thresholds'].iterrows():
+        values = ", ".join(f"{column}={row[column]:.2f}" for column in result['engagement_thresholds'].columns[1:])
+        print(f"  {row['metric']}: {values}")
+    
+    print(f"\nSegment Dağılımı (örneklem: {bounds['segment_sample_size']:,} kullanıcı):")
+    for _, row in result['users_by_segment'].iterrows():
+        print(f"  {row['segment']}: ~{row['unique_users']:,.0f} kullanıcı ({row['share'] * 100:.2f}% ±{row['share_error'] * 100:.2f})")
+    
+    print("\nSession Duration Dağılımı:")
+    for _, row in result['session_duration_quantiles'].iterrows():
+        print(f"  q{row['quantile']:g}: avg {row['avg_session_duration']:.2f} saniye, total {row['total_session_duration']:.2f} saniye")
+    
+    if check_exact:
+        # Tam dataset yüklenir ve yaklaşık sonuçların hata payları içinde kaldığı kontrol edilir
+        comparison = compare_with_exact(result, preprocess_data(load_dataset(**load_options)))
+        print("\nTam Sonuçlarla Karşılaştırma:")
+        for _, row in comparison.iterrows():
+            status = "OK" if row['within_bound'] else "SINIR AŞILDI"
+            print(f"  {row['quantity']}: yaklaşık {row['approximate']:,.4g}, tam {row['exact']:,.4g}, "
+                  f"hata {row['error']:.4f} (sınır {row['bound']:.4f}) {status}")
+    
+    return result
+
+
+def report_results(results, selected):
+    """
+    Hesaplanmış analiz sonuçlarını sırayla yazdırır ve grafiklerini oluşturur.
+    Grafikler ve çıktı eşzamanlı üretilmez; yalnızca hesaplama pipeline'da paraleldir.
+    
+    Args:
+        results: Analiz adı -> sonuç
+        selected: Raporlanacak analizler
+    
+    Kullanım: Task 2 - Analiz raporları
+    """
+    reports = {
+        'first_day_engagement': lambda: analysis_1_first_day_engagement(None, precomputed=results['first_day_engagement']),
+        'session_duration_trends': lambda: analysis_2_session_duration_trends(None, precomputed=results['session_duration_trends']),
+        'retention_by_segment': lambda: analysis_3_retention_by_segment(None, None, precomputed=results['retention_by_segment']),
+        'monetization_segments': lambda: analysis_4_monetization_segments(None, precomputed=results['monetization_segments']),
+        'match_completion_trends': lambda: analysis_5_match_completion_trends(None, precomputed=results['match_completion_trends']),
+        'platform_country_comparison': lambda: analysis_6_platform_country_comparison(None, precomputed=results['platform_country_comparison']),
+        'win_rate_trends': lambda: analysis_7_win_rate_trends(None, precomputed=results['win_rate_trends'])
+    }
+    for name in TASK2_ANALYSES:
+        if name in selected:
+            reports[name]()
+
+
+def run_incremental(load_options, state_path, selected):
+    """
+    Incremental mod: state'e yalnızca yeni shard'ları ekler ve analizleri state'ten üretir.
+    Sonuçlar tam yeniden hesaplama ile aynıdır.
+    
+    Kullanım: Task 2 - Incremental refresh
+    """
+    print("\nIncremental state güncelleniyor...")
+    results, new_files = refresh(state_path=state_path, analyses=list(selected), **load_options)
+    print(f"{len(new_files)} yeni shard işlendi")
+    
+    report_results(results, selected)
+    return results
+
+
+def parse_args(argv=None):
+    """
+    Komut satırı argümanlarını okur (dataset klasörü, satır filtreleri, analiz seçimi, low-memory,
+    yaklaşık ve incremental mod).
+    """
+    parser = argparse.ArgumentParser(description="Vertigo Data Analyst Case - Task 2")
+    parser.add_argument('--data-dir', default=None, help="Dataset klasörü (varsayılan: task2/dataset)")
+    parser.add_argument('--start-date', default=None, help="event_date alt sınırı (YYYY-MM-DD, dahil)")
+    parser.add_argument('--end-date', default=None, help="event_date üst sınırı (YYYY-MM-DD, dahil)")
+    parser.add_argument('--install-start-date', default=None, help="install_date alt sınırı (dahil)")
+    parser.add_argument('--install-end-date', default=None, help="install_date üst sınırı (dahil)")
+    parser.add_argument('--platform', action='append', default=None, help="Yalnızca bu platform (tekrarlanabilir)")
+    parser.add_argument('--country', action='append', default=None, help="Yalnızca bu ülke (tekrarlanabilir)")
+    parser.add_argument('--only', action='append', default=None, choices=TASK2_ANALYSES,
+                        help="Yalnızca bu analizi ve bağımlılıklarını çalıştırır (tekrarlanabilir)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="Eşzamanlı hesaplanan analiz sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument('--low-memory', action='store_true',
+                        help="Her analiz için yalnızca gereken sütunları ayrı ayrı yükler")
+    parser.add_argument('--approximate', action='store_true',
+                        help="Tek geçişli yaklaşık özet (HyperLogLog + KLL) çalıştırır, tam analizleri atlar")
+    parser.add_argument('--relative-error', type=float, default=0.01,
+                        help="Yaklaşık modda unique kullanıcı sayılarının relative error'u")
+    parser.add_argument('--rank-error', type=float, default=0.01,
+                        help="Yaklaşık modda quantile'ların rank error'u")
+    parser.add_argument('--check-exact', action='store_true',
+                        help="Yaklaşık modda sonuçları tam hesaplamayla karşılaştırır (tam dataset yüklenir)")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Kayıtlı aggregate state'ine yalnızca yeni shard'ları ekler (tam yükleme yapılmaz)")
+    parser.add_argument('--column-store', action='store_true',
+                        help="Dataset'i <data-dir>/.cache/column_store altındaki memory-mapped sütun "
+                             "dosyalarından kopyasız açar (gerekirse önce oluşturur)")
+    parser.add_argument('--user-features', action='store_true',
+                        help="Kullanıcı feature tablosunu <data-dir>/.cache/user_features altında saklar ve "
+                             "yalnızca yeni shard'larla günceller")
+    parser.add_argument('--state-path', default=None,
+                        help="Incremental state dosyası (varsayılan: <data-dir>/.cache/incremental_state.pkl)")
+    return parser.parse_args(argv)
+
+
+def main(args=None):
     """
     Tüm Task 2 analizlerini sırasıyla çalıştırır.
     """
+    if args is None:
+        args = parse_args()
+    
     print("\n" + "="*60)
     print("VERTIGO DATA ANALYST CASE - TASK 2")
     print("="*60)
@@ -301,23 +443,79 @@ def main():
     # Eski grafikleri temizle
     cleanup_old_graphs()
     
+    # Satır filtreleri her shard okunurken uygulanır
+    load_options = {
+        'data_dir': args.data_dir,  # None ise otomatik olarak task2/dataset klasörünü bulur
+        'event_date_range': (args.start_date, args.end_date) if (args.start_date or args.end_date) else None,
+        'install_date_range': (args.install_start_date, args.install_end_date) if (args.install_start_date or args.install_end_date) else None,
+        'platforms': args.platform,
+        'countries': args.country
+    }
+    
+    if args.approximate:
+        run_approximate(load_options, args.relative_error, args.rank_error, args.check_exact)
+        return
+    
+    selected = args.only or TASK2_ANALYSES
+    
+    if args.incremental:
+        run_incremental(load_options, args.state_path, selected)
+        print("\n" + "="*60)
+        print("TASK 2 TAMAMLANDI - Grafikleri task2/graphs klasöründe görüntüleyebilirsiniz.")
+        print("="*60 + "\n")
+        return
+    
+    if args.column_store:
+        # Sütunlar memory-mapped dosyalardan kopyasız açılır; yalnızca filtreler ve
+        # preprocess_data'nın türettiği sütunlar yeni bellek kullanır
+        store = open_column_store(args.data_dir)
+        row_filters = {key: value for key, value in load_options.items() if key != 'data_dir'}
+        
+        def load_columns(columns):
+            """Verilen sütunları store'dan açar, filtreler ve preprocess eder."""
+            return preprocess_data(filter_rows(store.frame(columns), **row_filters))
+    else:
+        def load_columns(columns):
+            """Verilen sütunları yükler ve preprocess eder."""
+            return preprocess_data(load_dataset(columns=columns, **load_options))
+    
+    pipeline = task2_pipeline(user_features=args.user_features)
+    
+    # Kayıtlı kullanıcı feature tablosu yeni shard'larla güncellenir ve pipeline'a hazır verilir
+    precomputed = {}
+    if args.user_features and 'user_features' in pipeline.dependencies(selected):
+        features, new_files = refresh_user_features(**load_options)
+        print(f"Kullanıcı feature tablosu güncellendi: {len(features):,} kullanıcı, {len(new_files)} yeni shard")
+        precomputed['user_features'] = features
+    
     # Dataset'i yükle ve preprocess et
     print("\nDataset yükleniyor...")
-    df = load_dataset()  # Otomatik olarak task2/dataset klasörünü bulur
-    df = preprocess_data(df)
+    if args.low_memory:
+        # Her node kendi sütunlarını ayrı yükler; bellekte aynı anda tek projeksiyon tutulur
+        df = load_columns(['event_date', 'user_id'])
+    else:
+        # Yalnızca seçilen analizlerin ihtiyaç duyduğu sütunlar yüklenir
+        df = load_columns(list(dict.fromkeys(
+            ['event_date', 'user_id'] + pipeline.required_columns(selected, precomputed)
+        )))
     
     print(f"\nDataset hazır: {len(df):,} satır")
     print(f"Tarih aralığı: {df['event_date'].min()} - {df['event_date'].max()}")
-    print(f"Unique kullanıcı sayısı: {df['user_id'].nunique():,}")
+    print(f"Unique kullanıcı sayısı: {count_distinct(df['user_id']):,}")
+    
+    # Seçilen analizler ve ortak ara sonuçları (ilk gün metrikleri, kullanıcı revenue toplamları,
+    # trend aggregation'ları, cohort matrisi) bağımlılık grafiği üzerinden bir kez hesaplanır;
+    # low-memory modunda node'lar sırayla ve kendi projeksiyonları üzerinden çalışır
+    data = None if args.low_memory else df
+    del df
+    results = pipeline.run(
+        selected, load_columns, data=data, precomputed=precomputed,
+        max_workers=1 if args.low_memory else args.workers,
+        share_data=not args.low_memory
+    )
+    del data
     
-    # Analizleri çalıştır
-    user_segments = analysis_1_first_day_engagement(df)
-    session_trends = analysis_2_session_duration_trends(df)
-    retention_analysis = analysis_3_retention_by_segment(df, user_segments)
-    monetization_segments = analysis_4_monetization_segments(df)
-    completion_trends = analysis_5_match_completion_trends(df)
-    platform_country = analysis_6_platform_country_comparison(df)
-    win_rate_trends = analysis_7_win_rate_trends(df)
+    report_results(results, selected)
     
     print("\n" + "="*60)
     print("TASK 2 TAMAMLANDI - Grafikleri task2/graphs klasöründe görüntüleyebilirsiniz.")
@@ -326,4 +524,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -0,0 +1,346 @@
+# sketches.py
+# Task 2 - Yaklaşık analizler için sketch'ler
+# -ozgur
+
+"""
+Tam dataset üzerinde keşif amaçlı, tek geçişli ve sabit bellekli yaklaşık analizler için
+birleştirilebilir (mergeable) sketch'ler:
+- HyperLogLog / GroupedHyperLogLog: distinct kullanıcı sayıları
+- KLLSketch: quantile'lar (ör. q33 / q66 threshold'ları, session duration dağılımı)
+- BottomKSample: hash'e göre en küçük k kullanıcının örneklemi (segment payları için)
+Her sketch hata payını (relative_error / rank_error) raporlar ve aynı ayarlarla oluşturulmuş
+sketch'ler merge ile birleştirilebilir; böylece shard'lar ayrı ayrı işlenebilir.
+"""
+
+import math
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+
+# KLL normalized rank error sabiti (~%99 güven): rank_error ≈ KLL_ERROR_CONSTANT / k
+KLL_ERROR_CONSTANT = 1.65
+
+
+def hash_values(values: pd.Series) -> np.ndarray:
+    """
+    Değerleri 64-bit hash'lere çevirir (pd.util.hash_array).
+    Categorical sütunlarda yalnızca kategoriler hash'lenir, satırlar kodlar üzerinden eşlenir.
+    
+    Args:
+        values: Hash'lenecek sütun
+    
+    Returns:
+        uint64 hash array'i (NaN değerler için de bir hash döner; çağıran maskelemelidir)
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        category_hashes = pd.util.hash_array(values.cat.categories.to_numpy())
+        return category_hashes[values.cat.codes.to_numpy()]
+    return pd.util.hash_array(values.to_numpy())
+
+
+def _bit_length(values: np.ndarray) -> np.ndarray:
+    """uint64 değerlerin bit uzunluğu (0 için 0); 32-bit yarılar üzerinden tam hesaplanır."""
+    high = (values >> np.uint64(32)).astype(np.float64)
+    low = (values & np.uint64(0xFFFFFFFF)).astype(np.float64)
+    high_length = np.frexp(high)[1]
+    low_length = np.frexp(low)[1]
+    return np.where(high_length > 0, high_length + 32, low_length).astype(np.uint8)
+
+
+def _precision_for_error(relative_error: float) -> int:
+    """İstenen relative standard error için HyperLogLog precision'ı (4..18)."""
+    return int(min(18, max(4, math.ceil(math.log2((1.04 / relative_error) ** 2)))))
+
+
+def _register_updates(hashes: np.ndarray, precision: int):
+    """Hash'lerden register index'lerini ve rho (ilk 1 bitinin pozisyonu) değerlerini çıkarır."""
+    index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    remainder = hashes & np.uint64((1 << (64 - precision)) - 1)
+    rho = (64 - precision) - _bit_length(remainder).astype(np.int64) + 1
+    return index, rho.astype(np.uint8)
+
+
+def _estimate(registers: np.ndarray) -> np.ndarray:
+    """
+    Register'lardan cardinality tahmini (son eksen boyunca).
+    Küçük değerlerde linear counting düzeltmesi uygulanır; 64-bit hash'lerde büyük değer
+    düzeltmesine gerek yoktur.
+    """
+    m = registers.shape[-1]
+    alpha = {16: 0.673, 32: 0.697, 64: 0.709}.get(m, 0.7213 / (1 + 1.079 / m))
+    raw = alpha * m * m / np.sum(np.ldexp(1.0, -registers.astype(np.int64)), axis=-1)
+    zeros = np.sum(registers == 0, axis=-1)
+    with np.errstate(divide='ignore'):
+        linear = m * np.log(m / np.maximum(zeros, 1))
+    return np.where((raw <= 2.5 * m) & (zeros > 0), linear, raw)
+
+
+class HyperLogLog:
+    """
+    Distinct sayım için HyperLogLog sketch'i (2^precision adet uint8 register).
+    Relative standard error ≈ 1.04 / sqrt(2^precision).
+    
+    Kullanım: Task 2 - Yaklaşık analizler
+    """
+    
+    def __init__(self, precision: int = 14):
+        """
+        Args:
+            precision: Register sayısının log2'si (4..18)
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision 4 ile 18 arasında olmalı: {precision}")
+        self.precision = precision
+        self.registers = np.zeros(1 << precision, dtype=np.uint8)
+    
+    @classmethod
+    def from_error(cls, relative_error: float) -> "HyperLogLog":
+        """İstenen relative standard error'u sağlayan sketch oluşturur."""
+        return cls(_precision_for_error(relative_error))
+    
+    @property
+    def relative_error(self) -> float:
+        """Tahminin relative standard error'u."""
+        return 1.04 / math.sqrt(len(self.registers))
+    
+    def add_hashes(self, hashes: np.ndarray):
+        """64-bit hash'leri sketch'e ekler."""
+        index, rho = _register_updates(hashes, self.precision)
+        np.maximum.at(self.registers, index, rho)
+    
+    def add(self, values: pd.Series):
+        """Değerleri (NaN hariç) sketch'e ekler."""
+        self.add_hashes(hash_values(values)[values.notna().to_numpy()])
+    
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Aynı precision'daki iki sketch'i birleştirir (register bazında max)."""
+        if other.precision != self.precision:
+            raise ValueError("Farklı precision'daki HyperLogLog'lar birleştirilemez")
+        merged = HyperLogLog(self.precision)
+        merged.registers = np.maximum(self.registers, other.registers)
+        return merged
+    
+    def count(self) -> float:
+        """Tahmini distinct değer sayısı."""
+        return float(_estimate(self.registers))
+
+
+class GroupedHyperLogLog:
+    """
+    Key başına bir HyperLogLog (ör. gün, platform veya country başına distinct kullanıcı).
+    Register'lar (grup sayısı x 2^precision) matrisinde tutulur ve bir chunk'taki tüm
+    gruplar tek np.maximum.at çağrısıyla güncellenir.
+    
+    Kullanım: Task 2 - Yaklaşık analizler
+    """
+    
+    def __init__(self, precision: int = 14):
+        """
+        Args:
+            precision: Register sayısının log2'si (4..18)
+        """
+        if not 4 <= precision <= 18:
+            raise ValueError(f"precision 4 ile 18 arasında olmalı: {precision}")
+        self.precision = precision
+        self.keys: List = []
+        self._positions: Dict = {}
+        self.registers = np.zeros((0, 1 << precision), dtype=np.uint8)
+    
+    @property
+    def relative_error(self) -> float:
+        """Her grup tahmininin relative standard error'u."""
+        return 1.04 / math.sqrt(self.registers.shape[1])
+    
+    def _rows_for(self, keys: Sequence) -> np.ndarray:
+        """Key'lerin register satırlarını döndürür, yeni key'ler için satır açar."""
+        new_keys = [key for key in keys if key not in self._positions]
+        for key in new_keys:
+            self._positions[key] = len(self.keys)
+            self.keys.append(key)
+        if new_keys:
+            self.registers = np.vstack([
+                self.registers, np.zeros((len(new_keys), self.registers.shape[1]), dtype=np.uint8)
+            ])
+        return np.array([self._positions[key] for key in keys], dtype=np.int64)
+    
+    def add(self, keys: pd.Series, values: pd.Series):
+        """
+        (key, değer) çiftlerini ekler; key'i veya değeri NaN olan satırlar atlanır.
+        
+        Args:
+            keys: Grup key'leri
+            values: Sayılacak değerler (ör. user_id)
+        """
+        valid = (keys.notna() & values.notna()).to_numpy()
+        group_codes, uniques = pd.factorize(keys[valid])
+        if len(uniques) == 0:
+            return
+        rows = self._rows_for(list(uniques))[group_codes]
+        index, rho = _register_updates(hash_values(values)[valid], self.precision)
+        np.maximum.at(self.registers, (rows, index), rho)
+    
+    def merge(self, other: "GroupedHyperLogLog") -> "GroupedHyperLogLog":
+        """Aynı precision'daki iki grup sketch'ini birleştirir."""
+        if other.precision != self.precision:
+            raise ValueError("Farklı precision'daki HyperLogLog'lar birleştirilemez")
+        merged = GroupedHyperLogLog(self.precision)
+        merged._rows_for(self.keys + [key for key in other.keys if key not in self._positions])
+        merged.registers[merged._rows_for(self.keys)] = self.registers
+        other_rows = merged._rows_for(other.keys)
+        merged.registers[other_rows] = np.maximum(merged.registers[other_rows], other.registers)
+        return merged
+    
+    def counts(self) -> pd.Series:
+        """Key başına tahmini distinct sayılar (key'e göre sıralı)."""
+        return pd.Series(_estimate(self.registers), index=pd.Index(self.keys)).sort_index()
+
+
+class KLLSketch:
+    """
+    Birleştirilebilir quantile sketch'i (KLL).
+    h. seviyedeki her eleman 2^h ağırlık taşır; kapasitesi aşılan seviye sıralanır ve
+    rastgele offset ile her iki elemandan biri bir üst seviyeye taşınır.
+    Normalized rank error ≈ KLL_ERROR_CONSTANT / k.
+    
+    Kullanım: Task 2 - Yaklaşık analizler
+    """
+    
+    def __init__(self, k: int = 200, seed: Optional[int] = None):
+        """
+        Args:
+            k: En üst seviyenin kapasitesi (büyük k = küçük hata, fazla bellek)
+            seed: Compaction offset'leri için random seed
+        """
+        self.k = k
+        self.n = 0
+        self.levels: List[np.ndarray] = [np.empty(0)]
+        self._rng = np.random.default_rng(seed)
+    
+    @classmethod
+    def from_error(cls, rank_error: float, seed: Optional[int] = None) -> "KLLSketch":
+        """İstenen normalized rank error'u sağlayan sketch oluşturur."""
+        return cls(max(8, math.ceil(KLL_ERROR_CONSTANT / rank_error)), seed=seed)
+    
+    @property
+    def rank_error(self) -> float:
+        """Quantile tahminlerinin normalized rank error'u."""
+        return KLL_ERROR_CONSTANT / self.k
+    
+    def _capacity(self, level: int) -> int:
+        """Seviye kapasitesi: üst seviyeden aşağı doğru 2/3 oranında azalır (min 2)."""
+        depth = len(self.levels) - 1 - level
+        return max(2, int(math.ceil(self.k * (2.0 / 3.0) ** depth)))
+    
+    def _compress(self):
+        """Kapasitesi aşılan seviyeleri alttan üste doğru sıkıştırır."""
+        level = 0
+        while level < len(self.levels):
+            items = self.levels[level]
+            if len(items) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # Tek sayıda eleman varsa biri bu seviyede kalır
+                kept = items[:len(items) % 2]
+                items = items[len(items) % 2:]
+                promoted = items[int(self._rng.integers(2))::2]
+                self.levels[level + 1] = np.concatenate([self.levels[level + 1], promoted])
+                self.levels[level] = kept
+            level += 1
+    
+    def update(self, values):
+        """Değerleri (NaN hariç) sketch'e ekler."""
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return
+        self.n += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        self._compress()
+    
+    def merge(self, other: "KLLSketch") -> "KLLSketch":
+        """
+        İki sketch'i birleştirir (k küçük olanınki kullanılır).
+        Birleşik sketch kendi random generator'ını kullanır; seed'i self'in generator'ından
+        çekildiği için seed verilmiş sketch'lerde sonuç tekrarlanabilir kalır.
+        """
+        merged = KLLSketch(min(self.k, other.k), seed=int(self._rng.integers(2 ** 63)))
+        merged.n = self.n + other.n
+        depth = max(len(self.levels), len(other.levels))
+        merged.levels = [
+            np.concatenate([
+                self.levels[h] if h < len(self.levels) else np.empty(0),
+                other.levels[h] if h < len(other.levels) else np.empty(0)
+            ])
+            for h in range(depth)
+        ]
+        merged._compress()
+        return merged
+    
+    def quantile(self, q):
+        """
+        Tahmini quantile(lar).
+        
+        Args:
+            q: 0-1 arası quantile veya quantile listesi
+        
+        Returns:
+            Tahmini değer(ler) (sketch boşsa NaN)
+        """
+        quantiles = np.atleast_1d(np.asarray(q, dtype=float))
+        if self.n == 0:
+            result = np.full(len(quantiles), np.nan)
+        else:
+            items = np.concatenate(self.levels)
+            weights = np.concatenate([np.full(len(items_h), 2.0 ** h) for h, items_h in enumerate(self.levels)])
+            order = np.argsort(items, kind='stable')
+            cumulative = np.cumsum(weights[order])
+            positions = np.searchsorted(cumulative, quantiles * cumulative[-1], side='left')
+            result = items[order][np.clip(positions, 0, len(items) - 1)]
+        return result if np.ndim(q) else float(result[0])
+
+
+class BottomKSample:
+    """
+    Kullanıcı hash'ine göre en küçük k kullanıcının örneklemi (KMV / bottom-k).
+    Aynı kullanıcının farklı chunk'lardaki satırları toplanır; örneklem hash'e göre
+    seçildiği için merge sonucu tek geçişte alınan örneklemle aynıdır.
+    
+    Kullanım: Task 2 - Yaklaşık segment payları
+    """
+    
+    def __init__(self, size: int = 10000):
+        """
+        Args:
+            size: Örneklemdeki maksimum kullanıcı sayısı
+        """
+        self.size = size
+        self.rows = pd.DataFrame()
+    
+    def add(self, user_hashes: np.ndarray, metrics: pd.DataFrame):
+        """
+        Kullanıcı satırlarını ekler (metrics sütunları kullanıcı bazında toplanır).
+        
+        Args:
+            user_hashes: Satır bazlı kullanıcı hash'leri
+            metrics: Aynı sıradaki sayısal metrikler
+        """
+        rows = metrics.reset_index(drop=True).assign(user_hash=user_hashes)
+        self.rows = self._bottom_k(pd.concat([self.rows, rows], ignore_index=True))
+    
+    def _bottom_k(self, rows: pd.DataFrame) -> pd.DataFrame:
+        """Kullanıcı bazında toplar ve en küçük hash'li size kullanıcıyı tutar."""
+        if rows.empty:
+            return rows
+        # Önce aday kullanıcılar seçilir, böylece büyük chunk'larda tüm satırlar gruplanmaz
+        threshold_hashes = np.unique(rows['user_hash'].to_numpy())[:self.size]
+        rows = rows[rows['user_hash'] <= threshold_hashes[-1]]
+        return rows.groupby('user_hash', sort=True).sum().reset_index()
+    
+    def merge(self, other: "BottomKSample") -> "BottomKSample":
+        """İki örneklemi birleştirir."""
+        merged = BottomKSample(min(self.size, other.size))
+        merged.rows = merged._bottom_k(pd.concat([self.rows, other.rows], ignore_index=True))
+        return merged
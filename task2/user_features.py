@@ -0,0 +1,290 @@
+# user_features.py
+# Task 2 - Kullanıcı bazlı feature tablosu
+# -ozgur
+
+"""
+Kullanıcı bazlı analizlerin (first-day engagement ve monetization segmentasyonu) ortak
+okuduğu feature tablosu.
+Tablo event satırları üzerinden tek bir groupby geçişiyle oluşturulur ve integer kullanıcı
+koduyla (satır pozisyonu) indekslenir: ilk gün metrikleri, lifetime IAP / ad revenue,
+aktif gün sayısı, ilk / son görülme tarihi, platform ve country.
+Tablo Parquet olarak sütun bazlı saklanır ve yeni event'lerle incremental olarak
+güncellenir; mevcut kullanıcıların kodları güncellemelerde değişmez, yeni kullanıcılar
+sona eklenir.
+"""
+
+import json
+import os
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from user_index import UserIndex
+
+try:
+    import pyarrow.parquet  # Feature tablosunu saklamak için gerekli
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+
+# Kayıt formatı değiştiğinde artırılır
+FEATURES_VERSION = 1
+
+# İlk gün (days_since_install == 0) toplamı alınan sütunlar; tabloda first_day_ önekiyle tutulur
+FIRST_DAY_COLUMNS = ('total_session_count', 'total_session_duration', 'match_start_count', 'total_revenue')
+
+# Lifetime toplamı alınan revenue sütunları
+REVENUE_COLUMNS = ('iap_revenue', 'ad_revenue', 'total_revenue')
+
+# Kullanıcının son görülen değeri tutulan sütunlar
+ATTRIBUTE_COLUMNS = ('platform', 'country')
+
+# Tabloyu oluşturmak için gereken ham sütunlar (preprocess_data'dan önceki isimlerle)
+USER_FEATURE_COLUMNS = [
+    'user_id', 'event_date', 'install_date', 'total_session_count', 'total_session_duration',
+    'match_start_count', 'iap_revenue', 'ad_revenue', 'platform', 'country'
+]
+
+
+class UserFeatures:
+    """
+    Kullanıcı kodu -> feature tablosu.
+    table: Satır i, kodu i olan kullanıcının feature'ları (user_id, first_day_rows,
+           first_day_*, lifetime revenue, active_days, first_seen, last_seen, platform, country)
+    activity: Distinct (user_code, event_date) çiftleri; aktif gün sayıları bunlardan hesaplanır
+              ve incremental güncellemelerde aynı gün iki kez sayılmaz
+    metadata: Kayıtla birlikte saklanan ek bilgiler (ör. işlenmiş shard'lar, filtre seçenekleri)
+    
+    Kullanım: Task 2 - Kullanıcı bazlı segmentasyonlar
+    """
+    
+    def __init__(self, table: pd.DataFrame, activity: pd.DataFrame, metadata: Optional[Dict] = None):
+        """
+        Args:
+            table: Kullanıcı kodu sırasıyla feature tablosu (RangeIndex)
+            activity: user_code ve event_date sütunlarını içeren distinct aktivite tablosu
+            metadata: Ek bilgiler
+        """
+        self.table = table
+        self.activity = activity
+        self.metadata = {} if metadata is None else metadata
+    
+    def __len__(self) -> int:
+        return len(self.table)
+    
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "UserFeatures":
+        """
+        Preprocessed event satırlarından tabloyu tek groupby geçişiyle oluşturur.
+        İlk gün metrikleri, ilk gün dışındaki satırlar 0 ile maskelenerek aynı geçişte toplanır.
+    
+        Args:
+            df: Preprocessed DataFrame (USER_FEATURE_COLUMNS; platform / country opsiyonel)
+    
+        Returns:
+            UserFeatures
+        """
+        user_index = UserIndex.from_values(df['user_id'])
+        codes = user_index.encode(df['user_id'])
+        valid = codes >= 0
+        first_day = (df['days_since_install'] == 0).to_numpy()
+    
+        columns = {'first_day_rows': first_day.astype(np.int64)}
+        for column in FIRST_DAY_COLUMNS:
+            columns[f'first_day_{column}'] = df[column].where(first_day, 0).to_numpy()
+        for column in REVENUE_COLUMNS:
+            columns[column] = df[column].to_numpy()
+        columns['first_seen'] = df['event_date'].to_numpy()
+        columns['last_seen'] = columns['first_seen']
+    
+        aggregations = {column: 'sum' for column in columns}
+        aggregations.update({'first_seen': 'min', 'last_seen': 'max'})
+        grouped = pd.DataFrame(columns)[valid].groupby(codes[valid], sort=True).agg(aggregations)
+        # platform / country object sütunlar üzerinde groupby yerine kodlar ve son satır pozisyonuyla alınır
+        for column in ATTRIBUTE_COLUMNS:
+            if column in df.columns:
+                grouped[column] = _last_values(df[column], codes, valid, len(user_index))[grouped.index.to_numpy()]
+            else:
+                grouped[column] = np.full(len(grouped), None, dtype=object)
+    
+        # Satırı olmayan sözlük kullanıcıları (ör. filtrelenmiş kategoriler) tabloya alınmaz
+        present = grouped.index.to_numpy()
+        if len(present) != len(user_index):
+            remap = np.full(len(user_index), -1, dtype=np.int32)
+            remap[present] = np.arange(len(present), dtype=np.int32)
+            codes = remap[np.where(valid, codes, 0)]
+            codes[~valid] = -1
+        # Sayaçlar incremental toplamalarda taşmaması için int64 tutulur
+        table = grouped.reset_index(drop=True)
+        for column in table.columns:
+            if pd.api.types.is_integer_dtype(table[column].dtype):
+                table[column] = table[column].astype(np.int64)
+        table.insert(0, 'user_id', np.asarray(user_index.decode(present), dtype=object))
+    
+        activity = _distinct_activity(codes[valid], df['event_date'].to_numpy()[valid])
+        table.insert(table.columns.get_loc('first_seen'), 'active_days', _active_days(activity, len(table)))
+        return cls(table, activity)
+    
+    def update(self, df: pd.DataFrame) -> "UserFeatures":
+        """
+        Yeni event satırlarını tabloya ekler (bkz. merge).
+    
+        Args:
+            df: Preprocessed DataFrame (yeni event'ler)
+    
+        Returns:
+            Güncellenmiş UserFeatures
+        """
+        return self.merge(UserFeatures.from_frame(df))
+    
+    def merge(self, other: "UserFeatures") -> "UserFeatures":
+        """
+        İki tabloyu birleştirir. Mevcut kodlar korunur, yeni kullanıcılar sona eklenir.
+        Toplamlar toplanır, aktif günler distinct aktivitelerden yeniden sayılır; platform ve
+        country son görülme tarihi daha yeni olan taraftan alınır.
+    
+        Args:
+            other: Eklenecek tablo (ör. yeni günün event'leri)
+    
+        Returns:
+            Birleştirilmiş UserFeatures (metadata self'ten alınır)
+        """
+        user_ids = pd.Index(self.table['user_id'])
+        other_ids = pd.Index(other.table['user_id'])
+        new_ids = other_ids[user_ids.get_indexer(other_ids) < 0]
+        merged_ids = user_ids.append(new_ids)
+        other_codes = merged_ids.get_indexer(other_ids)
+    
+        table = self.table.reindex(pd.RangeIndex(len(merged_ids)))
+        table['user_id'] = np.asarray(merged_ids, dtype=object)
+        incoming = other.table.set_axis(other_codes).reindex(table.index)
+        seen = incoming['user_id'].notna().to_numpy()
+    
+        for column in ('first_day_rows',) + tuple(f'first_day_{c}' for c in FIRST_DAY_COLUMNS) + REVENUE_COLUMNS:
+            dtype = self.table[column].dtype if len(self.table) else other.table[column].dtype
+            table[column] = table[column].fillna(0).add(incoming[column].fillna(0)).astype(dtype)
+        earlier = ~seen | (table['first_seen'] <= incoming['first_seen']).to_numpy()
+        table['first_seen'] = table['first_seen'].where(earlier, incoming['first_seen'])
+        newer = seen & ~(table['last_seen'] > incoming['last_seen']).to_numpy()
+        for column in ('last_seen',) + ATTRIBUTE_COLUMNS:
+            table[column] = table[column].where(~newer, incoming[column])
+    
+        activity = pd.concat([
+            self.activity,
+            other.activity.assign(user_code=other_codes[other.activity['user_code'].to_numpy()])
+        ], ignore_index=True).drop_duplicates(ignore_index=True)
+        table['active_days'] = _active_days(activity, len(table))
+        return UserFeatures(table, activity, dict(self.metadata))
+    
+    def first_day_metrics(self) -> pd.DataFrame:
+        """
+        İlk gün satırı olan kullanıcıların ilk gün toplamları
+        (analysis.first_day_user_metrics ile aynı format ve sıra).
+    
+        Kullanım: Task 2 - First-day engagement segmentation
+        """
+        table = self.table[self.table['first_day_rows'] > 0]
+        result = table[['user_id'] + [f'first_day_{c}' for c in FIRST_DAY_COLUMNS]]
+        result.columns = ['user_id'] + list(FIRST_DAY_COLUMNS)
+        return _sorted_by_user(result)
+    
+    def revenue_totals(self) -> pd.DataFrame:
+        """
+        Kullanıcı bazlı lifetime revenue toplamları (analysis.user_revenue_totals ile aynı format ve sıra).
+    
+        Kullanım: Task 2 - Monetization segmentation
+        """
+        return _sorted_by_user(self.table[['user_id'] + list(REVENUE_COLUMNS)])
+    
+    def save(self, directory: str):
+        """
+        Tabloyu klasöre sütun bazlı (Parquet) kaydeder: features.parquet, activity.parquet ve
+        metadata için meta.json. Dosyalar geçici isimle yazılıp rename edilir.
+    
+        Args:
+            directory: Kayıt klasörü
+        """
+        if not PARQUET_AVAILABLE:
+            raise ImportError("Feature tablosunu kaydetmek için pyarrow gereklidir.")
+        os.makedirs(directory, exist_ok=True)
+        suffix = f".tmp{os.getpid()}"
+        for name, frame in (('features.parquet', self.table), ('activity.parquet', self.activity)):
+            path = os.path.join(directory, name)
+            frame.to_parquet(path + suffix, index=False)
+            os.replace(path + suffix, path)
+        meta_path = os.path.join(directory, 'meta.json')
+        with open(meta_path + suffix, 'w') as f:
+            json.dump({'version': FEATURES_VERSION, **self.metadata}, f)
+        os.replace(meta_path + suffix, meta_path)
+    
+    @classmethod
+    def load(cls, directory: str) -> Optional["UserFeatures"]:
+        """
+        save ile kaydedilmiş tabloyu okur.
+    
+        Args:
+            directory: Kayıt klasörü
+    
+        Returns:
+            UserFeatures (kayıt yoksa, okunamıyorsa veya versiyonu farklıysa None)
+        """
+        meta_path = os.path.join(directory, 'meta.json')
+        if not PARQUET_AVAILABLE or not os.path.exists(meta_path):
+            return None
+        try:
+            with open(meta_path, 'r') as f:
+                metadata = json.load(f)
+            if metadata.pop('version', None) != FEATURES_VERSION:
+                return None
+            table = pd.read_parquet(os.path.join(directory, 'features.parquet'))
+            activity = pd.read_parquet(os.path.join(directory, 'activity.parquet'))
+        except Exception as e:
+            print(f"Uyarı: {directory} okunamadı, feature tablosu yeniden oluşturulacak: {e}")
+            return None
+        return cls(table, activity, metadata)
+
+
+def _attribute_codes(values: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Sütunun kodları (NaN için -1) ve kod -> değer array'i (object)."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy(), np.asarray(values.cat.categories, dtype=object)
+    codes, uniques = pd.factorize(values)
+    return codes, np.asarray(uniques, dtype=object)
+
+
+def _last_values(values: pd.Series, user_codes: np.ndarray, valid: np.ndarray, n_users: int) -> np.ndarray:
+    """
+    Kullanıcı kodu başına son (NaN olmayan) değer; groupby 'last' ile aynı sonuç.
+    Her kullanıcının son satır pozisyonu np.maximum.at ile bulunur (satırı olmayanlar için None).
+    """
+    codes, uniques = _attribute_codes(values)
+    rows = np.flatnonzero(valid & (codes >= 0))
+    last_row = np.full(n_users, -1, dtype=np.int64)
+    np.maximum.at(last_row, user_codes[rows], rows)
+    result = np.full(n_users, None, dtype=object)
+    seen = last_row >= 0
+    result[seen] = uniques[codes[last_row[seen]]]
+    return result
+
+
+def _distinct_activity(user_codes: np.ndarray, event_dates: np.ndarray) -> pd.DataFrame:
+    """Distinct (user_code, event_date) çiftleri."""
+    activity = pd.DataFrame({'user_code': user_codes.astype(np.int32), 'event_date': event_dates})
+    return activity.drop_duplicates(ignore_index=True)
+
+
+def _active_days(activity: pd.DataFrame, n_users: int) -> np.ndarray:
+    """Kullanıcı başına aktif gün sayısı."""
+    return np.bincount(activity['user_code'].to_numpy(), minlength=n_users).astype(np.int64)
+
+
+def _sorted_by_user(frame: pd.DataFrame) -> pd.DataFrame:
+    """
+    Satırları user_id sırasına getirir. Tek seferde oluşturulan tablolar zaten sıralıdır;
+    incremental güncellemelerde yeni kullanıcılar sona eklendiği için yeniden sıralanır.
+    """
+    if frame['user_id'].is_monotonic_increasing:
+        return frame.reset_index(drop=True)
+    return frame.sort_values('user_id', kind='stable', ignore_index=True)
@@ -0,0 +1,257 @@
+# user_index.py
+# Task 2 - User ID sözlüğü ve kullanıcı bitmap'leri
+# -ozgur
+
+"""
+user_id değerlerini yoğun (dense) int32 kodlara çeviren sözlük ve bu kodlar üzerinde
+çalışan bitmap'ler.
+Distinct kullanıcı sayıları string ID'leri tekrar tekrar hash'lemek yerine kullanıcı
+kümelerinin bitmap'leri üzerinden popcount ile hesaplanır. Bitmap'ler günler ve segmentler
+arasında birleşim / kesişim ile birleştirilebildiği için retention gibi cohort hesapları
+bitmap kesişimlerine indirgenir.
+Kompakt yüklemede user_id zaten categorical olduğundan kodlar kategori kodlarından
+doğrudan alınır; sözlük dataset yüklenirken bir kez oluşmuş olur.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# Bir grup bloğu için kullanılan geçici boolean matrisin maksimum boyutu (byte)
+_SCATTER_BLOCK_BYTES = 64 * 1024 * 1024
+
+# np.bitwise_count olmayan NumPy sürümleri için byte bazlı popcount tablosu
+_POPCOUNT_TABLE = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+
+def _n_words(n_users: int) -> int:
+    """n_users bit için gereken uint64 word sayısı."""
+    return max(1, -(-n_users // 64))
+
+
+def popcount(words: np.ndarray, axis: Optional[int] = None):
+    """
+    uint64 word'lerdeki set bit sayısını döndürür.
+    
+    Args:
+        words: uint64 array'i
+        axis: None ise toplam, aksi halde bu eksen boyunca satır bazlı sayılar
+    
+    Returns:
+        Bit sayısı (int veya int64 array'i)
+    """
+    if hasattr(np, 'bitwise_count'):
+        counts = np.bitwise_count(words)
+    else:
+        counts = _POPCOUNT_TABLE[words.view(np.uint8)].reshape(words.shape + (8,)).sum(axis=-1)
+    if axis is None:
+        return int(counts.sum(dtype=np.int64))
+    return counts.sum(axis=axis, dtype=np.int64)
+
+
+class UserIndex:
+    """
+    user_id -> dense int32 kod sözlüğü.
+    
+    Kullanım: Task 2 - Distinct kullanıcı sayımları
+    """
+    
+    def __init__(self, user_ids: pd.Index):
+        """
+        Args:
+            user_ids: Kod sırasıyla user_id değerleri (kod = pozisyon)
+        """
+        self.user_ids = user_ids
+    
+    @classmethod
+    def from_values(cls, values: pd.Series) -> "UserIndex":
+        """
+        Sütundan sözlük oluşturur. Categorical sütunlarda kategoriler olduğu gibi kullanılır,
+        böylece sütunun kendi kodları sözlük kodlarıyla aynıdır.
+        
+        Args:
+            values: user_id sütunu
+        
+        Returns:
+            UserIndex
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            return cls(values.cat.categories)
+        return cls(pd.Index(pd.unique(values.dropna())))
+    
+    def __len__(self) -> int:
+        return len(self.user_ids)
+    
+    def encode(self, values: pd.Series) -> np.ndarray:
+        """
+        user_id değerlerini int32 kodlara çevirir (sözlükte olmayan ve NaN değerler -1).
+        Kategorileri sözlükle aynı olan categorical sütunlarda hash yapılmaz.
+        
+        Args:
+            values: user_id değerleri
+        
+        Returns:
+            int32 kod array'i
+        """
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            categories = values.cat.categories
+            if categories is self.user_ids or categories.equals(self.user_ids):
+                return codes.astype(np.int32, copy=False)
+            # Farklı kategori setleri: yalnızca kategoriler hash'lenir, satırlar kodlar üzerinden eşlenir
+            category_codes = np.append(self.user_ids.get_indexer(categories), -1).astype(np.int32)
+            return category_codes[codes]
+        return self.user_ids.get_indexer(values).astype(np.int32)
+    
+    def decode(self, codes: np.ndarray) -> pd.Index:
+        """
+        int32 kodları user_id değerlerine çevirir.
+        
+        Args:
+            codes: Kod array'i (>= 0)
+        
+        Returns:
+            user_id Index'i
+        """
+        return self.user_ids.take(codes)
+
+
+class UserBitmap:
+    """
+    Kullanıcı kümesi: i. bit, kodu i olan kullanıcının kümede olduğunu gösterir.
+    Birleşim (|), kesişim (&) ve fark (-) word'ler üzerinde vektörel çalışır;
+    len() kümedeki kullanıcı sayısını popcount ile döndürür.
+    
+    Kullanım: Task 2 - Distinct kullanıcı sayımları ve retention kesişimleri
+    """
+    
+    __slots__ = ('words', 'n_users')
+    
+    def __init__(self, words: np.ndarray, n_users: int):
+        """
+        Args:
+            words: uint64 word array'i
+            n_users: Sözlükteki kullanıcı sayısı
+        """
+        self.words = words
+        self.n_users = n_users
+    
+    @classmethod
+    def from_codes(cls, codes: np.ndarray, n_users: int) -> "UserBitmap":
+        """
+        Kullanıcı kodlarından bitmap oluşturur (-1 kodlar yok sayılır).
+        
+        Args:
+            codes: Kullanıcı kodları (tekrar edebilir)
+            n_users: Sözlükteki kullanıcı sayısı
+        
+        Returns:
+            UserBitmap
+        """
+        return cls(group_bitmaps(np.zeros(len(codes), dtype=np.int32), codes, 1, n_users)[0], n_users)
+    
+    def __or__(self, other: "UserBitmap") -> "UserBitmap":
+        return UserBitmap(self.words | other.words, self.n_users)
+    
+    def __and__(self, other: "UserBitmap") -> "UserBitmap":
+        return UserBitmap(self.words & other.words, self.n_users)
+    
+    def __sub__(self, other: "UserBitmap") -> "UserBitmap":
+        return UserBitmap(self.words & ~other.words, self.n_users)
+    
+    def __len__(self) -> int:
+        return popcount(self.words)
+    
+    def to_codes(self) -> np.ndarray:
+        """
+        Kümedeki kullanıcı kodlarını artan sırada döndürür.
+        """
+        flags = np.unpackbits(self.words.view(np.uint8), bitorder='little')[:self.n_users]
+        return np.flatnonzero(flags).astype(np.int32)
+
+
+def group_bitmaps(group_codes: np.ndarray, user_codes: np.ndarray, n_groups: int, n_users: int) -> np.ndarray:
+    """
+    Her grup için kullanıcı bitmap'ini tek geçişte oluşturur.
+    Satırlar boolean matrise yazılır ve np.packbits ile word'lere sıkıştırılır; geçici matrisin
+    boyutu _SCATTER_BLOCK_BYTES ile sınırlandırılır.
+    
+    Args:
+        group_codes: Satır bazlı grup kodları (0..n_groups-1, -1 yok sayılır)
+        user_codes: Satır bazlı kullanıcı kodları (0..n_users-1, -1 yok sayılır)
+        n_groups: Grup sayısı
+        n_users: Sözlükteki kullanıcı sayısı
+    
+    Returns:
+        (n_groups, n_words) boyutunda uint64 matris; satır g, g grubunun bitmap'i
+    
+    Kullanım: Task 2 - Distinct kullanıcı sayımları
+    """
+    n_words = _n_words(n_users)
+    bitmaps = np.zeros((n_groups, n_words), dtype=np.uint64)
+    
+    valid = (group_codes >= 0) & (user_codes >= 0)
+    group_codes = group_codes[valid]
+    user_codes = user_codes[valid]
+    
+    block = max(1, _SCATTER_BLOCK_BYTES // (n_words * 64))
+    for start in range(0, n_groups, block):
+        stop = min(n_groups, start + block)
+        if start == 0 and stop == n_groups:
+            rows, columns = group_codes, user_codes
+        else:
+            in_block = (group_codes >= start) & (group_codes < stop)
+            rows, columns = group_codes[in_block] - start, user_codes[in_block]
+        flags = np.zeros((stop - start, n_words * 64), dtype=bool)
+        flags[rows, columns] = True
+        bitmaps[start:stop] = np.packbits(flags, axis=1, bitorder='little').view(np.uint64)
+    return bitmaps
+
+
+def distinct_counts(group_codes: np.ndarray, user_codes: np.ndarray, n_groups: int, n_users: int) -> np.ndarray:
+    """
+    Grup başına distinct kullanıcı sayısını döndürür (groupby(...).nunique() karşılığı).
+    
+    Args:
+        group_codes: Satır bazlı grup kodları (-1 yok sayılır)
+        user_codes: Satır bazlı kullanıcı kodları (-1 yok sayılır)
+        n_groups: Grup sayısı
+        n_users: Sözlükteki kullanıcı sayısı
+    
+    Returns:
+        int64 sayı array'i (uzunluk n_groups)
+    
+    Kullanım: Task 2 - Distinct kullanıcı sayımları
+    """
+    return popcount(group_bitmaps(group_codes, user_codes, n_groups, n_users), axis=1)
+
+
+def encode_values(values: pd.Series) -> Tuple[np.ndarray, int]:
+    """
+    Sütunu dense int32 kodlara çevirir (NaN -1). Categorical sütunlarda kategori kodları
+    kullanılır (hash yapılmaz), diğer sütunlar bir kez factorize edilir.
+    
+    Args:
+        values: Kodlanacak sütun (ör. user_id)
+    
+    Returns:
+        (kodlar, sözlük boyutu)
+    
+    Kullanım: Task 2 - Distinct kullanıcı sayımları
+    """
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int32, copy=False), len(values.cat.categories)
+    codes, uniques = pd.factorize(values)
+    return codes.astype(np.int32, copy=False), len(uniques)
+
+
+def count_distinct(values: pd.Series) -> int:
+    """
+    Distinct (non-null) değer sayısını bitmap üzerinden döndürür (Series.nunique() karşılığı).
+    
+    Kullanım: Task 2 - Distinct kullanıcı sayımları
+    """
+    codes, n_values = encode_values(values)
+    return len(UserBitmap.from_codes(codes, n_values))
@@ -149,6 +149,7 @@ def plot_monetization_segments(monetization_df: pd.DataFrame, save_path: Optiona
     Kullanım: Task 2 - Monetization segmentation visualization
     """
     segment_counts = monetization_df['monetization_segment'].value_counts()
+    segment_counts = segment_counts[segment_counts > 0]
     
     plt.figure(figsize=(12, 6))
     colors = plt.cm.Set3(np.linspace(0, 1, len(segment_counts)))